@@ -0,0 +1,68 @@
+"""透明度合成の速度比較
+
+浮動小数点数の透明度と uint8 の透明度 (固定小数点, out= 指定) の alpha_composite を比較します。
+また、タイル分割 (tile_size=512) の有無による追加のメモリ使用量のピークを比較します。
+
+    python -m reinlib.benchmarks.bench_alpha_composite
+"""
+import time
+import tracemalloc
+import numpy as np
+
+from reinlib.types.rein_alpha_blend_mode import AlphaBlendMode
+from reinlib.utility.rein_image import alpha_composite
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    repeat = 10
+
+    for height, width in ((512, 512), (1080, 1920), (2048, 2048)):
+        src = rng.integers(0, 256, (height, width, 3), np.uint8)
+        dst = rng.integers(0, 256, (height, width, 3), np.uint8)
+        alpha = rng.integers(0, 256, (height, width, 1), np.uint8)
+        out = dst.copy()
+
+        for mode in AlphaBlendMode:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                expected = alpha_composite(src, dst, alpha / 255.0, mode)
+            float_time = (time.perf_counter() - start) / repeat
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                alpha_composite(src, dst, alpha, mode, out=out)
+            fixed_time = (time.perf_counter() - start) / repeat
+
+            assert np.abs(expected.astype(np.int16) - out).max() <= 1, "fixed-point result differs by more than 1 LSB."
+
+            print(
+                f"{width:>4}x{height:<4} {mode.name:<13} float {float_time * 1.0e3:>8.2f} ms  "
+                f"fixed {fixed_time * 1.0e3:>8.2f} ms  x{float_time / fixed_time:.1f}"
+            )
+
+    height, width = 4096, 4096
+    src = rng.integers(0, 256, (height, width, 3), np.uint8)
+    dst = rng.integers(0, 256, (height, width, 3), np.uint8)
+    alpha = rng.integers(0, 256, (height, width, 1), np.uint8)
+    out = np.empty_like(dst)
+
+    for name, value in (("uint8", alpha), ("float64", alpha / 255.0)):
+        results:list[np.ndarray] = []
+
+        for tile_size in (None, 512):
+            tracemalloc.start()
+            start = time.perf_counter()
+            alpha_composite(src, dst, value, out=out, tile_size=tile_size)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            results.append(out.copy())
+            print(f"{width}x{height} {name:<7} tile_size={str(tile_size):<4}  peak {peak / 2**20:>8.1f} MiB  {elapsed * 1.0e3:>8.2f} ms")
+
+        assert np.array_equal(*results), "tiled result differs from untiled result."
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""アノテーションの保存形式の比較
+
+pickle と rein_annotation_codec の構造化配列のサイズと速度を比較します。
+
+    python -m reinlib.benchmarks.bench_annotation_codec
+"""
+import pickle
+import time
+import random
+from typing import Any, Callable
+import numpy as np
+
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_text_layout import TextLayout
+from reinlib.types.rein_frozen_text_layout import FrozenTextLayout
+from reinlib.utility.rein_annotation_codec import (
+    BOUNDING_BOX_DTYPE,
+    encode_bounding_boxes,
+    decode_bounding_boxes,
+    encode_colors,
+    decode_colors,
+    encode_text_layouts,
+    decode_text_layouts,
+)
+
+
+def elapsed(func:Callable[[], Any]) -> tuple[Any, float]:
+    """実行時間を計測
+
+    Args:
+        func (Callable[[], Any]): 計測対象
+
+    Returns:
+        tuple[Any, float]: 戻り値とミリ秒
+    """
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1.0e3
+
+
+def compare(name:str, values:list[Any], encode:Callable[[list[Any]], Any], decode:Callable[[Any], list[Any]]) -> None:
+    """pickle と構造化配列を比較
+
+    Args:
+        name (str): 表示名
+        values (list[Any]): 保存対象
+        encode (Callable[[list[Any]], Any]): 構造化配列への変換
+        decode (Callable[[Any], list[Any]]): 構造化配列からの変換
+    """
+    pickled, pickle_dump_time = elapsed(lambda: pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL))
+    _, pickle_load_time = elapsed(lambda: pickle.loads(pickled))
+
+    records, encode_time = elapsed(lambda: encode(values))
+    buffer = records.tobytes()
+    decoded, decode_time = elapsed(lambda: decode(records))
+
+    assert decoded == values, f"{name} does not round-trip."
+
+    print(
+        f"{name:<14} pickle {len(pickled) / 1024:>9.1f} KiB dump {pickle_dump_time:>8.2f} ms load {pickle_load_time:>8.2f} ms | "
+        f"codec {len(buffer) / 1024:>8.1f} KiB encode {encode_time:>8.2f} ms decode {decode_time:>8.2f} ms"
+    )
+
+
+def main() -> None:
+    random.seed(0)
+    n = 100_000
+
+    bboxes = [BoundingBox(x:=random.randrange(4096), y:=random.randrange(4096), x + random.randrange(64), y + random.randrange(64)) for _ in range(n)]
+    colors = [Color(random.randrange(256), random.randrange(256), random.randrange(256), 255) for _ in range(n)]
+    layouts = [
+        FrozenTextLayout.from_text_layout(TextLayout(
+            anchor="ls",
+            is_outline=random.random() < 0.5,
+            outline_weight=random.randrange(1, 4),
+            is_shadow=random.random() < 0.5,
+            shadow_offset=Int2(random.randrange(4), random.randrange(4)),
+            median_bbox=BoundingBox(0, -random.randrange(32), random.randrange(32), random.randrange(8)),
+        ))
+        for _ in range(n // 10)
+    ]
+    font_paths:list[str] = []
+
+    compare("BoundingBox", bboxes, encode_bounding_boxes, decode_bounding_boxes)
+    compare("Color", colors, encode_colors, decode_colors)
+    compare("TextLayout", layouts, lambda values: encode_text_layouts(values, font_paths), lambda records: decode_text_layouts(records, font_paths))
+
+    buffer = encode_bounding_boxes(bboxes).tobytes()
+    _, frombuffer_time = elapsed(lambda: np.frombuffer(buffer, BOUNDING_BOX_DTYPE))
+    print(f"np.frombuffer {n} bboxes {frombuffer_time:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""画像拡張パイプラインの計測
+
+AugmentPipeline と、サンプル毎に PIL で同じ処理を行う場合を比較します。
+
+    python -m reinlib.benchmarks.bench_augment
+"""
+import io
+import time
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_range import Range
+from reinlib.types.rein_size2d import Size2D
+from reinlib.types.rein_float_minmax import FloatMinMax
+from reinlib.utility.rein_image import alpha_composite, create_gradient_alpha
+from reinlib.utility.rein_augment import (
+    AugmentPipeline,
+    GaussianBlur,
+    BrightnessContrast,
+    GaussianNoise,
+    JpegArtifacts,
+    GradientAlphaOverlay,
+)
+
+
+def augment_per_sample_pil(batch:np.ndarray, rng:np.random.Generator) -> np.ndarray:
+    """サンプル毎に PIL と NumPy を往復する従来の処理
+
+    Args:
+        batch (np.ndarray): (N, H, W, C) 画像
+        rng (np.random.Generator): 乱数生成器
+
+    Returns:
+        np.ndarray: (N, H, W, C) 拡張後の画像
+    """
+    out = np.empty_like(batch)
+    size = Size2D(batch.shape[2], batch.shape[1])
+
+    for i, sample in enumerate(batch):
+        image = Image.fromarray(sample).filter(ImageFilter.GaussianBlur(rng.uniform(0.0, 1.5)))
+        image = ImageEnhance.Brightness(image).enhance(rng.uniform(0.8, 1.2))
+        image = ImageEnhance.Contrast(image).enhance(rng.uniform(0.8, 1.2))
+
+        array = np.asarray(image) + rng.normal(0.0, rng.uniform(0.0, 8.0), sample.shape)
+        image = Image.fromarray(np.clip(array, 0.0, 255.0).astype(np.uint8))
+
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=int(rng.integers(40, 96)))
+        array = np.asarray(Image.open(buffer))
+
+        alpha = create_gradient_alpha(size, int(rng.integers(0, 128)), int(rng.integers(0, 256)))
+        out[i] = alpha_composite(np.zeros(3, np.uint8), array, alpha)
+
+    return out
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    n, height, width = 32, 256, 256
+
+    batch = rng.integers(0, 256, (n, height, width, 3), np.uint8)
+    out = np.empty_like(batch)
+
+    pipeline = AugmentPipeline([
+        GaussianBlur(FloatMinMax(0.0, 1.5)),
+        BrightnessContrast(FloatMinMax(0.8, 1.2), FloatMinMax(0.8, 1.2)),
+        GaussianNoise(FloatMinMax(0.0, 8.0)),
+        JpegArtifacts(Range(40, 96)),
+        GradientAlphaOverlay(Color(0, 0, 0, 255), Range(0, 128), Range(0, 256)),
+    ])
+
+    start = time.perf_counter()
+    augment_per_sample_pil(batch, rng)
+    elapsed_pil = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pipeline(batch, rng, out)
+    elapsed_pipeline = time.perf_counter() - start
+
+    print(f"{n}x{width}x{height}")
+    print(f"  per-sample PIL   {elapsed_pil * 1.0e3:>8.2f} ms  {elapsed_pil / n * 1.0e3:>6.3f} ms/sample")
+    print(f"  AugmentPipeline  {elapsed_pipeline * 1.0e3:>8.2f} ms  {elapsed_pipeline / n * 1.0e3:>6.3f} ms/sample")
+    print()
+    print(pipeline.report())
+
+    # 全ての処理でアルファチャンネルが変更されないことを確認
+    for channels in (2, 4):
+        rgba = rng.integers(0, 256, (4, height, width, channels), np.uint8)
+        augmented = pipeline(rgba, rng)
+        assert np.array_equal(augmented[..., -1], rgba[..., -1]), f"alpha channel changed, channels={channels}."
+        assert not np.array_equal(augmented[..., :-1], rgba[..., :-1]), f"color channels unchanged, channels={channels}."
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""ブレンドカーネルのスループット計測
+
+rein_blend の各カーネルを out= 指定 (インプレース) で計測します。
+
+    python -m reinlib.benchmarks.bench_blend
+"""
+import time
+import numpy as np
+
+from reinlib.utility.rein_blend import BLEND_KERNELS
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    repeat = 10
+
+    for height, width in ((512, 512), (1080, 1920)):
+        base = rng.integers(0, 256, (height, width, 3), np.uint8)
+        blend = rng.integers(0, 256, (height, width, 3), np.uint8)
+        alpha = rng.integers(0, 256, (height, width, 1), np.uint8)
+        out = np.empty_like(base)
+
+        for blend_mode, kernel in BLEND_KERNELS.items():
+            start = time.perf_counter()
+            for _ in range(repeat):
+                kernel(base, blend, alpha, out)
+            elapsed = (time.perf_counter() - start) / repeat
+
+            print(f"{width:>4}x{height:<4} {str(blend_mode):<10} {elapsed * 1.0e3:>8.2f} ms  {width * height / elapsed / 1.0e6:>8.1f} Mpx/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""IoU / NMS / 統合の速度計測
+
+N = 10k のバウンディングボックスで rein_bounding_box_ops を計測し、NMS は Python ループ版と比較します。
+
+    python -m reinlib.benchmarks.bench_bounding_box_ops
+"""
+import time
+import numpy as np
+
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.utility.rein_bounding_box_ops import (
+    pairwise_intersection_area,
+    pairwise_iou,
+    non_maximum_suppression,
+    merge_overlapping_bboxes,
+)
+
+
+def python_nms(bboxes:list[BoundingBox], scores:list[float], iou_threshold:float) -> list[int]:
+    """Python ループによる貪欲法のNMS (比較用)
+
+    Args:
+        bboxes (list[BoundingBox]): バウンディングボックス
+        scores (list[float]): スコア
+        iou_threshold (float): 除外するIoUの閾値
+
+    Returns:
+        list[int]: 採用したインデックス
+    """
+    def iou(lhs:BoundingBox, rhs:BoundingBox) -> float:
+        w = max(0, min(lhs.xmax, rhs.xmax) - max(lhs.xmin, rhs.xmin))
+        h = max(0, min(lhs.ymax, rhs.ymax) - max(lhs.ymin, rhs.ymin))
+        union = lhs.area + rhs.area - w * h
+        return w * h / union if union > 0 else 0.0
+
+    keep:list[int] = []
+    for index in sorted(range(len(bboxes)), key=lambda i: -scores[i]):
+        if all(iou(bboxes[index], bboxes[kept]) <= iou_threshold for kept in keep):
+            keep.append(index)
+    return keep
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    n = 10_000
+
+    xy = rng.integers(0, 4096, (n, 2))
+    wh = rng.integers(4, 64, (n, 2))
+    array = np.concatenate((xy, xy + wh), axis=1)
+    bboxes = BoundingBox.from_array(array)
+    scores = rng.random(n)
+
+    start = time.perf_counter()
+    pairwise_intersection_area(array, array[:1000])
+    print(f"pairwise_intersection_area {n} x 1000  {(time.perf_counter() - start) * 1.0e3:>9.2f} ms")
+
+    start = time.perf_counter()
+    pairwise_iou(array, array[:1000])
+    print(f"pairwise_iou               {n} x 1000  {(time.perf_counter() - start) * 1.0e3:>9.2f} ms")
+
+    start = time.perf_counter()
+    keep = non_maximum_suppression(array, scores, 0.3)
+    print(f"non_maximum_suppression    {n}         {(time.perf_counter() - start) * 1.0e3:>9.2f} ms  kept {len(keep)}")
+
+    start = time.perf_counter()
+    merged = merge_overlapping_bboxes(array)
+    print(f"merge_overlapping_bboxes   {n}         {(time.perf_counter() - start) * 1.0e3:>9.2f} ms  groups {len(merged)}")
+
+    # Python ループ版は時間が掛かるため部分集合で比較
+    m = 2_000
+    start = time.perf_counter()
+    python_keep = python_nms(bboxes[:m], scores[:m].tolist(), 0.3)
+    python_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    numpy_keep = non_maximum_suppression(array[:m], scores[:m], 0.3)
+    numpy_time = time.perf_counter() - start
+
+    assert python_keep == numpy_keep.tolist(), "mismatch between python and numpy nms."
+    print(f"nms {m}: python {python_time * 1.0e3:.2f} ms  numpy {numpy_time * 1.0e3:.2f} ms  x{python_time / numpy_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
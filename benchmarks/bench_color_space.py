@@ -0,0 +1,41 @@
+"""HSVからRGBへの変換速度の比較
+
+Color.from_hsv のループと rein_color_space.hsv_to_rgb を比較します。
+
+    python -m reinlib.benchmarks.bench_color_space
+"""
+import time
+import numpy as np
+
+from reinlib.types.rein_hsv import HSV
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_color_space import hsv_to_rgb, jitter_hue_saturation
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+
+    for n in (1_000, 10_000, 100_000):
+        hsv = np.stack((rng.integers(0, 361, n), rng.integers(0, 101, n), rng.integers(0, 101, n)), axis=-1)
+        hsv_list = [HSV(*values) for values in hsv.tolist()]
+
+        start = time.perf_counter()
+        scalar = [Color.from_hsv(value).rgb for value in hsv_list]
+        scalar_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        vector = hsv_to_rgb(hsv)
+        vector_time = time.perf_counter() - start
+
+        assert np.array_equal(vector, np.array(scalar, np.uint8)), "mismatch between scalar and vectorized conversion."
+
+        print(f"n={n:>7}  from_hsv loop {scalar_time * 1.0e3:>9.3f} ms  hsv_to_rgb {vector_time * 1.0e3:>8.3f} ms  x{scalar_time / vector_time:>7.1f}")
+
+    image = rng.integers(0, 256, (1024, 1024, 3), np.uint8)
+    start = time.perf_counter()
+    jitter_hue_saturation(image, 15.0, 0.8)
+    print(f"jitter_hue_saturation 1024x1024  {(time.perf_counter() - start) * 1.0e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""複数レイヤー合成の速度比較
+
+ImageLayerCanvas.update_scene_color の旧実装 (レイヤー毎に浮動小数点数で合成) と composite_stack を比較します。
+
+    python -m reinlib.benchmarks.bench_composite_stack
+"""
+import time
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_blend_mode import BlendMode
+from reinlib.utility.rein_image import alpha_composite, composite_stack
+
+
+def composite_per_layer(
+    layers:list[npt.NDArray[np.uint8]],
+    blend_modes:list[BlendMode],
+    offsets:list[Int2],
+    out:npt.NDArray[np.uint8],
+) -> npt.NDArray[np.uint8]:
+    """レイヤー毎に出力全体を読み書きする合成 (比較用)
+
+    Args:
+        layers (list[npt.NDArray[np.uint8]]): RGBA レイヤー
+        blend_modes (list[BlendMode]): ブレンドモード
+        offsets (list[Int2]): 位置
+        out (npt.NDArray[np.uint8]): 合成先
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成先
+    """
+    height, width = out.shape[:2]
+
+    for layer, blend_mode, offset in zip(layers, blend_modes, offsets):
+        xmin, ymin = max(0, offset.x), max(0, offset.y)
+        xmax, ymax = min(width, offset.x + layer.shape[1]), min(height, offset.y + layer.shape[0])
+
+        if xmax <= xmin or ymax <= ymin:
+            continue
+
+        src = layer[ymin - offset.y:ymax - offset.y, xmin - offset.x:xmax - offset.x]
+        base = out[ymin:ymax, xmin:xmax]
+
+        if blend_mode is BlendMode.DIFFERENCE:
+            result = np.abs(base.astype(np.float64) - src[..., :3].astype(np.float64) * (src[..., 3:] / 255.0))
+            out[ymin:ymax, xmin:xmax] = np.clip(result, 0.0, 255.0).astype(np.uint8)
+        else:
+            out[ymin:ymax, xmin:xmax] = alpha_composite(src[..., :3], base, src[..., 3:] / 255.0)
+
+    return out
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    height, width = 1080, 1920
+
+    for n in (2, 4, 8):
+        layers = [rng.integers(0, 256, (height, width, 4), np.uint8) for _ in range(n)]
+        blend_modes = [BlendMode.NORMAL if i % 3 else BlendMode.DIFFERENCE for i in range(n)]
+        offsets = [Int2(int(rng.integers(-200, 200)), int(rng.integers(-200, 200))) for _ in range(n)]
+
+        expected = np.full((height, width, 3), 255, np.uint8)
+        start = time.perf_counter()
+        composite_per_layer(layers, blend_modes, offsets, expected)
+        per_layer_time = time.perf_counter() - start
+
+        result = np.full((height, width, 3), 255, np.uint8)
+        start = time.perf_counter()
+        composite_stack(layers, blend_modes, offsets, result)
+        stack_time = time.perf_counter() - start
+
+        # 浮動小数点数版は切り捨てのため、レイヤー毎に最大 1 の差が累積します
+        diff = np.abs(expected.astype(np.int16) - result).max()
+        assert diff <= n, f"composite_stack differs by {diff}."
+
+        print(f"{n} layers {width}x{height}  per layer {per_layer_time * 1.0e3:>8.2f} ms  composite_stack {stack_time * 1.0e3:>8.2f} ms  x{per_layer_time / stack_time:.1f}  max diff {diff}")
+
+
+if __name__ == "__main__":
+    main()
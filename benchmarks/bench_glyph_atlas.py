@@ -0,0 +1,64 @@
+"""グリフアトラスによる文字描画の速度比較
+
+rein_text_draw.draw_text_layout (ImageDraw.text) と GlyphAtlas.draw_text_layout を比較し、画素値の一致も確認します。
+
+    python -m reinlib.benchmarks.bench_glyph_atlas
+"""
+import time
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_color_method import ColorMethod
+from reinlib.types.rein_text_layout import TextLayout
+from reinlib.utility.rein_text_draw import draw_text_layout
+from reinlib.utility.rein_glyph_atlas import GlyphAtlas
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    font = ImageFont.truetype("DejaVuSans.ttf", 32, layout_engine=ImageFont.Layout.BASIC)
+
+    charset = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789")
+    texts = ["".join(rng.choice(charset, 12)) for _ in range(500)]
+    text_pos = Int2(8, 40)
+    size = (320, 56)
+
+    layouts = {
+        "plain": TextLayout(font, Color(32, 32, 32, 255), anchor="ls"),
+        "outline": TextLayout(font, Color(255, 255, 255, 255), is_outline=True, outline_weight=2, anchor="ls"),
+        "outline+shadow": TextLayout(font, Color(255, 255, 255, 255), is_outline=True, outline_weight=2, is_shadow=True, shadow_weight=1, shadow_offset=Int2(2, 2), anchor="ls"),
+    }
+
+    atlas = GlyphAtlas(font)
+    canvas = np.empty(size[::-1] + (3, ), np.uint8)
+
+    for name, layout in layouts.items():
+        start = time.perf_counter()
+        for text in texts:
+            image = Image.new("RGB", size, (200, 200, 200))
+            draw_text_layout(ImageDraw.Draw(image), text_pos, text, layout, ColorMethod.COLOR)
+            reference = np.asarray(image)
+        elapsed_pil = (time.perf_counter() - start) / len(texts)
+
+        start = time.perf_counter()
+        for text in texts:
+            canvas.fill(200)
+            atlas.draw_text_layout(canvas, text_pos, text, layout, ColorMethod.COLOR)
+        elapsed_atlas = (time.perf_counter() - start) / len(texts)
+
+        assert np.array_equal(reference, canvas), f"{name}: pixel mismatch."
+
+        print(
+            f"{name:<16}"
+            f" ImageDraw {elapsed_pil * 1.0e6:>8.1f} us/line"
+            f"  GlyphAtlas {elapsed_atlas * 1.0e6:>8.1f} us/line"
+            f"  x{elapsed_pil / elapsed_atlas:.2f}"
+        )
+
+    print(f"glyphs {len(atlas)}  hits {atlas.hits}  misses {atlas.misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""行の帯による並列化のスケーリング計測
+
+alpha_composite, composite_stack, DIFFERENCE の apply_blend を workers = 1 ~ os.cpu_count() で計測します。
+結果が workers に依存しないことも確認します。
+
+    python -m reinlib.benchmarks.bench_parallel
+"""
+import os
+import time
+from typing import Callable
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_blend_mode import BlendMode
+from reinlib.utility.rein_image import alpha_composite, composite_stack
+from reinlib.utility.rein_blend import apply_blend
+
+
+def measure(name:str, func:Callable[[int], npt.NDArray[np.uint8]], repeat:int = 5) -> None:
+    """workers 毎の実行時間を表示
+
+    Args:
+        name (str): 表示名
+        func (Callable[[int], npt.NDArray[np.uint8]]): workers を受け取る計測対象
+        repeat (int, optional): 繰り返し回数. Defaults to 5.
+    """
+    expected = func(1).copy()
+    base_time = 0.0
+
+    for workers in sorted({1, 2, 4, 8, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            result = func(workers)
+        elapsed = (time.perf_counter() - start) / repeat
+
+        assert np.array_equal(result, expected), f"{name} result depends on workers={workers}."
+
+        base_time = base_time or elapsed
+        print(f"{name:<16} workers={workers:<3} {elapsed * 1.0e3:>8.2f} ms  x{base_time / elapsed:.2f}")
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    height, width = 2160, 3840
+
+    src = rng.integers(0, 256, (height, width, 3), np.uint8)
+    dst = rng.integers(0, 256, (height, width, 3), np.uint8)
+    alpha = rng.integers(0, 256, (height, width, 1), np.uint8)
+    out = np.empty_like(dst)
+
+    layers = [rng.integers(0, 256, (height, width, 4), np.uint8) for _ in range(4)]
+    blend_modes = [BlendMode.NORMAL, BlendMode.DIFFERENCE, BlendMode.MULTIPLY, BlendMode.NORMAL]
+    offsets = [Int2(0, 0)] * len(layers)
+
+    print(f"{width}x{height}, os.cpu_count()={os.cpu_count()}")
+
+    measure("alpha_composite", lambda workers: alpha_composite(src, dst, alpha, out=out, tile_size=512, workers=workers))
+    measure("difference", lambda workers: apply_blend(dst, src, alpha, BlendMode.DIFFERENCE, out=out, workers=workers))
+
+    def flatten(workers:int) -> npt.NDArray[np.uint8]:
+        out.fill(255)
+        return composite_stack(layers, blend_modes, offsets, out, workers=workers)
+
+    measure("composite_stack", flatten, repeat=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""縁取りと影の描画の速度比較
+
+draw_text_layout (影と縁取りを個別にラスタライズ) と、
+文字のマスクを 1 回だけラスタライズして膨張で修飾を作成する場合を比較します。
+
+    python -m reinlib.benchmarks.bench_text_decoration
+"""
+import time
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_color_method import ColorMethod
+from reinlib.types.rein_text_layout import TextLayout
+from reinlib.utility.rein_glyph_atlas import GlyphAtlas
+from reinlib.utility.rein_text_draw import draw_text_layout, draw_text_layout_array
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    font = ImageFont.truetype("DejaVuSans.ttf", 32)
+
+    charset = list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789")
+    texts = ["".join(rng.choice(charset, 12)) for _ in range(300)]
+    text_pos = Int2(8, 40)
+    size = (340, 60)
+
+    atlas = GlyphAtlas(font)
+
+    for outline_weight, shadow_weight in ((1, 0), (2, 1), (4, 2)):
+        layout = TextLayout(
+            font,
+            Color(255, 255, 255, 255),
+            is_outline=True,
+            outline_weight=outline_weight,
+            is_shadow=True,
+            shadow_weight=shadow_weight,
+            shadow_offset=Int2(2, 2),
+            anchor="ls",
+        )
+
+        def two_pass() -> None:
+            image = Image.new("RGB", size, (128, 128, 128))
+            drawer = ImageDraw.Draw(image)
+            for text in texts:
+                draw_text_layout(drawer, text_pos, text, layout, ColorMethod.COLOR)
+
+        def single_pass_image_draw() -> None:
+            image = Image.new("RGB", size, (128, 128, 128))
+            drawer = ImageDraw.Draw(image)
+            for text in texts:
+                draw_text_layout(drawer, text_pos, text, layout, ColorMethod.COLOR, is_single_rasterization=True)
+
+        def single_pass_array() -> None:
+            canvas = np.full(size[::-1] + (3, ), 128, np.uint8)
+            for text in texts:
+                draw_text_layout_array(canvas, text_pos, text, layout, ColorMethod.COLOR)
+
+        def single_pass_atlas() -> None:
+            canvas = np.full(size[::-1] + (3, ), 128, np.uint8)
+            for text in texts:
+                draw_text_layout_array(canvas, text_pos, text, layout, ColorMethod.COLOR, atlas)
+
+        print(f"outline_weight={outline_weight} shadow_weight={shadow_weight}")
+        for name, func in (
+            ("draw_text_layout", two_pass),
+            ("is_single_rasterization", single_pass_image_draw),
+            ("draw_text_layout_array", single_pass_array),
+            ("  + GlyphAtlas", single_pass_atlas),
+        ):
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) / len(texts)
+            print(f"  {name:<24} {elapsed * 1.0e6:>8.1f} us/line")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,7 @@ from reinlib.types.rein_bounding_box import BoundingBox
 from reinlib.types.rein_int2 import Int2
 from reinlib.types.rein_size2d import Size2D
 from reinlib.types.rein_blend_mode import BlendMode
-from reinlib.utility.rein_image import alpha_composite
+from reinlib.utility.rein_image import composite_stack
 from reinlib.utility.rein_math import clamp
 
 
@@ -603,6 +603,8 @@ class LayerInfo:
     lid:LayerId = -1
     # 元画像 (スケール適用前)
     image:Optional[npt.NDArray[np.uint8]] = None
+    # RGBA (スケール適用後)
+    rgba:Optional[npt.NDArray[np.uint8]] = None
     # RGB (スケール適用後)
     color:Optional[npt.NDArray[np.uint8]] = None
     # Alpha (スケール適用後)
@@ -724,6 +726,7 @@ class LayerInfo:
             image = image.resize(self.size2.wh, resample=Image.Resampling.BILINEAR)
             image = np.array(image)
 
+        self.rgba = image
         self.color, self.alpha = np.dsplit(image, (3, ))
 
 
@@ -742,7 +745,17 @@ class ImageLayerCanvas:
     def __init__(
         self,
         master:tk.Misc,
+        workers:Optional[int] = None,
     ) -> None:
+        """コンストラクタ
+
+        Args:
+            master (tk.Misc): master
+            workers (Optional[int], optional): SceneColor を並列に合成する帯の数、None の場合はメインスレッドで合成. Defaults to None.
+        """
+        # SceneColor の合成の並列数
+        self.workers = workers
+
         # メインキャンバス
         self.tk_canvas = ttk.Canvas(master)
 
@@ -1439,50 +1452,16 @@ class ImageLayerCanvas:
 
         scene_color = np.full((max_height, max_width, 3), (255, 255, 255), np.uint8)
 
-        for layer in sorted(self.layers, key=lambda layer:layer.depth):
-            if not layer.is_visible:  # 可視性が無効なレイヤーはスキップ
-                continue
-
-            # 始点が画面外の場合、座標の符号は負.
-            # 絶対値を取ることで画面外部分を切り取る.
-            src_xmin = abs(layer.position2.x) if layer.position2.x < 0 else 0
-            src_ymin = abs(layer.position2.y) if layer.position2.y < 0 else 0
-
-            src_xmax = layer.size2.w - max(0, layer.xmax2 - max_width)
-            src_ymax = layer.size2.h - max(0, layer.ymax2 - max_height)
+        # 可視性が無効なレイヤーはスキップ
+        layers = [layer for layer in sorted(self.layers, key=lambda layer:layer.depth) if layer.is_visible]
 
-            dst_xmin = max(0, layer.position2.x)
-            dst_ymin = max(0, layer.position2.y)
-
-            dst_xmax = min(max_width,  layer.xmax2)
-            dst_ymax = min(max_height, layer.ymax2)
-
-            src_width  = src_xmax - src_xmin
-            src_height = src_ymax - src_ymin
-
-            dst_width  = dst_xmax - dst_xmin
-            dst_height = dst_ymax - dst_ymin
-
-            if layer.depth == 1:
-                pass
-
-            if src_width < 0 or dst_width < 0 or src_height < 0 or dst_height < 0:
-                continue
-
-            if layer.blend_mode is BlendMode.DIFFERENCE:
-                base  = scene_color[dst_ymin:dst_ymax, dst_xmin:dst_xmax].astype(np.float64)
-                blend = layer.color[src_ymin:src_ymax, src_xmin:src_xmax].astype(np.float64)
-                alpha = layer.alpha[src_ymin:src_ymax, src_xmin:src_xmax] / 255.0
-                result = np.clip(np.abs(base - blend * alpha), 0.0, 255.0).astype(np.uint8)
-                scene_color[dst_ymin:dst_ymax, dst_xmin:dst_xmax] = result
-            elif layer.blend_mode is BlendMode.NORMAL:
-                scene_color[dst_ymin:dst_ymax, dst_xmin:dst_xmax] = alpha_composite(
-                    layer.color[src_ymin:src_ymax, src_xmin:src_xmax],
-                    scene_color[dst_ymin:dst_ymax, dst_xmin:dst_xmax],
-                    layer.alpha[src_ymin:src_ymax, src_xmin:src_xmax] / 255.0,
-                )
-            else:
-                assert False, f"{layer.blend_mode} is an unsupported blend mode."
+        composite_stack(
+            [layer.rgba for layer in layers],
+            [layer.blend_mode for layer in layers],
+            [layer.position2 for layer in layers],
+            scene_color,
+            workers=self.workers,
+        )
 
         new_scrollregion = self.create_scrollregion(max_width, max_height)
 
@@ -13,6 +13,16 @@ class BlendMode(IntEnum):
     NORMAL = auto()
     # 差の絶対値
     DIFFERENCE = auto()
+    # 乗算
+    MULTIPLY = auto()
+    # スクリーン
+    SCREEN = auto()
+    # オーバーレイ
+    OVERLAY = auto()
+    # 加算
+    ADD = auto()
+    # 減算
+    SUBTRACT = auto()
 
     @staticmethod
     def from_str(blend_mode:str) -> "BlendMode":
@@ -30,5 +40,15 @@ class BlendMode(IntEnum):
             return "Normal"
         elif self is BlendMode.DIFFERENCE:
             return "Difference"
+        elif self is BlendMode.MULTIPLY:
+            return "Multiply"
+        elif self is BlendMode.SCREEN:
+            return "Screen"
+        elif self is BlendMode.OVERLAY:
+            return "Overlay"
+        elif self is BlendMode.ADD:
+            return "Add"
+        elif self is BlendMode.SUBTRACT:
+            return "Subtract"
         else:
             assert False, "not support."
@@ -10,6 +10,8 @@ __all__ = [
 
 @dataclass
 class BoundingBox(Int4Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         xmin:int,
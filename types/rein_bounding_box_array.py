@@ -0,0 +1,244 @@
+from typing import Iterator, Optional, Self
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_bounding_box import BoundingBox
+
+
+__all__ = [
+    "BoundingBoxArray",
+]
+
+
+class BoundingBoxArray:
+    """バウンディングボックスの配列
+
+    (N, 4) の int64 配列 [xmin, ymin, xmax, ymax] で保持します。
+    BoundingBox 単位のプロパティ呼び出しを NumPy の一括演算に置き換えるためのコンテナです。
+    """
+    def __init__(self, data:npt.ArrayLike) -> None:
+        """コンストラクタ
+
+        Args:
+            data (npt.ArrayLike): (N, 4) の [xmin, ymin, xmax, ymax]
+        """
+        data = np.asarray(data, dtype=np.int64)
+        if data.size == 0:
+            data = data.reshape(0, 4)
+        assert data.ndim == 2 and data.shape[1] == 4, f"'data' only supports (N, 4) shape, the input shape was {data.shape}."
+        self.data = data
+
+    @classmethod
+    def from_bboxes(cls, bboxes:list[BoundingBox]) -> Self:
+        """BoundingBoxのリストから作成
+
+        Args:
+            bboxes (list[BoundingBox]): バウンディングボックスのリスト
+
+        Returns:
+            Self: BoundingBoxArray
+        """
+        return cls(BoundingBox.to_array(bboxes))
+
+    def to_bboxes(self) -> list[BoundingBox]:
+        """BoundingBoxのリストに変換
+
+        Returns:
+            list[BoundingBox]: バウンディングボックスのリスト
+        """
+        return BoundingBox.from_array(self.data)
+
+    @classmethod
+    def zeros(cls, n:int) -> Self:
+        """ゼロ値で作成
+
+        Args:
+            n (int): 要素数
+
+        Returns:
+            Self: BoundingBoxArray
+        """
+        return cls(np.zeros((n, 4), np.int64))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[BoundingBox]:
+        return iter(self.to_bboxes())
+
+    def __getitem__(self, index:int | slice | npt.NDArray[np.bool_ | np.int64]) -> BoundingBox | Self:
+        if isinstance(index, (int, np.integer)):
+            return BoundingBox(*self.data[index].tolist())
+        return type(self)(self.data[index])
+
+    def __array__(self, dtype:npt.DTypeLike = None, copy:bool | None = None) -> npt.NDArray:
+        return self.data if dtype is None else self.data.astype(dtype)
+
+    @property
+    def xmin(self) -> npt.NDArray[np.int64]:
+        """左上のx座標を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 左上のx座標
+        """
+        return self.data[:, 0]
+
+    @property
+    def ymin(self) -> npt.NDArray[np.int64]:
+        """左上のy座標を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 左上のy座標
+        """
+        return self.data[:, 1]
+
+    @property
+    def xmax(self) -> npt.NDArray[np.int64]:
+        """右下のx座標を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 右下のx座標
+        """
+        return self.data[:, 2]
+
+    @property
+    def ymax(self) -> npt.NDArray[np.int64]:
+        """右下のy座標を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 右下のy座標
+        """
+        return self.data[:, 3]
+
+    @property
+    def width(self) -> npt.NDArray[np.int64]:
+        """横幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 横幅
+        """
+        return self.xmax - self.xmin
+
+    @property
+    def height(self) -> npt.NDArray[np.int64]:
+        """縦幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 縦幅
+        """
+        return self.ymax - self.ymin
+
+    @property
+    def w(self) -> npt.NDArray[np.int64]:
+        """横幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 横幅
+        """
+        return self.width
+
+    @property
+    def h(self) -> npt.NDArray[np.int64]:
+        """縦幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) 縦幅
+        """
+        return self.height
+
+    @property
+    def wh(self) -> npt.NDArray[np.int64]:
+        """横幅と縦幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N, 2) 横幅と縦幅
+        """
+        return self.data[:, 2:] - self.data[:, :2]
+
+    @property
+    def hw(self) -> npt.NDArray[np.int64]:
+        """縦幅と横幅を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N, 2) 縦幅と横幅
+        """
+        return self.wh[:, ::-1]
+
+    @property
+    def center(self) -> npt.NDArray[np.int64]:
+        """中心座標を取得
+
+        BoundingBox.center と同様に幅の切り捨て除算で計算します。
+
+        Returns:
+            npt.NDArray[np.int64]: (N, 2) 中心座標
+        """
+        return self.data[:, :2] + self.wh // 2
+
+    @property
+    def area(self) -> npt.NDArray[np.int64]:
+        """バウンディングボックスの面積を取得
+
+        Returns:
+            npt.NDArray[np.int64]: (N,) バウンディングボックスの面積
+        """
+        return self.width * self.height
+
+    def union(self) -> BoundingBox:
+        """全要素を内包するバウンディングボックスを取得
+
+        BoundingBox.test の一括版です。空の場合はゼロ値を返します。
+
+        Returns:
+            BoundingBox: 全要素を内包するバウンディングボックス
+        """
+        if len(self) == 0:
+            return BoundingBox.zero()
+
+        xmin, ymin = self.data[:, :2].min(axis=0).tolist()
+        xmax, ymax = self.data[:, 2:].max(axis=0).tolist()
+        return BoundingBox(xmin, ymin, xmax, ymax)
+
+    def collision(self, rhs:BoundingBox) -> npt.NDArray[np.bool_]:
+        """各要素と指定したバウンディングボックスの衝突判定
+
+        BoundingBox.collision と同様に辺上の接触も衝突として扱います。
+
+        Args:
+            rhs (BoundingBox): 判定対象
+
+        Returns:
+            npt.NDArray[np.bool_]: (N,) 衝突している場合は True
+        """
+        xmin, ymin, xmax, ymax = rhs
+        return (self.xmin <= xmax) & (xmin <= self.xmax) & (self.ymin <= ymax) & (ymin <= self.ymax)
+
+    def collisions(self, rhs:BoundingBox) -> bool:
+        """いずれかの要素と衝突しているか判定
+
+        Args:
+            rhs (BoundingBox): 判定対象
+
+        Returns:
+            bool: 衝突している要素がある場合は True
+        """
+        return bool(self.collision(rhs).any())
+
+    def collision_matrix(self, rhs:Optional["BoundingBoxArray"] = None) -> npt.NDArray[np.bool_]:
+        """総当たりの衝突判定
+
+        Args:
+            rhs (Optional[BoundingBoxArray], optional): 判定対象、None の場合は自身との総当たり. Defaults to None.
+
+        Returns:
+            npt.NDArray[np.bool_]: (N, M) 衝突している組み合わせは True
+        """
+        rhs = self if rhs is None else rhs
+        lhs_data = self.data[:, np.newaxis, :]
+        rhs_data = rhs.data[np.newaxis, :, :]
+        return (
+            (lhs_data[..., 0] <= rhs_data[..., 2]) &
+            (rhs_data[..., 0] <= lhs_data[..., 2]) &
+            (lhs_data[..., 1] <= rhs_data[..., 3]) &
+            (rhs_data[..., 1] <= lhs_data[..., 3])
+        )
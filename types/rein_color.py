@@ -13,6 +13,8 @@ __all__ = [
 
 @dataclass
 class Color(Int4Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         red:int,
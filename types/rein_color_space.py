@@ -0,0 +1,245 @@
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_color import Color
+
+
+__all__ = [
+    "hsv_to_rgb",
+    "rgb_to_hsv",
+    "hsl_to_rgb",
+    "rgb_to_hsl",
+    "hsv_to_colors",
+    "jitter_hue_saturation",
+]
+
+
+# 色相の区切り (60度毎)
+HUE_SECTOR_EDGES = np.array([60, 120, 180, 240, 300], np.float64)
+
+# 色相の区間毎の (c, x, 0) から (r, g, b) への並び替え
+HUE_SECTOR_ORDERS = np.array([
+    [0, 1, 2],  # [  0,  60) : (c, x, 0)
+    [1, 0, 2],  # [ 60, 120) : (x, c, 0)
+    [2, 0, 1],  # [120, 180) : (0, c, x)
+    [2, 1, 0],  # [180, 240) : (0, x, c)
+    [1, 2, 0],  # [240, 300) : (x, 0, c)
+    [0, 2, 1],  # [300, 360) : (c, 0, x)
+], np.intp)
+
+
+def _split_channels(values:npt.ArrayLike) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """(..., 3) の配列をチャンネル毎の float64 に分割
+
+    Args:
+        values (npt.ArrayLike): (..., 3) の配列
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]: チャンネル毎の配列
+    """
+    values = np.asarray(values)
+    assert values.shape[-1] == 3, f"the last dimension only supports 3 channels, the input shape was {values.shape}."
+    values = values.astype(np.float64, copy=False)
+    return values[..., 0], values[..., 1], values[..., 2]
+
+
+def _chroma_to_rgb(
+    h:npt.NDArray[np.float64],
+    c:npt.NDArray[np.float64],
+    m:npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """色相、彩度(chroma)、明度の下限からRGBを計算
+
+    区間の判定は Color.from_hsv と同じく比較演算で行います。
+
+    Args:
+        h (npt.NDArray[np.float64]): 色相 [0 ~ 360]
+        c (npt.NDArray[np.float64]): chroma [0.0 ~ 1.0]
+        m (npt.NDArray[np.float64]): 明度の下限 [0.0 ~ 1.0]
+
+    Returns:
+        npt.NDArray[np.float64]: (..., 3) RGB [0.0 ~ 1.0]
+    """
+    x = c * (1 - np.abs((h / 60) % 2 - 1))
+
+    # 360度は Color.from_hsv と同じく [0, 60) の区間として扱う
+    sector = np.searchsorted(HUE_SECTOR_EDGES, h, side="right")
+    sector[h >= 360] = 0
+
+    cx0 = np.stack((c, x, np.zeros_like(c)), axis=-1)
+    rgb = np.take_along_axis(cx0, HUE_SECTOR_ORDERS[sector], axis=-1)
+    rgb += m[..., np.newaxis]
+    return rgb
+
+
+def _to_dtype(rgb:npt.NDArray[np.float64], dtype:npt.DTypeLike) -> npt.NDArray:
+    """[0.0 ~ 1.0] のRGBを指定の型に変換
+
+    整数型の場合は Color.from_hsv と同じく255倍して切り捨てます。
+
+    Args:
+        rgb (npt.NDArray[np.float64]): RGB [0.0 ~ 1.0]
+        dtype (npt.DTypeLike): 変換後の型
+
+    Returns:
+        npt.NDArray: 変換後のRGB
+    """
+    if np.issubdtype(dtype, np.integer):
+        return (rgb * 255).astype(dtype)
+    return rgb.astype(dtype, copy=False)
+
+
+def hsv_to_rgb(hsv:npt.ArrayLike, dtype:npt.DTypeLike = np.uint8) -> npt.NDArray:
+    """HSVからRGBに一括変換
+
+    (N, 3) や (H, W, 3) など末尾が3チャンネルの配列を扱います。
+    整数型で出力した場合は Color.from_hsv と同じ値になります。
+
+    Args:
+        hsv (npt.ArrayLike): (..., 3) HSV、色相 [0 ~ 360], 彩度 [0 ~ 100], 明度 [0 ~ 100]
+        dtype (npt.DTypeLike, optional): 出力の型、浮動小数点型の場合は [0.0 ~ 1.0]. Defaults to np.uint8.
+
+    Returns:
+        npt.NDArray: (..., 3) RGB
+    """
+    h, s, v = _split_channels(hsv)
+
+    h = np.clip(h, 0, 360)
+    s = s * 0.01
+    v = v * 0.01
+
+    c = v * s
+    return _to_dtype(_chroma_to_rgb(h, c, v - c), dtype)
+
+
+def hsl_to_rgb(hsl:npt.ArrayLike, dtype:npt.DTypeLike = np.uint8) -> npt.NDArray:
+    """HSLからRGBに一括変換
+
+    Args:
+        hsl (npt.ArrayLike): (..., 3) HSL、色相 [0 ~ 360], 彩度 [0 ~ 100], 輝度 [0 ~ 100]
+        dtype (npt.DTypeLike, optional): 出力の型、浮動小数点型の場合は [0.0 ~ 1.0]. Defaults to np.uint8.
+
+    Returns:
+        npt.NDArray: (..., 3) RGB
+    """
+    h, s, l = _split_channels(hsl)
+
+    h = np.clip(h, 0, 360)
+    s = s * 0.01
+    l = l * 0.01
+
+    c = (1 - np.abs(2 * l - 1)) * s
+    return _to_dtype(_chroma_to_rgb(h, c, l - c * 0.5), dtype)
+
+
+def _rgb_to_hue(rgb:npt.ArrayLike) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """RGBから色相、最大値、最小値を計算
+
+    Args:
+        rgb (npt.ArrayLike): (..., 3) RGB、整数型は [0 ~ 255], 浮動小数点型は [0.0 ~ 1.0]
+
+    Returns:
+        tuple[npt.NDArray[np.float64], npt.NDArray[np.float64], npt.NDArray[np.float64]]: 色相 [0 ~ 360), 最大値, 最小値 [0.0 ~ 1.0]
+    """
+    rgb = np.asarray(rgb)
+    is_integer = np.issubdtype(rgb.dtype, np.integer)
+    r, g, b = _split_channels(rgb)
+    if is_integer:
+        r, g, b = r / 255.0, g / 255.0, b / 255.0
+
+    maximum = np.maximum(np.maximum(r, g), b)
+    minimum = np.minimum(np.minimum(r, g), b)
+    delta = maximum - minimum
+    safe_delta = np.where(delta > 0.0, delta, 1.0)
+
+    h = np.where(
+        maximum == r,
+        ((g - b) / safe_delta) % 6,
+        np.where(maximum == g, (b - r) / safe_delta + 2, (r - g) / safe_delta + 4),
+    )
+    h = np.where(delta > 0.0, h * 60, 0.0)
+
+    return h, maximum, minimum
+
+
+def rgb_to_hsv(rgb:npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """RGBからHSVに一括変換
+
+    Args:
+        rgb (npt.ArrayLike): (..., 3) RGB、整数型は [0 ~ 255], 浮動小数点型は [0.0 ~ 1.0]
+
+    Returns:
+        npt.NDArray[np.float64]: (..., 3) HSV、色相 [0 ~ 360), 彩度 [0 ~ 100], 明度 [0 ~ 100]
+    """
+    h, maximum, minimum = _rgb_to_hue(rgb)
+
+    s = np.where(maximum > 0.0, (maximum - minimum) / np.where(maximum > 0.0, maximum, 1.0), 0.0)
+
+    return np.stack((h, s * 100, maximum * 100), axis=-1)
+
+
+def rgb_to_hsl(rgb:npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """RGBからHSLに一括変換
+
+    Args:
+        rgb (npt.ArrayLike): (..., 3) RGB、整数型は [0 ~ 255], 浮動小数点型は [0.0 ~ 1.0]
+
+    Returns:
+        npt.NDArray[np.float64]: (..., 3) HSL、色相 [0 ~ 360), 彩度 [0 ~ 100], 輝度 [0 ~ 100]
+    """
+    h, maximum, minimum = _rgb_to_hue(rgb)
+
+    l = (maximum + minimum) * 0.5
+    denominator = 1 - np.abs(2 * l - 1)
+    s = np.where(denominator > 0.0, (maximum - minimum) / np.where(denominator > 0.0, denominator, 1.0), 0.0)
+
+    return np.stack((h, s * 100, l * 100), axis=-1)
+
+
+def hsv_to_colors(hsv:npt.ArrayLike, alpha:int = 255) -> list[Color]:
+    """HSVからColorのリストに一括変換
+
+    Color.from_hsv を要素毎に呼び出した場合と同じ結果になります。
+
+    Args:
+        hsv (npt.ArrayLike): (N, 3) HSV
+        alpha (int, optional): 透明度. Defaults to 255.
+
+    Returns:
+        list[Color]: Colorのリスト
+    """
+    rgb = hsv_to_rgb(hsv, np.int64).reshape(-1, 3).tolist()
+    return [Color.from_unchecked(r, g, b, alpha) for r, g, b in rgb]
+
+
+def jitter_hue_saturation(
+    image:npt.NDArray[np.uint8],
+    hue_shift:float,
+    saturation_scale:float,
+) -> npt.NDArray[np.uint8]:
+    """画像の色相と彩度を変更
+
+    透明度チャンネルは変更しません。
+
+    Args:
+        image (npt.NDArray[np.uint8]): (H, W, 3) RGB または (H, W, 4) RGBA
+        hue_shift (float): 色相の移動量 (度)
+        saturation_scale (float): 彩度の倍率
+
+    Returns:
+        npt.NDArray[np.uint8]: 変更後の画像
+    """
+    assert image.dtype == np.uint8, f"'image' only supports uint8, the input dtype was {image.dtype}."
+
+    h, maximum, minimum = _rgb_to_hue(image[..., :3])
+
+    h = (h + hue_shift) % 360
+    s = np.where(maximum > 0.0, (maximum - minimum) / np.where(maximum > 0.0, maximum, 1.0), 0.0)
+    s = np.clip(s * saturation_scale, 0.0, 1.0)
+
+    c = maximum * s
+    rgb = _chroma_to_rgb(h, c, maximum - c)
+
+    result = image.copy()
+    result[..., :3] = np.rint(rgb * 255)
+    return result
@@ -10,6 +10,8 @@ __all__ = [
 
 @dataclass
 class Float2(Float2Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         x:float,
@@ -1,7 +1,11 @@
 import math
-from typing import Iterator, Self
+from typing import Iterator, Optional, Self
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from itertools import chain, starmap
+from operator import attrgetter
+import numpy as np
+import numpy.typing as npt
 
 from reinlib.utility.rein_math import pow2
 
@@ -11,7 +15,11 @@ __all__ = [
 ]
 
 
-@dataclass
+# 全要素の一括取得
+FLOAT2_GETTER = attrgetter("_x", "_y")
+
+
+@dataclass(slots=True)
 class Float2Abstract(ABC):
     _x:float = 0.0
     _y:float = 0.0
@@ -30,38 +38,87 @@ class Float2Abstract(ABC):
         """
         return Float2Abstract(*args, **kwargs)
 
+    @classmethod
+    def from_unchecked(cls, x:float, y:float) -> Self:
+        """型検査を省略して作成
+
+        演算子など、要素の型が保証されている内部処理向けの高速なコンストラクタです。
+
+        Args:
+            x (float): x成分
+            y (float): y成分
+
+        Returns:
+            Self: _description_
+        """
+        instance = object.__new__(cls)
+        instance._x = x
+        instance._y = y
+        return instance
+
     def __iter__(self) -> Iterator[float]:
         return iter((self._x, self._y))
 
+    def __array__(self, dtype:npt.DTypeLike = None, copy:Optional[bool] = None) -> npt.NDArray:
+        return np.array((self._x, self._y), np.float64 if dtype is None else dtype)
+
+    @classmethod
+    def to_array(cls, values:list[Self], dtype:npt.DTypeLike = np.float64) -> npt.NDArray:
+        """リストを一括で配列に変換
+
+        要素毎の __iter__ を経由せずに変換します。
+
+        Args:
+            values (list[Self]): 変換するリスト
+            dtype (npt.DTypeLike, optional): 配列の型. Defaults to np.float64.
+
+        Returns:
+            npt.NDArray: (N, 2) 配列
+        """
+        return np.fromiter(chain.from_iterable(map(FLOAT2_GETTER, values)), dtype, 2 * len(values)).reshape(-1, 2)
+
+    @classmethod
+    def from_array(cls, array:npt.ArrayLike) -> list[Self]:
+        """配列からリストを一括で作成
+
+        Args:
+            array (npt.ArrayLike): (N, 2) 配列
+
+        Returns:
+            list[Self]: 作成したリスト
+        """
+        array = np.asarray(array, np.float64)
+        return list(starmap(cls.from_unchecked, array.reshape(-1, 2).tolist()))
+
     def __add__(self, rhs:float | Self) -> Self:
         if isinstance(rhs, float):
-            return self.static_class(self._x + rhs, self._y + rhs)
+            return self.from_unchecked(self._x + rhs, self._y + rhs)
         elif isinstance(rhs, Float2Abstract):
-            return self.static_class(self._x + rhs._x, self._y + rhs._y)
+            return self.from_unchecked(self._x + rhs._x, self._y + rhs._y)
         else:
             raise NotImplementedError()
 
     def __sub__(self, rhs:float | Self) -> Self:
         if isinstance(rhs, float):
-            return self.static_class(self._x - rhs, self._y - rhs)
+            return self.from_unchecked(self._x - rhs, self._y - rhs)
         elif isinstance(rhs, Float2Abstract):
-            return self.static_class(self._x - rhs._x, self._y - rhs._y)
+            return self.from_unchecked(self._x - rhs._x, self._y - rhs._y)
         else:
             raise NotImplementedError()
 
     def __mul__(self, rhs:float | Self) -> Self:
         if isinstance(rhs, float):
-            return self.static_class(self._x * rhs, self._y * rhs)
+            return self.from_unchecked(self._x * rhs, self._y * rhs)
         elif isinstance(rhs, Float2Abstract):
-            return self.static_class(self._x * rhs._x, self._y * rhs._y)
+            return self.from_unchecked(self._x * rhs._x, self._y * rhs._y)
         else:
             raise NotImplementedError()
 
     def __truediv__(self, rhs:float | Self) -> Self:
         if isinstance(rhs, float):
-            return self.static_class(self._x / rhs, self._y / rhs)
+            return self.from_unchecked(self._x / rhs, self._y / rhs)
         elif isinstance(rhs, Float2Abstract):
-            return self.static_class(self._x / rhs._x, self._y / rhs._y)
+            return self.from_unchecked(self._x / rhs._x, self._y / rhs._y)
         else:
             raise NotImplementedError()
 
@@ -11,6 +11,8 @@ __all__ = [
 
 @dataclass
 class Float4(Float4Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         x:float,
@@ -1,6 +1,10 @@
-from typing import Iterator, Self
+from typing import Iterator, Optional, Self
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from itertools import chain, starmap
+from operator import attrgetter
+import numpy as np
+import numpy.typing as npt
 
 
 __all__ = [
@@ -8,7 +12,11 @@ __all__ = [
 ]
 
 
-@dataclass
+# 全要素の一括取得
+FLOAT4_GETTER = attrgetter("_x", "_y", "_z", "_w")
+
+
+@dataclass(slots=True)
 class Float4Abstract(ABC):
     _x:float = 0.0
     _y:float = 0.0
@@ -31,38 +39,91 @@ class Float4Abstract(ABC):
         """
         return Float4Abstract(*args, **kwargs)
 
+    @classmethod
+    def from_unchecked(cls, x:float, y:float, z:float, w:float) -> Self:
+        """型検査を省略して作成
+
+        演算子など、要素の型が保証されている内部処理向けの高速なコンストラクタです。
+
+        Args:
+            x (float): x成分
+            y (float): y成分
+            z (float): z成分
+            w (float): w成分
+
+        Returns:
+            Self: _description_
+        """
+        instance = object.__new__(cls)
+        instance._x = x
+        instance._y = y
+        instance._z = z
+        instance._w = w
+        return instance
+
     def __iter__(self) -> Iterator[float]:
         return iter((self._x, self._y, self._z, self._w))
 
+    def __array__(self, dtype:npt.DTypeLike = None, copy:Optional[bool] = None) -> npt.NDArray:
+        return np.array((self._x, self._y, self._z, self._w), np.float64 if dtype is None else dtype)
+
+    @classmethod
+    def to_array(cls, values:list[Self], dtype:npt.DTypeLike = np.float64) -> npt.NDArray:
+        """リストを一括で配列に変換
+
+        要素毎の __iter__ を経由せずに変換します。
+
+        Args:
+            values (list[Self]): 変換するリスト
+            dtype (npt.DTypeLike, optional): 配列の型. Defaults to np.float64.
+
+        Returns:
+            npt.NDArray: (N, 4) 配列
+        """
+        return np.fromiter(chain.from_iterable(map(FLOAT4_GETTER, values)), dtype, 4 * len(values)).reshape(-1, 4)
+
+    @classmethod
+    def from_array(cls, array:npt.ArrayLike) -> list[Self]:
+        """配列からリストを一括で作成
+
+        Args:
+            array (npt.ArrayLike): (N, 4) 配列
+
+        Returns:
+            list[Self]: 作成したリスト
+        """
+        array = np.asarray(array, np.float64)
+        return list(starmap(cls.from_unchecked, array.reshape(-1, 4).tolist()))
+
     def __add__(self, rhs:float | int | Self) -> Self:
         if isinstance(rhs, (float, int)):
-            return self.static_class(self._x + rhs, self._y + rhs, self._z + rhs, self._w + rhs)
+            return self.from_unchecked(self._x + rhs, self._y + rhs, self._z + rhs, self._w + rhs)
         elif isinstance(rhs, Float4Abstract):
-            return self.static_class(self._x + rhs._x, self._y + rhs._y, self._z + rhs._z, self._w + rhs._w)
+            return self.from_unchecked(self._x + rhs._x, self._y + rhs._y, self._z + rhs._z, self._w + rhs._w)
         else:
             raise NotImplementedError()
 
     def __sub__(self, rhs:float | int | Self) -> Self:
         if isinstance(rhs, (float, int)):
-            return self.static_class(self._x - rhs, self._y - rhs, self._z - rhs, self._w - rhs)
+            return self.from_unchecked(self._x - rhs, self._y - rhs, self._z - rhs, self._w - rhs)
         elif isinstance(rhs, Float4Abstract):
-            return self.static_class(self._x - rhs._x, self._y - rhs._y, self._z - rhs._z, self._w - rhs._w)
+            return self.from_unchecked(self._x - rhs._x, self._y - rhs._y, self._z - rhs._z, self._w - rhs._w)
         else:
             raise NotImplementedError()
 
     def __mul__(self, rhs:float | int | Self) -> Self:
         if isinstance(rhs, (float, int)):
-            return self.static_class(self._x * rhs, self._y * rhs, self._z * rhs, self._w * rhs)
+            return self.from_unchecked(self._x * rhs, self._y * rhs, self._z * rhs, self._w * rhs)
         elif isinstance(rhs, Float4Abstract):
-            return self.static_class(self._x * rhs._x, self._y * rhs._y, self._z * rhs._z, self._w * rhs._w)
+            return self.from_unchecked(self._x * rhs._x, self._y * rhs._y, self._z * rhs._z, self._w * rhs._w)
         else:
             raise NotImplementedError()
 
     def __truediv__(self, rhs:float | Self) -> Self:
         if isinstance(rhs, float):
-            return self.static_class(self._x / rhs, self._y / rhs, self._z / rhs, self._w / rhs)
+            return self.from_unchecked(self._x / rhs, self._y / rhs, self._z / rhs, self._w / rhs)
         elif isinstance(rhs, Float4Abstract):
-            return self.static_class(self._x / rhs._x, self._y / rhs._y, self._z / rhs._z, self._w / rhs._w)
+            return self.from_unchecked(self._x / rhs._x, self._y / rhs._y, self._z / rhs._z, self._w / rhs._w)
         else:
             raise NotImplementedError()
 
@@ -12,6 +12,8 @@ __all__ = [
 
 @dataclass
 class FloatBoundingBox(Float4Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         xmin:float,
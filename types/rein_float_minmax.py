@@ -1,4 +1,8 @@
 from dataclasses import dataclass
+from typing import Optional
+import random
+import numpy as np
+import numpy.typing as npt
 
 from reinlib.types.rein_float2_abc import Float2Abstract
 
@@ -10,6 +14,8 @@ __all__ = [
 
 @dataclass
 class FloatMinMax(Float2Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         minimum:float,
@@ -61,3 +67,37 @@ class FloatMinMax(Float2Abstract):
             new_value (float): 最大値
         """
         self._y = new_value
+
+    def is_valid(self) -> bool:
+        """有効性を取得
+
+        Returns:
+            bool: 最小値と最大値が等しい場合は False を返します。
+        """
+        return self.minimum != self.maximum
+
+    def __call__(self) -> float:
+        """call random.uniform
+
+        Returns:
+            float: 指定された範囲 [minimum, maximum] からランダムに値を選出
+        """
+        return random.uniform(self.minimum, self.maximum) if self.is_valid() else self.minimum
+
+    def sample(self, n:int, rng:Optional[np.random.Generator] = None) -> npt.NDArray[np.float64]:
+        """指定された範囲から一括でランダムに値を選出
+
+        無効な範囲の場合は __call__ と同じく minimum で埋めます。
+
+        Args:
+            n (int): 選出数
+            rng (Optional[np.random.Generator], optional): 乱数生成器、None の場合は新規に作成. Defaults to None.
+
+        Returns:
+            npt.NDArray[np.float64]: (n,) 選出された値
+        """
+        if not self.is_valid():
+            return np.full(n, self.minimum, np.float64)
+
+        rng = np.random.default_rng() if rng is None else rng
+        return rng.uniform(self.minimum, self.maximum, n)
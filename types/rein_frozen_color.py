@@ -0,0 +1,94 @@
+from typing import Iterator, Self
+from dataclasses import dataclass, field
+
+from reinlib.types.rein_color import Color
+
+
+__all__ = [
+    "FrozenColor",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenColor:
+    """変更不可なColor
+
+    ハッシュ値を生成時に計算して保持するため、辞書のキーとして使用できます。
+    """
+    # 赤成分
+    red:int = 0
+    # 緑成分
+    green:int = 0
+    # 青成分
+    blue:int = 0
+    # 透明度
+    alpha:int = 255
+
+    # キャッシュ済みのハッシュ値
+    _hash:int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.red, int), f"{self}.red only supports int type, the input type was {self.red}."
+        assert isinstance(self.green, int), f"{self}.green only supports int type, the input type was {self.green}."
+        assert isinstance(self.blue, int), f"{self}.blue only supports int type, the input type was {self.blue}."
+        assert isinstance(self.alpha, int), f"{self}.alpha only supports int type, the input type was {self.alpha}."
+        object.__setattr__(self, "_hash", hash((self.red, self.green, self.blue, self.alpha)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> tuple:
+        # NOTE: ハッシュ値はプロセス毎に異なる可能性があるため、復元時に再計算します。
+        return self.__class__, (self.red, self.green, self.blue, self.alpha)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.red, self.green, self.blue, self.alpha))
+
+    @property
+    def grayscale(self) -> int:
+        """グレースケールを取得
+
+        内部的にはRチャンネルを指します。
+
+        Returns:
+            int: グレースケール
+        """
+        return self.red
+
+    @property
+    def rgb(self) -> tuple[int, int, int]:
+        """RGB配置で取得
+
+        Returns:
+            tuple[int, int, int]: RGB
+        """
+        return self.red, self.green, self.blue
+
+    @property
+    def rgba(self) -> tuple[int, int, int, int]:
+        """RGBA配置で取得
+
+        Returns:
+            tuple[int, int, int, int]: RGBA
+        """
+        return self.red, self.green, self.blue, self.alpha
+
+    @classmethod
+    def from_color(cls, color:Color) -> Self:
+        """Colorから作成
+
+        Args:
+            color (Color): 変更可能なColor
+
+        Returns:
+            Self: FrozenColor
+        """
+        return cls(color.red, color.green, color.blue, color.alpha)
+
+    def to_color(self) -> Color:
+        """Colorに変換
+
+        Returns:
+            Color: 変更可能なColor
+        """
+        return Color.from_unchecked(self.red, self.green, self.blue, self.alpha)
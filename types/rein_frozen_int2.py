@@ -0,0 +1,65 @@
+from typing import Iterator, Self
+from dataclasses import dataclass, field
+
+from reinlib.types.rein_int2 import Int2
+
+
+__all__ = [
+    "FrozenInt2",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenInt2:
+    """変更不可なInt2
+
+    ハッシュ値を生成時に計算して保持するため、辞書のキーとして使用できます。
+    """
+    x:int = 0
+    y:int = 0
+
+    # キャッシュ済みのハッシュ値
+    _hash:int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        assert isinstance(self.x, int), f"{self}.x only supports int type, the input type was {self.x}."
+        assert isinstance(self.y, int), f"{self}.y only supports int type, the input type was {self.y}."
+        object.__setattr__(self, "_hash", hash((self.x, self.y)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> tuple:
+        # NOTE: ハッシュ値はプロセス毎に異なる可能性があるため、復元時に再計算します。
+        return self.__class__, (self.x, self.y)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y))
+
+    @property
+    def xy(self) -> tuple[int, int]:
+        return self.x, self.y
+
+    @property
+    def yx(self) -> tuple[int, int]:
+        return self.y, self.x
+
+    @classmethod
+    def from_int2(cls, value:Int2) -> Self:
+        """Int2から作成
+
+        Args:
+            value (Int2): 変更可能なInt2
+
+        Returns:
+            Self: FrozenInt2
+        """
+        return cls(value.x, value.y)
+
+    def to_int2(self) -> Int2:
+        """Int2に変換
+
+        Returns:
+            Int2: 変更可能なInt2
+        """
+        return Int2.from_unchecked(self.x, self.y)
@@ -0,0 +1,181 @@
+import hashlib
+from typing import Any, Optional, Self
+from PIL import ImageFont
+from dataclasses import dataclass, field
+
+from reinlib.types.rein_frozen_color import FrozenColor
+from reinlib.types.rein_frozen_int2 import FrozenInt2
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_text_layout import TextLayout
+
+
+__all__ = [
+    "FrozenTextLayout",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenTextLayout:
+    """変更不可なTextLayout
+
+    フォントはオブジェクトではなく絶対パスとサイズで保持します (メモリ上から読み込んだフォントは対応しません)。
+    ハッシュ値を生成時に計算して保持するため、辞書のキーとして使用できます。
+    """
+    # フォントの絶対パス
+    font_path:str = ""
+    # フォントサイズ
+    font_size:int = 0
+    # フォントコレクション内のインデックス
+    font_index:int = 0
+
+    # 文字色
+    color:FrozenColor = FrozenColor(255, 255, 255, 255)
+
+    # 縁取りの有効性
+    is_outline:bool = False
+    # 縁取りの色
+    outline_color:FrozenColor = FrozenColor(0, 0, 0, 255)
+    # 縁取りの太さ
+    outline_weight:int = 1
+
+    # 影の有効性
+    is_shadow:bool = False
+    # 影の色
+    shadow_color:FrozenColor = FrozenColor(0, 0, 0, 255)
+    # 影の太さ
+    shadow_weight:int = 0
+    # 影の位置
+    shadow_offset:FrozenInt2 = FrozenInt2(1, 1)
+
+    # 文字寄せ
+    anchor:Optional[str] = None
+    # 行間サイズ
+    spacing:int = 0
+
+    # 文字領域の中央値 (xmin, ymin, xmax, ymax)
+    median_bbox:Optional[tuple[int, int, int, int]] = None
+
+    # キャッシュ済みのハッシュ値
+    _hash:int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "_hash", hash(self.astuple()))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self) -> tuple:
+        # NOTE: ハッシュ値はプロセス毎に異なる可能性があるため、復元時に再計算します。
+        return self.__class__, self.astuple()
+
+    def astuple(self) -> tuple[Any, ...]:
+        """コンストラクタ引数の順にタプル化
+
+        Returns:
+            tuple[Any, ...]: 全フィールドの値
+        """
+        return (
+            self.font_path,
+            self.font_size,
+            self.font_index,
+            self.color,
+            self.is_outline,
+            self.outline_color,
+            self.outline_weight,
+            self.is_shadow,
+            self.shadow_color,
+            self.shadow_weight,
+            self.shadow_offset,
+            self.anchor,
+            self.spacing,
+            self.median_bbox,
+        )
+
+    def fingerprint_key(self) -> tuple[Any, ...]:
+        """フィンガープリントの算出に使用する値を取得
+
+        TextLayout.fingerprint_key と同じ値を返します。
+
+        Returns:
+            tuple[Any, ...]: フィンガープリントの算出に使用する値
+        """
+        return (
+            self.font_path,
+            self.font_size,
+            self.font_index,
+            self.color.rgba,
+            self.is_outline,
+            self.outline_color.rgba,
+            self.outline_weight,
+            self.is_shadow,
+            self.shadow_color.rgba,
+            self.shadow_weight,
+            self.shadow_offset.xy,
+            self.anchor,
+            self.spacing,
+            self.median_bbox,
+        )
+
+    def fingerprint(self) -> str:
+        """フィンガープリントを取得
+
+        TextLayout.fingerprint と同じ値を返します。
+
+        Returns:
+            str: フィンガープリント (16進数)
+        """
+        return hashlib.blake2b(repr(self.fingerprint_key()).encode("utf-8"), digest_size=16).hexdigest()
+
+    @classmethod
+    def from_text_layout(cls, layout:TextLayout) -> Self:
+        """TextLayoutから作成
+
+        Args:
+            layout (TextLayout): 変更可能なTextLayout
+
+        Returns:
+            Self: FrozenTextLayout
+        """
+        return cls(
+            layout.font_path,
+            layout.font_size,
+            layout.font_index,
+            FrozenColor.from_color(layout.color),
+            layout.is_outline,
+            FrozenColor.from_color(layout.outline_color),
+            layout.outline_weight,
+            layout.is_shadow,
+            FrozenColor.from_color(layout.shadow_color),
+            layout.shadow_weight,
+            FrozenInt2.from_int2(layout.shadow_offset),
+            layout.anchor,
+            layout.spacing,
+            tuple(layout.median_bbox) if layout.median_bbox is not None else None,
+        )
+
+    def to_text_layout(self, font:Optional[ImageFont.FreeTypeFont] = None) -> TextLayout:
+        """TextLayoutに変換
+
+        Args:
+            font (Optional[ImageFont.FreeTypeFont], optional): 使用するフォント、None の場合はパスから読み込みます. Defaults to None.
+
+        Returns:
+            TextLayout: 変更可能なTextLayout
+        """
+        if font is None and self.font_path != "":
+            font = ImageFont.truetype(self.font_path, self.font_size, self.font_index)
+
+        return TextLayout(
+            font=font,
+            color=self.color.to_color(),
+            is_outline=self.is_outline,
+            outline_color=self.outline_color.to_color(),
+            outline_weight=self.outline_weight,
+            is_shadow=self.is_shadow,
+            shadow_color=self.shadow_color.to_color(),
+            shadow_weight=self.shadow_weight,
+            shadow_offset=self.shadow_offset.to_int2(),
+            anchor=self.anchor,
+            spacing=self.spacing,
+            median_bbox=BoundingBox(*self.median_bbox) if self.median_bbox is not None else None,
+        )
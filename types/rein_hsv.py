@@ -12,6 +12,8 @@ __all__ = [
 class HSV(Int3Abstract):
     """HSV/HSB色空間
     """
+    __slots__ = ()
+
     def __init__(
         self,
         hue:int,
@@ -10,6 +10,8 @@ __all__ = [
 
 @dataclass
 class Int3(Int3Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         x:int,
@@ -10,6 +10,8 @@ __all__ = [
 
 @dataclass
 class Int4(Int4Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         x:int,
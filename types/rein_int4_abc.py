@@ -1,6 +1,10 @@
-from typing import Iterator, Self
+from typing import Iterator, Optional, Self
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
+from itertools import chain, starmap
+from operator import attrgetter
+import numpy as np
+import numpy.typing as npt
 
 
 __all__ = [
@@ -8,7 +12,11 @@ __all__ = [
 ]
 
 
-@dataclass
+# 全要素の一括取得
+INT4_GETTER = attrgetter("_x", "_y", "_z", "_w")
+
+
+@dataclass(slots=True)
 class Int4Abstract(ABC):
     _x:int = 0
     _y:int = 0
@@ -31,30 +39,84 @@ class Int4Abstract(ABC):
         """
         return Int4Abstract(*args, **kwargs)
 
+    @classmethod
+    def from_unchecked(cls, x:int, y:int, z:int, w:int) -> Self:
+        """型検査を省略して作成
+
+        演算子など、要素の型が保証されている内部処理向けの高速なコンストラクタです。
+
+        Args:
+            x (int): x成分
+            y (int): y成分
+            z (int): z成分
+            w (int): w成分
+
+        Returns:
+            Self: _description_
+        """
+        instance = object.__new__(cls)
+        instance._x = x
+        instance._y = y
+        instance._z = z
+        instance._w = w
+        return instance
+
     def __iter__(self) -> Iterator[int]:
         return iter((self._x, self._y, self._z, self._w))
 
+    def __array__(self, dtype:npt.DTypeLike = None, copy:Optional[bool] = None) -> npt.NDArray:
+        return np.array((self._x, self._y, self._z, self._w), np.int64 if dtype is None else dtype)
+
+    @classmethod
+    def to_array(cls, values:list[Self], dtype:npt.DTypeLike = np.int64) -> npt.NDArray:
+        """リストを一括で配列に変換
+
+        要素毎の __iter__ を経由せずに変換します。
+
+        Args:
+            values (list[Self]): 変換するリスト
+            dtype (npt.DTypeLike, optional): 配列の型. Defaults to np.int64.
+
+        Returns:
+            npt.NDArray: (N, 4) 配列
+        """
+        return np.fromiter(chain.from_iterable(map(INT4_GETTER, values)), dtype, 4 * len(values)).reshape(-1, 4)
+
+    @classmethod
+    def from_array(cls, array:npt.ArrayLike) -> list[Self]:
+        """配列からリストを一括で作成
+
+        Args:
+            array (npt.ArrayLike): (N, 4) 配列
+
+        Returns:
+            list[Self]: 作成したリスト
+        """
+        array = np.asarray(array)
+        assert array.size == 0 or np.issubdtype(array.dtype, np.integer), f"'array' only supports integer dtype, the input dtype was {array.dtype}."
+        return list(starmap(cls.from_unchecked, array.reshape(-1, 4).tolist()))
+
     def __add__(self, rhs:int | Self) -> Self:
         if isinstance(rhs, int):
-            return self.static_class(self._x + rhs, self._y + rhs, self._z + rhs, self._w + rhs)
+            return self.from_unchecked(self._x + rhs, self._y + rhs, self._z + rhs, self._w + rhs)
         elif isinstance(rhs, Int4Abstract):
-            return self.static_class(self._x + rhs._x, self._y + rhs._y, self._z + rhs._z, self._w + rhs._w)
+            return self.from_unchecked(self._x + rhs._x, self._y + rhs._y, self._z + rhs._z, self._w + rhs._w)
         else:
             raise NotImplementedError()
 
     def __sub__(self, rhs:int | Self) -> Self:
         if isinstance(rhs, int):
-            return self.static_class(self._x - rhs, self._y - rhs, self._z - rhs, self._w - rhs)
+            return self.from_unchecked(self._x - rhs, self._y - rhs, self._z - rhs, self._w - rhs)
         elif isinstance(rhs, Int4Abstract):
-            return self.static_class(self._x - rhs._x, self._y - rhs._y, self._z - rhs._z, self._w - rhs._w)
+            return self.from_unchecked(self._x - rhs._x, self._y - rhs._y, self._z - rhs._z, self._w - rhs._w)
         else:
             raise NotImplementedError()
 
     def __mul__(self, rhs:int | Self) -> Self:
         if isinstance(rhs, int):
-            return self.static_class(self._x * rhs, self._y * rhs, self._z * rhs, self._w * rhs)
+            return self.from_unchecked(self._x * rhs, self._y * rhs, self._z * rhs, self._w * rhs)
         elif isinstance(rhs, Int4Abstract):
-            return self.static_class(self._x * rhs._x, self._y * rhs._y, self._z * rhs._z, self._w * rhs._w)
+            return self.from_unchecked(self._x * rhs._x, self._y * rhs._y, self._z * rhs._z, self._w * rhs._w)
         else:
             raise NotImplementedError()
 
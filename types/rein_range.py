@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 import random
-from typing import Self
+from typing import Optional, Self
+import numpy as np
+import numpy.typing as npt
 
 from reinlib.types.rein_int3 import Int3
 
@@ -12,6 +14,8 @@ __all__ = [
 
 @dataclass
 class Range(Int3):
+    __slots__ = ()
+
     def __init__(self, start:int, stop:int, step:int = 1) -> None:
         super().__init__(start, stop, step)
 
@@ -43,6 +47,36 @@ class Range(Int3):
         """
         return random.randrange(*self) if self.is_valid() else self.start
 
+    def sample(self, n:int, rng:Optional[np.random.Generator] = None) -> npt.NDArray[np.int64]:
+        """指定された範囲から一括でランダムに値を選出
+
+        random.randrange と同じく stop を含まない step 刻みの値を選出します。
+        無効な範囲の場合は __call__ と同じく start で埋めます。
+
+        Args:
+            n (int): 選出数
+            rng (Optional[np.random.Generator], optional): 乱数生成器、None の場合は新規に作成. Defaults to None.
+
+        Returns:
+            npt.NDArray[np.int64]: (n,) 選出された値
+        """
+        if not self.is_valid():
+            return np.full(n, self.start, np.int64)
+
+        width = self.stop - self.start
+        if self.step > 0:
+            count = (width + self.step - 1) // self.step
+        elif self.step < 0:
+            count = (width + self.step + 1) // self.step
+        else:
+            raise ValueError("zero step for sample()")
+
+        if count <= 0:
+            raise ValueError(f"empty range for sample() ({self.start}, {self.stop}, {self.step})")
+
+        rng = np.random.default_rng() if rng is None else rng
+        return self.start + self.step * rng.integers(0, count, n, np.int64)
+
     def with_start(self, start:int) -> Self:
         """startを置換
 
@@ -10,6 +10,8 @@ __all__ = [
 
 @dataclass
 class Size2D(Int2Abstract):
+    __slots__ = ()
+
     def __init__(
         self,
         width:int,
@@ -1,4 +1,6 @@
-from typing import Optional, Self
+import os
+import hashlib
+from typing import Any, Optional, Self
 from PIL import ImageFont
 from dataclasses import dataclass, field
 
@@ -55,6 +57,68 @@ class TextLayout:
         """
         return self.font.size if self.font is not None else 0
 
+    @property
+    def font_path(self) -> str:
+        """フォントのパスを取得
+
+        相対パスと絶対パスで同じ値になるよう、絶対パスに正規化します。
+        メモリ上 (BytesIO など) から読み込んだフォントはパスを持たないため、対応しません。
+
+        Returns:
+            str: フォントの絶対パス、フォントが無効な場合は空文字を返します。
+        """
+        if self.font is None:
+            return ""
+
+        path = getattr(self.font, "path", None)
+        assert isinstance(path, (str, bytes, os.PathLike)), f"font_path requires a font loaded from a file path, the font was loaded from {type(path).__name__}."
+        return os.path.abspath(os.fsdecode(path))
+
+    @property
+    def font_index(self) -> int:
+        """フォントコレクション内のインデックスを取得
+
+        Returns:
+            int: フォントコレクション内のインデックス
+        """
+        return self.font.index if self.font is not None else 0
+
+    def fingerprint_key(self) -> tuple[Any, ...]:
+        """フィンガープリントの算出に使用する値を取得
+
+        フォントのパス、サイズ及び修飾設定を含みます。
+
+        Returns:
+            tuple[Any, ...]: フィンガープリントの算出に使用する値
+        """
+        return (
+            self.font_path,
+            self.font_size,
+            self.font_index,
+            self.color.rgba,
+            self.is_outline,
+            self.outline_color.rgba,
+            self.outline_weight,
+            self.is_shadow,
+            self.shadow_color.rgba,
+            self.shadow_weight,
+            tuple(self.shadow_offset),
+            self.anchor,
+            self.spacing,
+            tuple(self.median_bbox) if self.median_bbox is not None else None,
+        )
+
+    def fingerprint(self) -> str:
+        """フィンガープリントを取得
+
+        プロセスを跨いでも同じ値になるため、キャッシュのキーやファイル名に使用できます。
+        フォントは font_path (絶対パス) で識別するため、ファイルから読み込んだフォントのみ対応します。
+
+        Returns:
+            str: フィンガープリント (16進数)
+        """
+        return hashlib.blake2b(repr(self.fingerprint_key()).encode("utf-8"), digest_size=16).hexdigest()
+
     def is_valid(self) -> bool:
         """有効性の判定
 
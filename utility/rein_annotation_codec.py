@@ -0,0 +1,353 @@
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_float_bounding_box import FloatBoundingBox
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_text_layout import TextLayout
+from reinlib.types.rein_frozen_color import FrozenColor
+from reinlib.types.rein_frozen_int2 import FrozenInt2
+from reinlib.types.rein_frozen_text_layout import FrozenTextLayout
+
+
+__all__ = [
+    "BOUNDING_BOX_DTYPE",
+    "FLOAT_BOUNDING_BOX_DTYPE",
+    "COLOR_DTYPE",
+    "TEXT_LAYOUT_DTYPE",
+    "encode_bounding_boxes",
+    "decode_bounding_boxes",
+    "encode_float_bounding_boxes",
+    "decode_float_bounding_boxes",
+    "encode_colors",
+    "decode_colors",
+    "encode_text_layouts",
+    "decode_text_layouts",
+    "append_records",
+    "load_records",
+    "save_shard",
+    "load_shard",
+]
+
+
+# バウンディングボックス
+BOUNDING_BOX_DTYPE = np.dtype([
+    ("xmin", "<i4"),
+    ("ymin", "<i4"),
+    ("xmax", "<i4"),
+    ("ymax", "<i4"),
+])
+
+# 浮動小数点数のバウンディングボックス
+# NOTE: 完全に復元するため倍精度で保持します。
+FLOAT_BOUNDING_BOX_DTYPE = np.dtype([
+    ("xmin", "<f8"),
+    ("ymin", "<f8"),
+    ("xmax", "<f8"),
+    ("ymax", "<f8"),
+])
+
+# 色
+COLOR_DTYPE = np.dtype([
+    ("red", "u1"),
+    ("green", "u1"),
+    ("blue", "u1"),
+    ("alpha", "u1"),
+])
+
+# テキストレイアウト
+# フォントはフォントテーブル (パスのリスト) のインデックスで保持します。
+TEXT_LAYOUT_DTYPE = np.dtype([
+    ("font_id", "<i4"),
+    ("font_size", "<i4"),
+    ("font_index", "<i4"),
+    ("color", COLOR_DTYPE),
+    ("is_outline", "?"),
+    ("outline_color", COLOR_DTYPE),
+    ("outline_weight", "<i4"),
+    ("is_shadow", "?"),
+    ("shadow_color", COLOR_DTYPE),
+    ("shadow_weight", "<i4"),
+    ("shadow_offset", "<i4", (2,)),
+    ("anchor", "S2"),
+    ("spacing", "<i4"),
+    ("has_median_bbox", "?"),
+    ("median_bbox", BOUNDING_BOX_DTYPE),
+])
+
+
+def _assert_in_range(array:npt.NDArray[np.int64], dtype:np.dtype, name:str) -> None:
+    """整数配列が格納先の型の範囲内であることを検査
+
+    構造化配列への代入や astype は範囲外の値を警告なしに丸めるため、代入前に検査します。
+
+    Args:
+        array (npt.NDArray[np.int64]): 整数配列
+        dtype (np.dtype): 格納先の整数型
+        name (str): エラーメッセージに表示するフィールド名
+    """
+    info = np.iinfo(dtype)
+    assert array.size == 0 or (info.min <= array.min() and array.max() <= info.max), f"{name} values out of range for {dtype}."
+
+
+def _encode_int4(array:npt.NDArray[np.int64], dtype:np.dtype) -> npt.NDArray[np.void]:
+    """(N, 4) の整数配列を構造化配列に変換
+
+    Args:
+        array (npt.NDArray[np.int64]): (N, 4) の整数配列
+        dtype (np.dtype): 4フィールドの構造化型
+
+    Returns:
+        npt.NDArray[np.void]: (N,) 構造化配列
+    """
+    field_dtype = dtype.fields[dtype.names[0]][0]
+    _assert_in_range(array, field_dtype, ", ".join(dtype.names))
+
+    return np.ascontiguousarray(array.astype(field_dtype)).view(dtype).reshape(-1)
+
+
+def encode_bounding_boxes(bboxes:list[BoundingBox]) -> npt.NDArray[np.void]:
+    """BoundingBoxのリストを構造化配列に変換
+
+    Args:
+        bboxes (list[BoundingBox]): バウンディングボックスのリスト
+
+    Returns:
+        npt.NDArray[np.void]: (N,) BOUNDING_BOX_DTYPE
+    """
+    return _encode_int4(BoundingBox.to_array(bboxes), BOUNDING_BOX_DTYPE)
+
+
+def decode_bounding_boxes(records:npt.NDArray[np.void]) -> list[BoundingBox]:
+    """構造化配列をBoundingBoxのリストに変換
+
+    Args:
+        records (npt.NDArray[np.void]): (N,) BOUNDING_BOX_DTYPE
+
+    Returns:
+        list[BoundingBox]: バウンディングボックスのリスト
+    """
+    return [BoundingBox.from_unchecked(*values) for values in records.tolist()]
+
+
+def encode_float_bounding_boxes(bboxes:list[FloatBoundingBox]) -> npt.NDArray[np.void]:
+    """FloatBoundingBoxのリストを構造化配列に変換
+
+    Args:
+        bboxes (list[FloatBoundingBox]): バウンディングボックスのリスト
+
+    Returns:
+        npt.NDArray[np.void]: (N,) FLOAT_BOUNDING_BOX_DTYPE
+    """
+    return FloatBoundingBox.to_array(bboxes).view(FLOAT_BOUNDING_BOX_DTYPE).reshape(-1)
+
+
+def decode_float_bounding_boxes(records:npt.NDArray[np.void]) -> list[FloatBoundingBox]:
+    """構造化配列をFloatBoundingBoxのリストに変換
+
+    Args:
+        records (npt.NDArray[np.void]): (N,) FLOAT_BOUNDING_BOX_DTYPE
+
+    Returns:
+        list[FloatBoundingBox]: バウンディングボックスのリスト
+    """
+    return [FloatBoundingBox.from_unchecked(*values) for values in records.tolist()]
+
+
+def encode_colors(colors:list[Color]) -> npt.NDArray[np.void]:
+    """Colorのリストを構造化配列に変換
+
+    Args:
+        colors (list[Color]): 色のリスト (各成分は 0 ~ 255)
+
+    Returns:
+        npt.NDArray[np.void]: (N,) COLOR_DTYPE
+    """
+    return _encode_int4(Color.to_array(colors), COLOR_DTYPE)
+
+
+def decode_colors(records:npt.NDArray[np.void]) -> list[Color]:
+    """構造化配列をColorのリストに変換
+
+    Args:
+        records (npt.NDArray[np.void]): (N,) COLOR_DTYPE
+
+    Returns:
+        list[Color]: 色のリスト
+    """
+    return [Color.from_unchecked(*values) for values in records.tolist()]
+
+
+def encode_text_layouts(
+    layouts:list[TextLayout | FrozenTextLayout],
+    font_paths:list[str],
+) -> npt.NDArray[np.void]:
+    """TextLayoutの主要なフィールドを構造化配列に変換
+
+    フォントのパスは font_paths に格納し、そのインデックスを保持します。
+    font_paths に存在しないパスは末尾に追加されます。
+    整数のフィールドが格納先の型の範囲外の場合と、文字寄せが 2 文字を超える場合はエラーとします。
+
+    Args:
+        layouts (list[TextLayout | FrozenTextLayout]): テキストレイアウトのリスト
+        font_paths (list[str]): フォントテーブル (更新されます)
+
+    Returns:
+        npt.NDArray[np.void]: (N,) TEXT_LAYOUT_DTYPE
+    """
+    font_ids = {font_path: font_id for font_id, font_path in enumerate(font_paths)}
+
+    records = np.zeros(len(layouts), TEXT_LAYOUT_DTYPE)
+    values:list[tuple] = []
+
+    for layout in layouts:
+        if isinstance(layout, TextLayout):
+            layout = FrozenTextLayout.from_text_layout(layout)
+
+        if (font_id:=font_ids.get(layout.font_path)) is None:
+            font_id = font_ids[layout.font_path] = len(font_paths)
+            font_paths.append(layout.font_path)
+
+        anchor = (layout.anchor or "").encode("ascii")
+        assert len(anchor) <= 2, f"anchor must be at most 2 characters, {layout.anchor}."
+
+        values.append((
+            font_id,
+            layout.font_size,
+            layout.font_index,
+            layout.color.rgba,
+            layout.is_outline,
+            layout.outline_color.rgba,
+            layout.outline_weight,
+            layout.is_shadow,
+            layout.shadow_color.rgba,
+            layout.shadow_weight,
+            layout.shadow_offset.xy,
+            anchor,
+            layout.spacing,
+            layout.median_bbox is not None,
+            layout.median_bbox if layout.median_bbox is not None else (0, 0, 0, 0),
+        ))
+
+    # 整数のフィールドの範囲を検査
+    for name, column in zip(TEXT_LAYOUT_DTYPE.names, zip(*values)):
+        field_dtype = TEXT_LAYOUT_DTYPE.fields[name][0]
+        if field_dtype.names is not None:
+            field_dtype = field_dtype.fields[field_dtype.names[0]][0]
+        if field_dtype.base.kind in "iu":
+            _assert_in_range(np.array(column, np.int64), field_dtype.base, name)
+
+    records[:] = values
+    return records
+
+
+def decode_text_layouts(
+    records:npt.NDArray[np.void],
+    font_paths:list[str],
+) -> list[FrozenTextLayout]:
+    """構造化配列をFrozenTextLayoutのリストに変換
+
+    フォントオブジェクトは復元しないため、必要に応じて FrozenTextLayout.to_text_layout を使用してください。
+
+    Args:
+        records (npt.NDArray[np.void]): (N,) TEXT_LAYOUT_DTYPE
+        font_paths (list[str]): フォントテーブル
+
+    Returns:
+        list[FrozenTextLayout]: テキストレイアウトのリスト
+    """
+    return [
+        FrozenTextLayout(
+            font_paths[font_id],
+            font_size,
+            font_index,
+            FrozenColor(*color),
+            is_outline,
+            FrozenColor(*outline_color),
+            outline_weight,
+            is_shadow,
+            FrozenColor(*shadow_color),
+            shadow_weight,
+            FrozenInt2(*shadow_offset.tolist()),
+            anchor.decode("ascii") if anchor != b"" else None,
+            spacing,
+            median_bbox if has_median_bbox else None,
+        )
+        for (
+            font_id,
+            font_size,
+            font_index,
+            color,
+            is_outline,
+            outline_color,
+            outline_weight,
+            is_shadow,
+            shadow_color,
+            shadow_weight,
+            shadow_offset,
+            anchor,
+            spacing,
+            has_median_bbox,
+            median_bbox,
+        ) in records.tolist()
+    ]
+
+
+def append_records(path:str | Path, records:npt.NDArray[np.void]) -> None:
+    """構造化配列をファイル末尾に追記
+
+    ヘッダーを持たない生のバイト列として書き込むため、同じ型であれば何度でも追記できます。
+
+    Args:
+        path (str | Path): 出力先
+        records (npt.NDArray[np.void]): 構造化配列
+    """
+    with open(path, mode="ab") as f:
+        f.write(np.ascontiguousarray(records).tobytes())
+
+
+def load_records(path:str | Path, dtype:np.dtype) -> npt.NDArray[np.void]:
+    """append_records で書き込んだファイルを一括で読込
+
+    Args:
+        path (str | Path): ファイルパス
+        dtype (np.dtype): 書き込んだ構造化配列の型
+
+    Returns:
+        npt.NDArray[np.void]: (N,) 構造化配列 (読込専用)
+    """
+    buffer = Path(path).read_bytes()
+    assert len(buffer) % dtype.itemsize == 0, f"'{path}' is not a multiple of {dtype.itemsize} bytes."
+    return np.frombuffer(buffer, dtype)
+
+
+def save_shard(
+    path:str | Path,
+    font_paths:Optional[list[str]] = None,
+    **records:npt.NDArray[np.void],
+) -> None:
+    """構造化配列をまとめて .npz に保存
+
+    Args:
+        path (str | Path): 出力先
+        font_paths (Optional[list[str]], optional): フォントテーブル. Defaults to None.
+        **records (npt.NDArray[np.void]): 保存する構造化配列
+    """
+    np.savez(path, font_paths=np.array(font_paths or [], np.str_), **records)
+
+
+def load_shard(path:str | Path) -> tuple[dict[str, npt.NDArray[np.void]], list[str]]:
+    """save_shard で保存した .npz を読込
+
+    Args:
+        path (str | Path): ファイルパス
+
+    Returns:
+        tuple[dict[str, npt.NDArray[np.void]], list[str]]: 構造化配列とフォントテーブル
+    """
+    with np.load(path) as data:
+        records = {key: data[key] for key in data.files if key != "font_paths"}
+        font_paths = data["font_paths"].tolist()
+    return records, font_paths
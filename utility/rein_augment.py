@@ -0,0 +1,435 @@
+import io
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+import numpy.typing as npt
+from PIL import Image
+
+from reinlib.types.rein_color import Color
+from reinlib.types.rein_range import Range
+from reinlib.types.rein_size2d import Size2D
+from reinlib.types.rein_float_minmax import FloatMinMax
+from reinlib.utility.rein_image import alpha_composite, create_gradient_alpha
+
+
+__all__ = [
+    "AugmentOpAbstract",
+    "GaussianNoise",
+    "GaussianBlur",
+    "JpegArtifacts",
+    "BrightnessContrast",
+    "GradientAlphaOverlay",
+    "AugmentPipeline",
+]
+
+
+class AugmentOpAbstract(ABC):
+    """バッチ単位の画像拡張の基底クラス
+
+    (N, H, W, C) の uint8 バッチをインプレースで加工します。
+    パラメータはサンプル毎に Range / FloatMinMax から一括で選出します。
+    """
+    @property
+    def name(self) -> str:
+        """計測結果の表示名
+
+        Returns:
+            str: クラス名
+        """
+        return type(self).__name__
+
+    @abstractmethod
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        """バッチをインプレースで加工
+
+        Args:
+            batch (npt.NDArray[np.uint8]): (N, H, W, C) 画像
+            rng (np.random.Generator): 乱数生成器
+        """
+        raise NotImplementedError()
+
+
+def _per_sample(values:npt.NDArray) -> npt.NDArray:
+    """(N,) のパラメータを (N, 1, 1, 1) に変形
+
+    Args:
+        values (npt.NDArray): (N,) パラメータ
+
+    Returns:
+        npt.NDArray: (N, 1, 1, 1) パラメータ
+    """
+    return values[:, np.newaxis, np.newaxis, np.newaxis]
+
+
+def _color_channels(channels:int) -> int:
+    """アルファチャンネルを除いたチャンネル数
+
+    Args:
+        channels (int): チャンネル数 (1: L, 2: LA, 3: RGB, 4: RGBA)
+
+    Returns:
+        int: 色のチャンネル数
+    """
+    assert channels in (1, 2, 3, 4), f"not support channels, {channels}."
+    return 3 if channels >= 3 else 1
+
+
+class GaussianNoise(AugmentOpAbstract):
+    """ガウスノイズの加算
+
+    アルファチャンネル (LA, RGBA の最後のチャンネル) は変更しません。
+    """
+    def __init__(self, sigma:FloatMinMax) -> None:
+        """コンストラクタ
+
+        Args:
+            sigma (FloatMinMax): ノイズの標準偏差 (0 ~ 255)
+        """
+        self.sigma = sigma
+
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        sigma = _per_sample(self.sigma.sample(len(batch), rng).astype(np.float32))
+        colors = batch[..., :_color_channels(batch.shape[-1])]
+
+        noise = rng.standard_normal(colors.shape, np.float32)
+        noise *= sigma
+        noise += colors
+
+        np.rint(noise, out=noise)
+        np.clip(noise, 0.0, 255.0, out=noise)
+        np.copyto(colors, noise, casting="unsafe")
+
+
+class GaussianBlur(AugmentOpAbstract):
+    """ガウスぼかし
+
+    縦横に分離した対称なカーネルで畳み込みます。
+    作業領域がキャッシュに収まるようサンプル毎に計算し、作業領域はサンプル間で使い回します。
+    端の画素を延長する点は PIL の GaussianBlur と同じですが、PIL は箱型フィルタの繰り返しによる近似のため、
+    画素値は一致しません。
+    アルファチャンネル (LA, RGBA の最後のチャンネル) は変更しません。
+    """
+    def __init__(self, radius:FloatMinMax, truncate:float = 3.0) -> None:
+        """コンストラクタ
+
+        Args:
+            radius (FloatMinMax): ぼかしの半径 (標準偏差)
+            truncate (float, optional): カーネルを打ち切る標準偏差の倍数. Defaults to 3.0.
+        """
+        self.radius = radius
+        self.truncate = truncate
+
+    def kernels(self, radius:npt.NDArray[np.float64]) -> npt.NDArray[np.float32]:
+        """サンプル毎の 1 次元カーネルを作成
+
+        Args:
+            radius (npt.NDArray[np.float64]): (N,) 半径
+
+        Returns:
+            npt.NDArray[np.float32]: (N, 2 * R + 1) 正規化済みのカーネル (R は最大の半径に対応する打ち切り幅、範囲外は 0)
+        """
+        extent = int(np.ceil(self.truncate * radius.max(initial=0.0)))
+        x = np.arange(-extent, extent + 1, dtype=np.float64)
+
+        # NOTE: 半径 0 のサンプルは中心のみ 1 のカーネルとします.
+        sigma = np.maximum(radius, 1.0e-6)[:, np.newaxis]
+        kernels = np.exp(-0.5 * (x / sigma) ** 2)
+        kernels[np.abs(x) > np.ceil(self.truncate * radius)[:, np.newaxis]] = 0.0
+        kernels /= kernels.sum(axis=1, keepdims=True)
+        return kernels.astype(np.float32)
+
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        kernels = self.kernels(self.radius.sample(len(batch), rng))
+        extent = kernels.shape[1] // 2
+
+        if extent == 0:
+            return
+
+        height, width = batch.shape[1:3]
+        channels = _color_channels(batch.shape[-1])
+        result = np.empty((height, width, channels), np.float32)
+        scratch = np.empty((height, width, channels), np.float32)
+        padded_v = np.empty((height + 2 * extent, width, channels), np.float32)
+        padded_h = np.empty((height, width + 2 * extent, channels), np.float32)
+
+        for sample, kernel in zip(batch[..., :channels], kernels):
+            # サンプル自身の打ち切り幅
+            taps = np.count_nonzero(kernel) // 2
+
+            if taps == 0:
+                continue
+
+            # 縦方向
+            padded_v[extent:extent + height] = sample
+            padded_v[:extent] = sample[:1]
+            padded_v[extent + height:] = sample[-1:]
+            self._convolve(padded_v, kernel, taps, 0, result, scratch)
+
+            # 横方向
+            padded_h[:, extent:extent + width] = result
+            padded_h[:, :extent] = result[:, :1]
+            padded_h[:, extent + width:] = result[:, -1:]
+            self._convolve(padded_h, kernel, taps, 1, result, scratch)
+
+            np.rint(result, out=result)
+            np.copyto(sample, result, casting="unsafe")
+
+    @staticmethod
+    def _convolve(
+        padded:npt.NDArray[np.float32],
+        kernel:npt.NDArray[np.float32],
+        taps:int,
+        axis:int,
+        out:npt.NDArray[np.float32],
+        scratch:npt.NDArray[np.float32],
+    ) -> None:
+        """対称なカーネルで 1 軸を畳み込み
+
+        Args:
+            padded (npt.NDArray[np.float32]): 畳み込む軸の両端をカーネルの半分の長さで延長した画像
+            kernel (npt.NDArray[np.float32]): (2 * R + 1,) カーネル
+            taps (int): カーネルの中心から片側の有効な長さ
+            axis (int): 畳み込む軸
+            out (npt.NDArray[np.float32]): 出力先
+            scratch (npt.NDArray[np.float32]): 作業領域
+        """
+        extent = len(kernel) // 2
+        length = out.shape[axis]
+
+        def window(offset:int) -> npt.NDArray[np.float32]:
+            return padded[offset:offset + length] if axis == 0 else padded[:, offset:offset + length]
+
+        np.multiply(window(extent), kernel[extent], out=out)
+
+        # 中心から等距離の 2 画素を加算してから乗算
+        for k in range(extent - taps, extent):
+            np.add(window(k), window(2 * extent - k), out=scratch)
+            scratch *= kernel[k]
+            out += scratch
+
+
+class JpegArtifacts(AugmentOpAbstract):
+    """JPEG の再エンコードによる圧縮ノイズ
+
+    エンコーダーは PIL のみのため、サンプル毎にメモリ上でエンコードとデコードを行います。
+    書き込み先のバッファはサンプル間で使い回します。
+    JPEG は透明度を持たないため、アルファチャンネル (LA, RGBA の最後のチャンネル) は変更しません。
+    """
+    def __init__(self, quality:Range) -> None:
+        """コンストラクタ
+
+        Args:
+            quality (Range): JPEG の品質 (1 ~ 95)
+        """
+        self.quality = quality
+
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        qualities = self.quality.sample(len(batch), rng)
+        buffer = io.BytesIO()
+
+        for sample, quality in zip(batch[..., :_color_channels(batch.shape[-1])], qualities):
+            buffer.seek(0)
+            buffer.truncate()
+
+            Image.fromarray(sample[..., 0] if sample.shape[-1] == 1 else sample).save(buffer, "JPEG", quality=int(quality))
+
+            buffer.seek(0)
+            with Image.open(buffer) as image:
+                decoded = np.asarray(image)
+
+            np.copyto(sample, decoded.reshape(sample.shape))
+
+
+class BrightnessContrast(AugmentOpAbstract):
+    """明るさとコントラストの調整
+
+    PIL の ImageEnhance.Brightness, ImageEnhance.Contrast を順に適用した結果と一致します。
+    2 段の補間をサンプル毎の 256 階調のルックアップテーブルに合成し、画素は 1 回だけ変換します。
+    コントラストの基準の平均輝度は PIL と同じく、画素毎に丸めた "L" 変換の値の平均です。
+    PIL と同じくアルファチャンネル (LA, RGBA の最後のチャンネル) は変換しません。
+    """
+    def __init__(self, brightness:FloatMinMax, contrast:FloatMinMax) -> None:
+        """コンストラクタ
+
+        Args:
+            brightness (FloatMinMax): 明るさの係数 (1.0 で変化なし)
+            contrast (FloatMinMax): コントラストの係数 (1.0 で変化なし)
+        """
+        self.brightness = brightness
+        self.contrast = contrast
+
+    @staticmethod
+    def _blend(degenerate:npt.NDArray[np.float32], values:npt.NDArray[np.float32], factor:npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+        """PIL の Image.blend と同じ補間 (float32 で計算して切り捨て)
+
+        Args:
+            degenerate (npt.NDArray[np.float32]): 係数 0.0 の値
+            values (npt.NDArray[np.float32]): 係数 1.0 の値
+            factor (npt.NDArray[np.float32]): 係数
+
+        Returns:
+            npt.NDArray[np.float32]: 補間後の値 (0 ~ 255 の整数値)
+        """
+        return np.trunc(np.clip(degenerate + factor * (values - degenerate), 0.0, 255.0))
+
+    def lut(self, sample:npt.NDArray[np.uint8], brightness:float, contrast:float) -> npt.NDArray[np.uint8]:
+        """サンプルのルックアップテーブルを作成
+
+        Args:
+            sample (npt.NDArray[np.uint8]): (H, W, C) 画像
+            brightness (float): 明るさの係数
+            contrast (float): コントラストの係数
+
+        Returns:
+            npt.NDArray[np.uint8]: (256,) ルックアップテーブル
+        """
+        values = np.arange(256, dtype=np.float32)
+        brightened = self._blend(np.float32(0.0), values, np.float32(brightness))
+
+        # 明るさ調整後の画像を "L" 変換した値の平均 (PIL の ImageStat と同じく整数の総和から計算)
+        levels = brightened.astype(np.uint32)
+
+        if _color_channels(sample.shape[-1]) == 3:
+            # ITU-R 601-2 luma (PIL の "L" 変換と同じ 16 ビットの固定小数点)
+            luma = np.take(levels * 19595, sample[..., 0])
+            luma += np.take(levels * 38470, sample[..., 1])
+            luma += np.take(levels * 7471, sample[..., 2])
+            luma += 0x8000
+            luma >>= 16
+            total = int(luma.sum(dtype=np.uint64))
+        else:
+            total = int(np.bincount(sample[..., 0].ravel(), minlength=256) @ levels.astype(np.int64))
+
+        mean = np.float32(int(total / (sample.shape[0] * sample.shape[1]) + 0.5))
+
+        return self._blend(mean, brightened, np.float32(contrast)).astype(np.uint8)
+
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        brightness = self.brightness.sample(len(batch), rng)
+        contrast = self.contrast.sample(len(batch), rng)
+
+        colors = _color_channels(batch.shape[-1])
+
+        for sample, b, c in zip(batch, brightness, contrast):
+            lut = self.lut(sample, b, c)
+
+            if colors == sample.shape[-1]:
+                np.take(lut, sample, out=sample)
+            else:
+                sample[..., :colors] = lut[sample[..., :colors]]
+
+
+class GradientAlphaOverlay(AugmentOpAbstract):
+    """上部から下部にかけて線形補間な透明度で単色を重ねる
+
+    透明度は create_gradient_alpha のキャッシュを使用し、合成は alpha_composite の固定小数点で行います。
+    アルファチャンネル (LA, RGBA の最後のチャンネル) は変更しません。
+    """
+    def __init__(self, color:Color, top_alpha:Range, bottom_alpha:Range) -> None:
+        """コンストラクタ
+
+        Args:
+            color (Color): 重ねる色
+            top_alpha (Range): 上部の透明度 (0 ~ 255)
+            bottom_alpha (Range): 下部の透明度 (0 ~ 255)
+        """
+        self.color = color
+        self.top_alpha = top_alpha
+        self.bottom_alpha = bottom_alpha
+
+    def __call__(self, batch:npt.NDArray[np.uint8], rng:np.random.Generator) -> None:
+        colors = _color_channels(batch.shape[-1])
+        color = np.array(self.color.rgb if colors == 3 else (self.color.grayscale, ), np.uint8)
+
+        size = Size2D(batch.shape[2], batch.shape[1])
+        top_alphas = self.top_alpha.sample(len(batch), rng)
+        bottom_alphas = self.bottom_alpha.sample(len(batch), rng)
+
+        for sample, top_alpha, bottom_alpha in zip(batch, top_alphas, bottom_alphas):
+            alpha = create_gradient_alpha(size, int(top_alpha), int(bottom_alpha), is_float64=False)
+            alpha_composite(color, sample[..., :colors], alpha, out=sample[..., :colors])
+
+
+class AugmentPipeline:
+    """画像拡張を順に適用するパイプライン
+
+    全ての処理を (N, H, W, C) の uint8 バッチのまま行うため、処理間で PIL と NumPy の変換が発生しません。
+    処理毎の経過時間を累積します。
+
+    ```
+    pipeline = AugmentPipeline([
+        GaussianBlur(FloatMinMax(0.0, 1.5)),
+        BrightnessContrast(FloatMinMax(0.8, 1.2), FloatMinMax(0.8, 1.2)),
+        GaussianNoise(FloatMinMax(0.0, 8.0)),
+        JpegArtifacts(Range(40, 96)),
+    ])
+    pipeline(batch, rng, out=batch)
+    print(pipeline.report())
+    ```
+    """
+    def __init__(self, ops:list[AugmentOpAbstract]) -> None:
+        """コンストラクタ
+
+        Args:
+            ops (list[AugmentOpAbstract]): 適用順の画像拡張
+        """
+        self.ops = ops
+
+        # 処理毎の累積の経過時間 (秒)
+        self.timings:dict[str, float] = {}
+        # 処理毎の累積のサンプル数
+        self.samples:dict[str, int] = {}
+
+    def __call__(
+        self,
+        batch:npt.NDArray[np.uint8],
+        rng:Optional[np.random.Generator] = None,
+        out:Optional[npt.NDArray[np.uint8]] = None,
+    ) -> npt.NDArray[np.uint8]:
+        """バッチに画像拡張を適用
+
+        Args:
+            batch (npt.NDArray[np.uint8]): (N, H, W, C) 画像
+            rng (Optional[np.random.Generator], optional): 乱数生成器、None の場合は新規に作成. Defaults to None.
+            out (Optional[npt.NDArray[np.uint8]], optional): 出力先、batch と同じ配列も指定可能. Defaults to None.
+
+        Returns:
+            npt.NDArray[np.uint8]: (N, H, W, C) 拡張後の画像
+        """
+        assert batch.ndim == 4, f"batch must be (N, H, W, C), {batch.shape}."
+
+        rng = np.random.default_rng() if rng is None else rng
+
+        if out is None:
+            out = batch.copy()
+        elif out is not batch:
+            np.copyto(out, batch)
+
+        for op in self.ops:
+            start = time.perf_counter()
+            op(out, rng)
+            elapsed = time.perf_counter() - start
+
+            self.timings[op.name] = self.timings.get(op.name, 0.0) + elapsed
+            self.samples[op.name] = self.samples.get(op.name, 0) + len(out)
+
+        return out
+
+    def report(self) -> str:
+        """処理毎の経過時間を整形
+
+        Returns:
+            str: 処理毎の累積時間とサンプルあたりの時間
+        """
+        lines = []
+        for name, elapsed in self.timings.items():
+            per_sample = elapsed / max(self.samples[name], 1)
+            lines.append(f"{name:<24} {elapsed * 1.0e3:>10.2f} ms  {per_sample * 1.0e3:>8.3f} ms/sample")
+        return "\n".join(lines)
+
+    def reset_timings(self) -> None:
+        """累積した経過時間を破棄
+        """
+        self.timings.clear()
+        self.samples.clear()
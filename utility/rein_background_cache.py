@@ -0,0 +1,218 @@
+import os
+import re
+import hashlib
+import random
+import tempfile
+from pathlib import Path
+from typing import Optional
+import numpy as np
+import numpy.typing as npt
+from PIL import Image
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_size2d import Size2D
+from reinlib.utility.rein_image import random_pil_crop, random_crops
+
+
+__all__ = [
+    "BackgroundCache",
+]
+
+
+# キャッシュのファイル名 (<key>_<mtime>_<size>.npy)
+_CACHE_NAME_PATTERN = re.compile(r"(?P<key>[0-9a-f]{32})_\d+_\d+\.npy")
+
+
+class BackgroundCache:
+    """デコード済みの背景画像のディスクキャッシュ
+
+    画像を一度だけデコードして .npy に保存し、以降は読込専用のメモリマップとして開きます。
+    ワーカープロセス間でページキャッシュを共有するため、デコード処理とメモリ使用量がワーカー数に比例しません。
+
+    キャッシュはソース画像のパス、更新日時、ファイルサイズで識別するため、ソース画像を更新すると再作成されます。
+    書き込みは一時ファイルからの置換で行うため、複数プロセスから同時に作成しても破損しません。
+    """
+    def __init__(self, cache_dir:str | Path, mode:str = "RGB") -> None:
+        """コンストラクタ
+
+        Args:
+            cache_dir (str | Path): キャッシュの保存先
+            mode (str, optional): デコード時に変換する画像モード. Defaults to "RGB".
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.mode = mode
+
+        # プロセス内で開いたメモリマップ
+        self.arrays:dict[Path, npt.NDArray[np.uint8]] = {}
+
+    def __len__(self) -> int:
+        return len(self.arrays)
+
+    def path_key(self, path:str | Path) -> str:
+        """ソース画像のパスに対応するキーを取得
+
+        Args:
+            path (str | Path): ソース画像のパス
+
+        Returns:
+            str: キー
+        """
+        return hashlib.blake2b(f"{Path(path).resolve()}|{self.mode}".encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def cache_key(cache_path:Path) -> Optional[str]:
+        """キャッシュのパスからキーを取得
+
+        Args:
+            cache_path (Path): キャッシュのパス
+
+        Returns:
+            Optional[str]: キー、キャッシュの命名規則に一致しない場合は None
+        """
+        match = _CACHE_NAME_PATTERN.fullmatch(cache_path.name)
+        return match["key"] if match is not None else None
+
+    def cache_path(self, path:str | Path) -> Path:
+        """ソース画像の現在の状態に対応するキャッシュのパスを取得
+
+        Args:
+            path (str | Path): ソース画像のパス
+
+        Returns:
+            Path: キャッシュのパス
+        """
+        stat = os.stat(path)
+        return self.cache_dir / f"{self.path_key(path)}_{stat.st_mtime_ns}_{stat.st_size}.npy"
+
+    def load(self, path:str | Path) -> npt.NDArray[np.uint8]:
+        """デコード済みの画像を読込専用のメモリマップで取得
+
+        キャッシュが存在しない場合はデコードして作成し、同じソース画像の古いキャッシュは削除します。
+
+        Args:
+            path (str | Path): ソース画像のパス
+
+        Returns:
+            npt.NDArray[np.uint8]: (H, W, C) or (H, W) 画像 (読込専用)
+        """
+        cache_path = self.cache_path(path)
+
+        if (array:=self.arrays.get(cache_path)) is not None:
+            return array
+
+        if not cache_path.exists():
+            self.create(path, cache_path)
+
+        # 他のプロセスが再作成した場合も含め、同じソース画像の古いメモリマップを破棄
+        key = self.path_key(path)
+        for stale_path in [p for p in self.arrays if self.cache_key(p) == key]:
+            del self.arrays[stale_path]
+
+        array = self.arrays[cache_path] = np.load(cache_path, mmap_mode="r")
+        return array
+
+    def create(self, path:str | Path, cache_path:Path) -> None:
+        """ソース画像をデコードしてキャッシュを作成
+
+        Args:
+            path (str | Path): ソース画像のパス
+            cache_path (Path): キャッシュのパス
+        """
+        with Image.open(path) as image:
+            array = np.asarray(image.convert(self.mode))
+
+        f = tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False)
+        temp_path = Path(f.name)
+
+        try:
+            with f:
+                np.save(f, array)
+            os.replace(temp_path, cache_path)
+        except PermissionError:
+            # NOTE: Windows では他のプロセスが開いているファイルを置換できないため、作成済みのキャッシュを使用します.
+            pass
+        finally:
+            # 保存の失敗時と置換できなかった場合に一時ファイルを削除
+            temp_path.unlink(missing_ok=True)
+
+        # 同じソース画像の古いキャッシュを削除
+        key = self.path_key(path)
+        for stale_path in self.cache_dir.glob(f"{key}_*.npy"):
+            if stale_path != cache_path and self.cache_key(stale_path) == key:
+                self.arrays.pop(stale_path, None)
+                try:
+                    stale_path.unlink(missing_ok=True)
+                except PermissionError:
+                    pass
+
+    def clear(self) -> None:
+        """全てのキャッシュを削除
+
+        キャッシュの命名規則 (<key>_<mtime>_<size>.npy) に一致するファイルのみ削除します。
+        """
+        self.arrays.clear()
+
+        for cache_path in self.cache_dir.glob("*.npy"):
+            if self.cache_key(cache_path) is not None:
+                cache_path.unlink(missing_ok=True)
+
+    def random_pil_crop(
+        self,
+        path:str | Path,
+        crop_size:Size2D,
+        crop_step:Int2,
+        resize_resample:Image.Resampling = Image.Resampling.BILINEAR,
+    ) -> Image.Image:
+        """キャッシュした画像のランダム切り抜き
+
+        rein_image.random_pil_crop と同じ結果を返します。
+        リサイズが不要な場合は、メモリマップから切り抜いた領域のみを画像に変換します。
+
+        Args:
+            path (str | Path): ソース画像のパス
+            crop_size (Size2D): 切り抜きサイズ
+            crop_step (Int2): 切り抜き開始位置のランダム幅
+            resize_resample (Image.Resampling, optional): 画像サイズが切り抜きサイズ未満のリサイズ補間法. Defaults to Image.Resampling.BILINEAR.
+
+        Returns:
+            Image.Image: 切り抜き後の画像
+        """
+        array = self.load(path)
+        height, width = array.shape[:2]
+
+        if width < crop_size.width or height < crop_size.height:
+            return random_pil_crop(Image.fromarray(array), crop_size, crop_step, resize_resample)
+
+        # set crop point
+        x_range, y_range = width - crop_size.width, height - crop_size.height
+        x, y = random.randrange(0, x_range + 1, crop_step.x), random.randrange(0, y_range + 1, crop_step.y)
+
+        return Image.fromarray(np.ascontiguousarray(array[y:y + crop_size.height, x:x + crop_size.width]))
+
+    def random_crops(
+        self,
+        path:str | Path,
+        crop_size:Size2D,
+        crop_step:Int2,
+        n:int,
+        rng:Optional[np.random.Generator] = None,
+        out:Optional[npt.NDArray[np.uint8]] = None,
+        resize_resample:Image.Resampling = Image.Resampling.BILINEAR,
+    ) -> npt.NDArray[np.uint8]:
+        """キャッシュした画像から複数枚をランダムに一括で切り抜き
+
+        Args:
+            path (str | Path): ソース画像のパス
+            crop_size (Size2D): 切り抜きサイズ
+            crop_step (Int2): 切り抜き開始位置のランダム幅
+            n (int): 切り抜く枚数
+            rng (Optional[np.random.Generator], optional): 乱数生成器、None の場合は新規に作成. Defaults to None.
+            out (Optional[npt.NDArray[np.uint8]], optional): 出力先. Defaults to None.
+            resize_resample (Image.Resampling, optional): 画像サイズが切り抜きサイズ未満のリサイズ補間法. Defaults to Image.Resampling.BILINEAR.
+
+        Returns:
+            npt.NDArray[np.uint8]: (n, h, w, C) or (n, h, w) 切り抜き後の画像
+        """
+        return random_crops(self.load(path), crop_size, crop_step, n, rng, out, resize_resample)
@@ -0,0 +1,420 @@
+import math
+from typing import Callable, Optional
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_blend_mode import BlendMode
+from reinlib.utility.rein_parallel import run_row_bands
+
+
+__all__ = [
+    "ScratchBuffer",
+    "scratch_planes",
+    "BlendKernel",
+    "blend_normal",
+    "blend_difference",
+    "blend_multiply",
+    "blend_screen",
+    "blend_overlay",
+    "blend_add",
+    "blend_subtract",
+    "BLEND_KERNELS",
+    "apply_blend",
+]
+
+
+class ScratchBuffer:
+    """カーネルの作業領域 (uint16 の平面2枚)
+
+    タイル毎に作業領域を確保しないよう、複数回の呼び出しで使い回します。
+    要求されたサイズが確保済みのサイズを超える場合のみ再確保します。
+    """
+    def __init__(self, size:int = 0) -> None:
+        """コンストラクタ
+
+        Args:
+            size (int, optional): 1平面あたりの初期の要素数. Defaults to 0.
+        """
+        self.buffers = (np.empty(size, np.uint16), np.empty(size, np.uint16))
+
+    def planes(self, shape:tuple[int, ...]) -> tuple[npt.NDArray[np.uint16], npt.NDArray[np.uint16]]:
+        """指定した形状の作業領域を取得
+
+        Args:
+            shape (tuple[int, ...]): 形状
+
+        Returns:
+            tuple[npt.NDArray[np.uint16], npt.NDArray[np.uint16]]: 作業領域 (内容は不定)
+        """
+        size = math.prod(shape)
+        if self.buffers[0].size < size:
+            self.buffers = (np.empty(size, np.uint16), np.empty(size, np.uint16))
+        return self.buffers[0][:size].reshape(shape), self.buffers[1][:size].reshape(shape)
+
+
+def scratch_planes(shape:tuple[int, ...], buffer:Optional[ScratchBuffer] = None) -> tuple[npt.NDArray[np.uint16], npt.NDArray[np.uint16]]:
+    """作業領域を取得
+
+    Args:
+        shape (tuple[int, ...]): 形状
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        tuple[npt.NDArray[np.uint16], npt.NDArray[np.uint16]]: 作業領域 (内容は不定)
+    """
+    if buffer is None:
+        return np.empty(shape, np.uint16), np.empty(shape, np.uint16)
+    return buffer.planes(shape)
+
+
+# ブレンドカーネル (base, blend, alpha, out, buffer) -> out
+BlendKernel = Callable[
+    [npt.NDArray[np.uint8], npt.NDArray[np.uint8], npt.NDArray[np.uint8], Optional[npt.NDArray[np.uint8]], Optional[ScratchBuffer]],
+    npt.NDArray[np.uint8],
+]
+
+# 1チャンネル分の合成値を計算する関数 (base, blend, value, scratch)
+_ChannelFunc = Callable[
+    [npt.NDArray[np.uint8], npt.NDArray[np.uint8], npt.NDArray[np.uint16], npt.NDArray[np.uint16]],
+    None,
+]
+
+
+def _div255(value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> npt.NDArray[np.uint16]:
+    """255 で除算 (四捨五入)
+
+    PIL と同じく ((t + 128) >> 8 + (t + 128)) >> 8 で近似します。
+    value は 255 * 255 以下であること。
+
+    Args:
+        value (npt.NDArray[np.uint16]): 除算対象 (上書きされます)
+        scratch (npt.NDArray[np.uint16]): 作業領域
+
+    Returns:
+        npt.NDArray[np.uint16]: value
+    """
+    value += 128
+    np.right_shift(value, 8, out=scratch)
+    value += scratch
+    value >>= 8
+    return value
+
+
+def _blend_channels(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]],
+    buffer:Optional[ScratchBuffer],
+    func:_ChannelFunc,
+) -> npt.NDArray[np.uint8]:
+    """チャンネル毎に合成値を計算し、透明度で base と線形補間
+
+    out = base + (func(base, blend) - base) * a / 255
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w) or チャンネル毎の (h, w, c)
+        out (Optional[npt.NDArray[np.uint8]]): 出力先 (h, w, c)、base と同じ配列も指定可能
+        buffer (Optional[ScratchBuffer]): 作業領域、None の場合は新規に確保
+        func (_ChannelFunc): 1チャンネル分の合成値を計算する関数
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    if out is None:
+        out = np.empty(base.shape, np.uint8)
+
+    alpha = alpha if alpha.ndim == base.ndim else alpha[..., np.newaxis]
+    inverse_alpha = 255 - alpha
+
+    value, scratch = scratch_planes(base.shape[:-1], buffer)
+
+    for c in range(base.shape[-1]):
+        base_c = base[..., c]
+        alpha_c = c if alpha.shape[-1] > 1 else 0
+
+        func(base_c, blend[..., c], value, scratch)
+
+        # value * a + base * (255 - a)
+        value *= alpha[..., alpha_c]
+        np.multiply(base_c, inverse_alpha[..., alpha_c], out=scratch, dtype=np.uint16)
+        value += scratch
+        _div255(value, scratch)
+
+        np.copyto(out[..., c], value, casting="unsafe")
+
+    return out
+
+
+def _normal(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    np.copyto(value, blend)
+
+
+def _multiply(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    # base * blend / 255
+    np.multiply(base, blend, out=value, dtype=np.uint16)
+    _div255(value, scratch)
+
+
+def _screen(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    # 255 - (255 - base) * (255 - blend) / 255
+    np.subtract(255, base, out=value, dtype=np.uint16)
+    np.subtract(255, blend, out=scratch, dtype=np.uint16)
+    value *= scratch
+    _div255(value, scratch)
+    np.subtract(255, value, out=value)
+
+
+def _overlay(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    # base < 128 : 2 * base * blend / 255
+    # base >= 128: 255 - 2 * (255 - base) * (255 - blend) / 255
+    # NOTE: 255 - x は x ^ 255 と等しいため、明部のみ 255 の mask との XOR で分岐せずに折り返します.
+    mask = np.right_shift(base, 7)
+    np.negative(mask, out=mask)
+
+    np.bitwise_xor(base, mask, out=value, dtype=np.uint16)
+    value <<= 1
+    np.bitwise_xor(blend, mask, out=scratch, dtype=np.uint16)
+    value *= scratch
+    _div255(value, scratch)
+    value ^= mask
+
+
+def _add(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    # min(base + blend, 255)
+    np.add(base, blend, out=value, dtype=np.uint16)
+    np.minimum(value, 255, out=value)
+
+
+def _subtract(base:npt.NDArray[np.uint8], blend:npt.NDArray[np.uint8], value:npt.NDArray[np.uint16], scratch:npt.NDArray[np.uint16]) -> None:
+    # max(base - blend, 0) = max(base, blend) - blend
+    np.maximum(base, blend, out=value)
+    value -= blend
+
+
+def blend_normal(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """通常 (alpha_composite の uint8 の STRAIGHT はこの関数で計算します)
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w) or チャンネル毎の (h, w, c)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _normal)
+
+
+def blend_difference(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """差の絶対値
+
+    ImageLayerCanvas の従来の実装に合わせ、透明度は Blend に乗算します。
+    out = |base - blend * a / 255|
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    if out is None:
+        out = np.empty(base.shape, np.uint8)
+
+    alpha = alpha[..., 0] if alpha.ndim == base.ndim else alpha
+
+    value, scratch = scratch_planes(base.shape[:-1], buffer)
+
+    for c in range(base.shape[-1]):
+        # blend * a / 255
+        np.multiply(blend[..., c], alpha, out=value, dtype=np.uint16)
+        _div255(value, scratch)
+
+        # |base - blend * a / 255|
+        np.maximum(base[..., c], value, out=scratch)
+        np.minimum(base[..., c], value, out=value)
+        scratch -= value
+
+        np.copyto(out[..., c], scratch, casting="unsafe")
+
+    return out
+
+
+def blend_multiply(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """乗算
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _multiply)
+
+
+def blend_screen(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """スクリーン
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _screen)
+
+
+def blend_overlay(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """オーバーレイ
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _overlay)
+
+
+def blend_add(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """加算 (覆い焼き (リニア))
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _add)
+
+
+def blend_subtract(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """減算
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    return _blend_channels(base, blend, alpha, out, buffer, _subtract)
+
+
+# ブレンドモード毎のカーネル
+BLEND_KERNELS:dict[BlendMode, BlendKernel] = {
+    BlendMode.NORMAL: blend_normal,
+    BlendMode.DIFFERENCE: blend_difference,
+    BlendMode.MULTIPLY: blend_multiply,
+    BlendMode.SCREEN: blend_screen,
+    BlendMode.OVERLAY: blend_overlay,
+    BlendMode.ADD: blend_add,
+    BlendMode.SUBTRACT: blend_subtract,
+}
+
+
+def apply_blend(
+    base:npt.NDArray[np.uint8],
+    blend:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    blend_mode:BlendMode,
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    buffer:Optional[ScratchBuffer] = None,
+    workers:Optional[int] = None,
+) -> npt.NDArray[np.uint8]:
+    """ブレンドモードを指定して合成
+
+    workers を指定すると行の帯に分割して共有のスレッドプールで並列に計算します。結果は帯の数に依存しません。
+
+    Args:
+        base (npt.NDArray[np.uint8]): Base (h, w, c)
+        blend (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w)
+        blend_mode (BlendMode): ブレンドモード
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、base と同じ配列も指定可能. Defaults to None.
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保 (並列時は帯毎に確保). Defaults to None.
+        workers (Optional[int], optional): 並列に計算する帯の数、None の場合は呼び出し元のスレッドで計算. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成結果
+    """
+    assert blend_mode in BLEND_KERNELS, f"{blend_mode} is an unsupported blend mode."
+    kernel = BLEND_KERNELS[blend_mode]
+
+    if workers is None or workers <= 1:
+        return kernel(base, blend, alpha, out, buffer)
+
+    if out is None:
+        out = np.empty(base.shape, np.uint8)
+
+    run_row_bands(lambda rows: kernel(base[rows], blend[rows], alpha[rows], out[rows], None), base.shape[0], workers)
+    return out
@@ -0,0 +1,215 @@
+from typing import Optional
+import numpy as np
+import numpy.typing as npt
+
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_bounding_box_array import BoundingBoxArray
+
+
+__all__ = [
+    "pairwise_intersection_area",
+    "pairwise_iou",
+    "non_maximum_suppression",
+    "merge_overlapping_bboxes",
+]
+
+
+BoundingBoxes = npt.NDArray[np.int64] | list[BoundingBox] | BoundingBoxArray
+
+
+def _as_array(bboxes:BoundingBoxes) -> npt.NDArray[np.int64]:
+    """バウンディングボックス群を (N, 4) 配列に変換
+
+    Args:
+        bboxes (BoundingBoxes): (N, 4) 配列、BoundingBoxのリスト、BoundingBoxArray
+
+    Returns:
+        npt.NDArray[np.int64]: (N, 4) 配列
+    """
+    if isinstance(bboxes, list):
+        return BoundingBox.to_array(bboxes)
+    return np.asarray(bboxes, np.int64).reshape(-1, 4)
+
+
+def _intersection_area(lhs:npt.NDArray[np.int64], rhs:npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """ブロードキャスト可能な2組の交差面積
+
+    Args:
+        lhs (npt.NDArray[np.int64]): (..., 4) 配列
+        rhs (npt.NDArray[np.int64]): (..., 4) 配列
+
+    Returns:
+        npt.NDArray[np.int64]: 交差面積
+    """
+    w = np.minimum(lhs[..., 2], rhs[..., 2]) - np.maximum(lhs[..., 0], rhs[..., 0])
+    h = np.minimum(lhs[..., 3], rhs[..., 3]) - np.maximum(lhs[..., 1], rhs[..., 1])
+    return np.maximum(w, 0) * np.maximum(h, 0)
+
+
+def _area(bboxes:npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    """面積
+
+    Args:
+        bboxes (npt.NDArray[np.int64]): (..., 4) 配列
+
+    Returns:
+        npt.NDArray[np.int64]: 面積 (BoundingBox.area と同じ定義)
+    """
+    return (bboxes[..., 2] - bboxes[..., 0]) * (bboxes[..., 3] - bboxes[..., 1])
+
+
+def _iou(intersection:npt.NDArray[np.int64], lhs_area:npt.NDArray[np.int64], rhs_area:npt.NDArray[np.int64]) -> npt.NDArray[np.float64]:
+    """交差面積と各面積からIoUを計算
+
+    和集合の面積が0の場合は0とします。
+
+    Args:
+        intersection (npt.NDArray[np.int64]): 交差面積
+        lhs_area (npt.NDArray[np.int64]): 左辺の面積
+        rhs_area (npt.NDArray[np.int64]): 右辺の面積
+
+    Returns:
+        npt.NDArray[np.float64]: IoU
+    """
+    union = lhs_area + rhs_area - intersection
+    return np.divide(intersection, union, out=np.zeros(union.shape, np.float64), where=union > 0)
+
+
+def pairwise_intersection_area(lhs:BoundingBoxes, rhs:Optional[BoundingBoxes] = None) -> npt.NDArray[np.int64]:
+    """総当たりの交差面積
+
+    面積は BoundingBox.area と同じく (xmax - xmin) * (ymax - ymin) で計算します。
+
+    Args:
+        lhs (BoundingBoxes): N個のバウンディングボックス
+        rhs (Optional[BoundingBoxes], optional): M個のバウンディングボックス、None の場合は lhs 同士. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.int64]: (N, M) 交差面積
+    """
+    lhs = _as_array(lhs)
+    rhs = lhs if rhs is None else _as_array(rhs)
+    return _intersection_area(lhs[:, np.newaxis, :], rhs[np.newaxis, :, :])
+
+
+def pairwise_iou(lhs:BoundingBoxes, rhs:Optional[BoundingBoxes] = None) -> npt.NDArray[np.float64]:
+    """総当たりのIoU (Intersection over Union)
+
+    Args:
+        lhs (BoundingBoxes): N個のバウンディングボックス
+        rhs (Optional[BoundingBoxes], optional): M個のバウンディングボックス、None の場合は lhs 同士. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.float64]: (N, M) IoU
+    """
+    lhs = _as_array(lhs)
+    rhs = lhs if rhs is None else _as_array(rhs)
+    intersection = _intersection_area(lhs[:, np.newaxis, :], rhs[np.newaxis, :, :])
+    return _iou(intersection, _area(lhs)[:, np.newaxis], _area(rhs)[np.newaxis, :])
+
+
+def non_maximum_suppression(
+    bboxes:BoundingBoxes,
+    scores:Optional[npt.ArrayLike] = None,
+    iou_threshold:float = 0.5,
+) -> npt.NDArray[np.intp]:
+    """貪欲法によるNon-Maximum Suppression
+
+    スコアの高い順に採用し、採用済みとのIoUが閾値を超えるものを除外します。
+    総当たりの行列は作成しないため、メモリ使用量は O(N) です。
+
+    Args:
+        bboxes (BoundingBoxes): N個のバウンディングボックス
+        scores (Optional[npt.ArrayLike], optional): (N,) スコア、None の場合は面積. Defaults to None.
+        iou_threshold (float, optional): 除外するIoUの閾値. Defaults to 0.5.
+
+    Returns:
+        npt.NDArray[np.intp]: 採用したインデックス (スコアの降順)
+    """
+    bboxes = _as_array(bboxes)
+    areas = _area(bboxes)
+    scores = areas if scores is None else np.asarray(scores)
+
+    order = np.argsort(-scores, kind="stable")
+    keep:list[int] = []
+
+    while order.size > 0:
+        index = order[0]
+        keep.append(index)
+
+        rest = order[1:]
+        iou = _iou(_intersection_area(bboxes[index], bboxes[rest]), areas[index], areas[rest])
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, np.intp)
+
+
+def merge_overlapping_bboxes(
+    bboxes:BoundingBoxes,
+    iou_threshold:float = 0.0,
+    block_size:int = 1024,
+) -> npt.NDArray[np.int64]:
+    """重なり合うバウンディングボックスを統合
+
+    IoUが閾値を超える組を辿って連結したグループ毎に、全要素を内包するバウンディングボックスを作成します。
+    xmin でソートした上で block_size 行毎に、x方向で重なり得る範囲のみを判定します。
+
+    Args:
+        bboxes (BoundingBoxes): N個のバウンディングボックス
+        iou_threshold (float, optional): 統合するIoUの閾値、0.0 の場合は交差していれば統合. Defaults to 0.0.
+        block_size (int, optional): 一度に判定する行数. Defaults to 1024.
+
+    Returns:
+        npt.NDArray[np.int64]: (K, 4) 統合後のバウンディングボックス (グループ内の最小インデックス順)
+    """
+    bboxes = _as_array(bboxes)
+    n = len(bboxes)
+
+    # xmin でソートし、各ブロックは xmin が右端を超えない範囲のみと判定
+    order = np.argsort(bboxes[:, 0], kind="stable")
+    sorted_bboxes = bboxes[order]
+    sorted_areas = _area(sorted_bboxes)
+
+    # 閾値を超える組 (i < j) を収集
+    lhs_indices:list[npt.NDArray[np.intp]] = [np.zeros(0, np.intp)]
+    rhs_indices:list[npt.NDArray[np.intp]] = [np.zeros(0, np.intp)]
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        end = max(stop, int(np.searchsorted(sorted_bboxes[:, 0], sorted_bboxes[start:stop, 2].max(), side="right")))
+
+        block = sorted_bboxes[start:stop, np.newaxis, :]
+        candidates = sorted_bboxes[np.newaxis, start:end, :]
+        intersection = _intersection_area(block, candidates)
+        union = sorted_areas[start:stop, np.newaxis] + sorted_areas[np.newaxis, start:end] - intersection
+
+        # intersection / union > iou_threshold を除算せずに判定
+        i, j = np.nonzero(np.triu((intersection > iou_threshold * union) & (union > 0), k=1))
+        lhs_indices.append(order[i + start])
+        rhs_indices.append(order[j + start])
+
+    lhs_index = np.concatenate(lhs_indices)
+    rhs_index = np.concatenate(rhs_indices)
+
+    # 連結成分のラベル付け (最小インデックスに収束するまで伝播)
+    labels = np.arange(n)
+    while True:
+        minimum = np.minimum(labels[lhs_index], labels[rhs_index])
+        new_labels = labels.copy()
+        np.minimum.at(new_labels, lhs_index, minimum)
+        np.minimum.at(new_labels, rhs_index, minimum)
+        new_labels = new_labels[new_labels]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    # グループ毎に内包するバウンディングボックスを作成
+    groups, inverse = np.unique(labels, return_inverse=True)
+    merged = np.empty((len(groups), 4), np.int64)
+    merged[:, :2] = np.iinfo(np.int64).max
+    merged[:, 2:] = np.iinfo(np.int64).min
+    np.minimum.at(merged[:, 0], inverse, bboxes[:, 0])
+    np.minimum.at(merged[:, 1], inverse, bboxes[:, 1])
+    np.maximum.at(merged[:, 2], inverse, bboxes[:, 2])
+    np.maximum.at(merged[:, 3], inverse, bboxes[:, 3])
+    return merged
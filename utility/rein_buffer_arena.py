@@ -0,0 +1,177 @@
+from contextlib import contextmanager
+from typing import Iterator
+import numpy as np
+import numpy.typing as npt
+from PIL import Image
+
+from reinlib.types.rein_color import Color
+
+
+__all__ = [
+    "BufferArena",
+]
+
+
+# 配列の識別キー (shape, dtype)
+ArrayKey = tuple[tuple[int, ...], str]
+
+# 画像の識別キー (mode, size)
+ImageKey = tuple[str, tuple[int, int]]
+
+
+class BufferArena:
+    """再利用可能な配列と画像のプール
+
+    サンプル毎に同じ形状のキャンバスや透明度の配列を確保し直さないよう、(shape, dtype) 毎に配列を使い回します。
+    scope 内で取得した配列は scope を抜ける際にまとめて返却されるため、定常状態では新規の確保が発生しません。
+
+    ```
+    arena = BufferArena()
+    for sample in samples:
+        with arena.scope():
+            scene = arena.full((h, w, 3), 255)
+            alpha = arena.empty((h, w, 1))
+            alpha_composite(src, scene, alpha, out=scene)
+    ```
+
+    返却済みの配列を参照し続けると、次の取得時に内容が上書きされるため注意してください。
+    """
+    def __init__(self) -> None:
+        # 返却済みの配列
+        self.free_arrays:dict[ArrayKey, list[npt.NDArray]] = {}
+        # 返却済みの画像
+        self.free_images:dict[ImageKey, list[Image.Image]] = {}
+        # 貸出中の配列と画像 (取得順)
+        self.acquired:list[tuple[ArrayKey | ImageKey, npt.NDArray | Image.Image]] = []
+
+        # 新規に確保した回数
+        self.allocations = 0
+        # 再利用した回数
+        self.reuses = 0
+
+    def __len__(self) -> int:
+        return len(self.acquired)
+
+    def empty(self, shape:tuple[int, ...], dtype:npt.DTypeLike = np.uint8) -> npt.NDArray:
+        """初期化しない配列を取得
+
+        Args:
+            shape (tuple[int, ...]): 形状
+            dtype (npt.DTypeLike, optional): 型. Defaults to np.uint8.
+
+        Returns:
+            npt.NDArray: 配列 (内容は不定)
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+
+        if free:=self.free_arrays.get(key):
+            array = free.pop()
+            self.reuses += 1
+        else:
+            array = np.empty(shape, dtype)
+            self.allocations += 1
+
+        self.acquired.append((key, array))
+        return array
+
+    def zeros(self, shape:tuple[int, ...], dtype:npt.DTypeLike = np.uint8) -> npt.NDArray:
+        """0 で初期化した配列を取得
+
+        Args:
+            shape (tuple[int, ...]): 形状
+            dtype (npt.DTypeLike, optional): 型. Defaults to np.uint8.
+
+        Returns:
+            npt.NDArray: 配列
+        """
+        array = self.empty(shape, dtype)
+        array.fill(0)
+        return array
+
+    def full(self, shape:tuple[int, ...], fill_value:int | float | tuple[int, ...], dtype:npt.DTypeLike = np.uint8) -> npt.NDArray:
+        """指定した値で初期化した配列を取得
+
+        Args:
+            shape (tuple[int, ...]): 形状
+            fill_value (int | float | tuple[int, ...]): 初期値 (最終軸にブロードキャスト可能なタプルも可)
+            dtype (npt.DTypeLike, optional): 型. Defaults to np.uint8.
+
+        Returns:
+            npt.NDArray: 配列
+        """
+        array = self.empty(shape, dtype)
+        array[...] = fill_value
+        return array
+
+    def image(self, mode:str, size:tuple[int, int], color:int | tuple[int, ...] | Color = 0) -> Image.Image:
+        """指定した色で塗りつぶした画像を取得
+
+        draw_text_layout などの描画先として使用します。
+
+        Args:
+            mode (str): 画像モード
+            size (tuple[int, int]): 画像サイズ (w, h)
+            color (int | tuple[int, ...] | Color, optional): 塗りつぶす色. Defaults to 0.
+
+        Returns:
+            Image.Image: 画像
+        """
+        key = (mode, tuple(size))
+
+        if isinstance(color, Color):
+            color = color.rgba if mode == "RGBA" else color.rgb if mode == "RGB" else color.grayscale
+
+        if free:=self.free_images.get(key):
+            image = free.pop()
+            image.paste(color, (0, 0, *size))
+            self.reuses += 1
+        else:
+            image = Image.new(mode, size, color)
+            self.allocations += 1
+
+        self.acquired.append((key, image))
+        return image
+
+    def release(self, value:npt.NDArray | Image.Image) -> None:
+        """貸出中の配列もしくは画像を返却
+
+        Args:
+            value (npt.NDArray | Image.Image): 取得した配列もしくは画像
+        """
+        for index in range(len(self.acquired) - 1, -1, -1):
+            if self.acquired[index][1] is value:
+                self._release(*self.acquired.pop(index))
+                return
+        assert False, "value was not acquired from this arena."
+
+    def _release(self, key:ArrayKey | ImageKey, value:npt.NDArray | Image.Image) -> None:
+        """返却済みのプールに追加
+
+        Args:
+            key (ArrayKey | ImageKey): 識別キー
+            value (npt.NDArray | Image.Image): 配列もしくは画像
+        """
+        if isinstance(value, Image.Image):
+            self.free_images.setdefault(key, []).append(value)
+        else:
+            self.free_arrays.setdefault(key, []).append(value)
+
+    @contextmanager
+    def scope(self) -> Iterator["BufferArena"]:
+        """scope 内で取得した配列と画像を、scope を抜ける際にまとめて返却
+
+        Yields:
+            Iterator[BufferArena]: self
+        """
+        mark = len(self.acquired)
+        try:
+            yield self
+        finally:
+            while len(self.acquired) > mark:
+                self._release(*self.acquired.pop())
+
+    def clear(self) -> None:
+        """返却済みの配列と画像を破棄
+        """
+        self.free_arrays.clear()
+        self.free_images.clear()
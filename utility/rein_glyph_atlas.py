@@ -0,0 +1,511 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import numpy as np
+import numpy.typing as npt
+from PIL import Image, ImageDraw, ImageFont
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_color_method import ColorMethod
+from reinlib.types.rein_text_layout import TextLayout
+from reinlib.utility.rein_blend import _div255
+from reinlib.utility.rein_glyph_metrics import GlyphCacheInfo, font_key
+
+
+__all__ = [
+    "render_text_mask",
+    "GlyphAtlas",
+]
+
+
+# グリフのマスク, マスクの左上のペン位置からのオフセット (x, y)
+Glyph = tuple[npt.NDArray[np.uint8], int, int]
+
+
+def _pixel(x:int) -> int:
+    """26.6 固定小数点を四捨五入してピクセルに変換 (FreeType の PIXEL マクロと同じ)
+
+    Args:
+        x (int): 26.6 固定小数点
+
+    Returns:
+        int: ピクセル
+    """
+    return ((x + 32) & -64) >> 6
+
+
+def _lru_get(entries:OrderedDict, key:Hashable) -> Any:
+    """LRU キャッシュから取得 (呼び出し元でロックを取得すること)
+
+    Args:
+        entries (OrderedDict): キャッシュ (参照順)
+        key (Hashable): キー
+
+    Returns:
+        Any: 値、存在しない場合は None
+    """
+    if (value:=entries.get(key)) is not None:
+        entries.move_to_end(key)
+    return value
+
+
+def _lru_put(entries:OrderedDict, key:Hashable, value:Any, maxsize:int) -> Any:
+    """LRU キャッシュに追加し、上限を超えた場合は最も長く参照されていない値から破棄 (呼び出し元でロックを取得すること)
+
+    Args:
+        entries (OrderedDict): キャッシュ (参照順)
+        key (Hashable): キー
+        value (Any): 値
+        maxsize (int): 保持する値の上限、0 の場合はキャッシュしない
+
+    Returns:
+        Any: 追加した値
+    """
+    if maxsize > 0:
+        entries[key] = value
+        if len(entries) > maxsize:
+            entries.popitem(last=False)
+    return value
+
+
+class _StrokeOnlyFont:
+    """縁取りのみをラスタライズするフォント
+
+    ImageDraw.text は縁取りの太さを指定すると縁取りと文字を順に描画するため、
+    文字の描画では空のテキストのマスクを返して縁取りのマスクのみを描画させます。
+    """
+    def __init__(self, font:ImageFont.FreeTypeFont) -> None:
+        """コンストラクタ
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+        """
+        self.font = font
+
+    def getmask2(self, text:str, *args, stroke_width:int = 0, **kwargs) -> tuple[Any, tuple[int, int]]:
+        return self.font.getmask2(text if stroke_width else "", *args, stroke_width=stroke_width, **kwargs)
+
+
+def render_text_mask(
+    font:ImageFont.FreeTypeFont,
+    text:str,
+    anchor:Optional[str] = None,
+    stroke_width:int = 0,
+) -> tuple[npt.NDArray[np.uint8], Int2]:
+    """font.getmask2 と同じテキストのマスクを作成
+
+    font.getbbox の範囲の黒い画像に ImageDraw.text で白く描画します。
+    黒への白の合成はマスクの値と一致するため、font.getmask2 のマスクと同じ画素値になります。
+
+    Args:
+        font (ImageFont.FreeTypeFont): フォント
+        text (str): テキスト (1 行)
+        anchor (Optional[str], optional): 文字寄せ. Defaults to None.
+        stroke_width (int, optional): 縁取りの太さ、指定した場合は縁取りのみのマスク. Defaults to 0.
+
+    Returns:
+        tuple[npt.NDArray[np.uint8], Int2]: マスク (h, w) と、描画位置からマスクの左上へのオフセット
+    """
+    xmin, ymin, xmax, ymax = font.getbbox(text, stroke_width=stroke_width, anchor=anchor)
+
+    image = Image.new("L", (xmax - xmin, ymax - ymin), 0)
+    ImageDraw.Draw(image).text(
+        (-xmin, -ymin),
+        text,
+        255,
+        _StrokeOnlyFont(font) if stroke_width else font,
+        anchor=anchor,
+        stroke_width=stroke_width,
+        stroke_fill=255,
+    )
+
+    return np.asarray(image), Int2(xmin, ymin)
+
+
+class GlyphAtlas:
+    """グリフのマスクを一度だけラスタライズして使い回す文字描画
+
+    (文字, 縁取りの太さ) 毎に font.getmask2 のマスクをキャッシュし、
+    行のマスクはキャッシュしたマスクをペン位置に合成して作成します。
+    ペン位置は PIL の基本レイアウトと同じく 26.6 固定小数点の送り幅とカーニングの累積です。
+    グリフの重なりと文字色の合成は PIL と同じ固定小数点の演算のため、ImageDraw.text と同じ画素値になります。
+
+    Raqm レイアウトの合字や位置調整は再現できないため、ImageFont.Layout.BASIC のフォントのみ対応します。
+    描画位置は整数、テキストは 1 行のみ対応します。
+
+    マスク、送り幅、カーニングは LRU キャッシュのため、CJK などの文字数の多いテキストでも上限を超えて増加しません。
+    for_font の共有インスタンスは複数のスレッドから使用できるよう、キャッシュの参照と追加をロックします。
+    ラスタライズはロックの外で行うため、同じ文字を同時に要求した場合は重複して作成することがあります。
+    """
+    # フォント毎の共有インスタンス (参照順)
+    _atlases:OrderedDict[Hashable, "GlyphAtlas"] = OrderedDict()
+    _atlases_lock = threading.Lock()
+
+    # 共有インスタンスの上限
+    max_atlases = 16
+
+    def __init__(self, font:ImageFont.FreeTypeFont, maxsize:int = 4096, metrics_maxsize:int = 65536) -> None:
+        """コンストラクタ
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント (ImageFont.Layout.BASIC)
+            maxsize (int, optional): 保持するマスクの上限、0 の場合はキャッシュしない. Defaults to 4096.
+            metrics_maxsize (int, optional): 保持する送り幅とカーニングのそれぞれの上限、0 の場合はキャッシュしない. Defaults to 65536.
+        """
+        assert font.layout_engine == ImageFont.Layout.BASIC, f"only supports ImageFont.Layout.BASIC, {font.layout_engine}."
+        assert maxsize >= 0, f"maxsize must be non-negative, {maxsize}."
+        assert metrics_maxsize >= 0, f"metrics_maxsize must be non-negative, {metrics_maxsize}."
+
+        self.font = font
+        self.maxsize = maxsize
+        self.metrics_maxsize = metrics_maxsize
+
+        # (文字, 縁取りの太さ) 毎のマスク
+        self.glyphs:OrderedDict[tuple[str, int], Glyph] = OrderedDict()
+        # 文字毎の送り幅 (26.6)
+        self.advances:OrderedDict[str, int] = OrderedDict()
+        # 連続する 2 文字のカーニング (26.6)
+        self.kernings:OrderedDict[tuple[str, str], int] = OrderedDict()
+        # 文字寄せ (縦方向) 毎の基準線からのオフセット
+        self.y_anchors:dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        # キャッシュの参照と追加のロック
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.glyphs)
+
+    def cache_info(self) -> GlyphCacheInfo:
+        """マスクのキャッシュの統計を取得
+
+        Returns:
+            GlyphCacheInfo: hits, misses, maxsize, currsize
+        """
+        with self.lock:
+            return GlyphCacheInfo(self.hits, self.misses, self.maxsize, len(self.glyphs))
+
+    @classmethod
+    def for_font(cls, font:ImageFont.FreeTypeFont) -> "GlyphAtlas":
+        """フォント毎の共有インスタンスを取得
+
+        同じフォントファイルとサイズのフォントは同じインスタンスを共有します。
+        max_atlases を超えた場合は最も長く参照されていないインスタンスから破棄します。
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+
+        Returns:
+            GlyphAtlas: 共有インスタンス
+        """
+        key = font_key(font)
+
+        with cls._atlases_lock:
+            if (atlas:=_lru_get(cls._atlases, key)) is None:
+                atlas = _lru_put(cls._atlases, key, cls(font), cls.max_atlases)
+            return atlas
+
+    @classmethod
+    def clear_atlases(cls) -> None:
+        """共有インスタンスを破棄
+        """
+        with cls._atlases_lock:
+            cls._atlases.clear()
+
+    def glyph(self, character:str, stroke_width:int = 0) -> Glyph:
+        """文字のマスクを取得
+
+        Args:
+            character (str): 文字
+            stroke_width (int, optional): 縁取りの太さ. Defaults to 0.
+
+        Returns:
+            Glyph: マスク (h, w) と、基準線上のペン位置からマスクの左上へのオフセット
+        """
+        key = (character, stroke_width)
+
+        with self.lock:
+            if (glyph:=_lru_get(self.glyphs, key)) is not None:
+                self.hits += 1
+                return glyph
+
+            self.misses += 1
+
+        mask, offset = render_text_mask(self.font, character, "ls", stroke_width)
+        mask.flags.writeable = False
+
+        with self.lock:
+            return _lru_put(self.glyphs, key, (mask, offset.x, offset.y), self.maxsize)
+
+    def advance(self, character:str) -> int:
+        """文字の送り幅を取得
+
+        Args:
+            character (str): 文字
+
+        Returns:
+            int: 送り幅 (26.6)
+        """
+        with self.lock:
+            if (advance:=_lru_get(self.advances, character)) is not None:
+                return advance
+
+        advance = round(self.font.getlength(character) * 64)
+
+        with self.lock:
+            return _lru_put(self.advances, character, advance, self.metrics_maxsize)
+
+    def kerning(self, left:str, right:str) -> int:
+        """連続する 2 文字のカーニングを取得
+
+        Args:
+            left (str): 左の文字
+            right (str): 右の文字
+
+        Returns:
+            int: 左の文字の送り幅への加算値 (26.6)
+        """
+        key = (left, right)
+
+        with self.lock:
+            if (kerning:=_lru_get(self.kernings, key)) is not None:
+                return kerning
+
+        kerning = round(self.font.getlength(left + right) * 64) - self.advance(left) - self.advance(right)
+
+        with self.lock:
+            return _lru_put(self.kernings, key, kerning, self.metrics_maxsize)
+
+    def pen_positions(self, text:str) -> tuple[list[int], int]:
+        """文字毎のペン位置を取得
+
+        Args:
+            text (str): テキスト
+
+        Returns:
+            tuple[list[int], int]: 文字毎のペン位置と、テキスト全体の送り幅 (26.6)
+        """
+        positions = []
+        position = 0
+
+        for i, character in enumerate(text):
+            positions.append(position)
+            position += self.advance(character)
+            if i + 1 < len(text):
+                position += self.kerning(character, text[i + 1])
+
+        return positions, position
+
+    def y_anchor(self, vertical:str, text:str) -> int:
+        """縦方向の文字寄せの基準線からのオフセットを取得
+
+        Args:
+            vertical (str): 文字寄せの 2 文字目
+            text (str): テキスト ("t", "b" の場合に使用)
+
+        Returns:
+            int: オフセット (上方向が正)
+        """
+        if vertical == "s":
+            return 0
+
+        if vertical in ("t", "b"):
+            # 縁取りなしのマスクの範囲 (基準線を含む) から計算
+            y_max, y_min = 0, 0
+            for character in text:
+                mask, _, y = self.glyph(character)
+                y_max, y_min = max(y_max, -y), min(y_min, -y - mask.shape[0])
+            return y_max if vertical == "t" else y_min
+
+        if (y_anchor:=self.y_anchors.get(vertical)) is None:
+            _, (_, y) = self.font.getmask2(" ", "L", anchor=f"l{vertical}")
+            _, (_, y_baseline) = self.font.getmask2(" ", "L", anchor="ls")
+            y_anchor = self.y_anchors[vertical] = y - y_baseline
+        return y_anchor
+
+    def render_mask(self, text:str, stroke_width:int = 0, anchor:Optional[str] = None) -> tuple[npt.NDArray[np.uint8], Int2]:
+        """行のマスクを作成
+
+        Args:
+            text (str): テキスト (1 行)
+            stroke_width (int, optional): 縁取りの太さ. Defaults to 0.
+            anchor (Optional[str], optional): 文字寄せ、None の場合は "la". Defaults to None.
+
+        Returns:
+            tuple[npt.NDArray[np.uint8], Int2]: マスク (h, w) と、描画位置からマスクの左上へのオフセット
+        """
+        assert "\n" not in text, "multiline text is not supported."
+
+        anchor = "la" if anchor is None else anchor
+        assert len(anchor) == 2 and anchor[0] in "lmr" and anchor[1] in "atmsbd", f"bad anchor specified: {anchor}"
+
+        if len(text) == 0:
+            return np.zeros((0, 0), np.uint8), Int2.zero()
+
+        positions, length = self.pen_positions(text)
+        x_anchor = {"l": 0, "m": _pixel(int(length / 2)), "r": _pixel(length)}[anchor[0]]
+        y_anchor = self.y_anchor(anchor[1], text)
+
+        glyphs = [self.glyph(character, stroke_width) for character in text]
+        xs = [_pixel(position) + x - x_anchor for position, (_, x, _) in zip(positions, glyphs)]
+        ys = [y + y_anchor for _, _, y in glyphs]
+
+        xmin, ymin = min(xs), min(ys)
+        xmax = max(x + mask.shape[1] for x, (mask, _, _) in zip(xs, glyphs))
+        ymax = max(y + mask.shape[0] for y, (mask, _, _) in zip(ys, glyphs))
+
+        line = np.zeros((ymax - ymin, xmax - xmin), np.uint8)
+        scratch = np.empty(line.shape, np.uint16)
+        shifted = np.empty(line.shape, np.uint16)
+
+        for (mask, _, _), x, y in zip(glyphs, xs, ys):
+            height, width = mask.shape
+            target = line[y - ymin:y - ymin + height, x - xmin:x - xmin + width]
+
+            # 重なりがない場合の重ね合わせの結果はマスクと一致
+            if not target.any():
+                np.copyto(target, mask)
+                continue
+
+            work = scratch[:height, :width]
+
+            # target = source + target * (255 - source) / 255 (PIL の font_render と同じ重ね合わせ)
+            np.subtract(255, mask, out=work, dtype=np.uint16)
+            work *= target
+            _div255(work, shifted[:height, :width])
+            work += mask
+            np.copyto(target, work, casting="unsafe")
+
+        return line, Int2(xmin, ymin)
+
+    def draw_mask(
+        self,
+        canvas:npt.NDArray[np.uint8],
+        xy:Int2,
+        mask:npt.NDArray[np.uint8],
+        ink:int | tuple[int, ...],
+    ) -> None:
+        """マスクを通して文字色を合成 (ImageDraw の draw_bitmap と同じ演算)
+
+        Args:
+            canvas (npt.NDArray[np.uint8]): 描画先 (H, W) or (H, W, 3) or (H, W, 4)
+            xy (Int2): マスクの左上の位置
+            mask (npt.NDArray[np.uint8]): マスク (h, w)
+            ink (int | tuple[int, ...]): 文字色 (描画先のチャンネル数と一致)
+        """
+        canvas_height, canvas_width = canvas.shape[:2]
+        height, width = mask.shape
+
+        xmin, ymin = max(0, xy.x), max(0, xy.y)
+        xmax, ymax = min(canvas_width, xy.x + width), min(canvas_height, xy.y + height)
+
+        if xmax <= xmin or ymax <= ymin:
+            return
+
+        mask = mask[ymin - xy.y:ymax - xy.y, xmin - xy.x:xmax - xy.x]
+        region = canvas[ymin:ymax, xmin:xmax]
+
+        if region.ndim == 2:
+            region = region[..., np.newaxis]
+
+        ink = (ink, ) if isinstance(ink, int) else tuple(ink)
+        assert len(ink) == region.shape[-1], f"ink channels mismatch, {len(ink)} != {region.shape[-1]}."
+
+        if region.shape[-1] == 4:
+            # NOTE: 完全に透明な画素の色は透明度に依らず文字色で置き換えます (PIL の fill_mask_L と同じ).
+            color_mask = np.where((mask != 0) & (region[..., 3] == 0), 255, mask).astype(np.uint8)
+        else:
+            color_mask = mask
+
+        work = np.empty(mask.shape, np.uint16)
+        blend = np.empty(mask.shape, np.uint16)
+
+        for c, value in enumerate(ink):
+            channel_mask = mask if c == 3 else color_mask
+
+            # BLEND(mask, out, ink) = (out * (255 - mask) + ink * mask) / 255
+            np.subtract(255, channel_mask, out=work, dtype=np.uint16)
+            work *= region[..., c]
+            np.multiply(channel_mask, value, out=blend, dtype=np.uint16)
+            work += blend
+            _div255(work, blend)
+            np.copyto(region[..., c], work, casting="unsafe")
+
+    def text(
+        self,
+        canvas:npt.NDArray[np.uint8],
+        xy:Int2,
+        text:str,
+        fill:int | tuple[int, ...],
+        anchor:Optional[str] = None,
+        stroke_width:int = 0,
+        stroke_fill:Optional[int | tuple[int, ...]] = None,
+    ) -> None:
+        """ImageDraw.text と同じテキスト描画
+
+        Args:
+            canvas (npt.NDArray[np.uint8]): 描画先 (H, W) or (H, W, 3) or (H, W, 4)
+            xy (Int2): 描画位置
+            text (str): テキスト (1 行)
+            fill (int | tuple[int, ...]): 文字色
+            anchor (Optional[str], optional): 文字寄せ. Defaults to None.
+            stroke_width (int, optional): 縁取りの太さ. Defaults to 0.
+            stroke_fill (Optional[int | tuple[int, ...]], optional): 縁取りの色、None の場合は文字色. Defaults to None.
+        """
+        if stroke_width:
+            mask, offset = self.render_mask(text, stroke_width, anchor)
+            self.draw_mask(canvas, xy + offset, mask, fill if stroke_fill is None else stroke_fill)
+
+        mask, offset = self.render_mask(text, 0, anchor)
+        self.draw_mask(canvas, xy + offset, mask, fill)
+
+    def draw_text_layout(
+        self,
+        canvas:npt.NDArray[np.uint8],
+        text_pos:Int2,
+        text:str,
+        layout:TextLayout,
+        color_method:ColorMethod = ColorMethod.GRAYSCALE,
+    ) -> None:
+        """rein_text_draw.draw_text_layout と同じテキスト描画
+
+        Args:
+            canvas (npt.NDArray[np.uint8]): 描画先 (GRAYSCALE は (H, W), COLOR は (H, W, 3), ALPHA は (H, W, 4))
+            text_pos (Int2): 描画位置
+            text (str): テキスト (1 行)
+            layout (TextLayout): レイアウト (フォントはこのアトラスと同じフォント)
+            color_method (ColorMethod, optional): 色空間. Defaults to ColorMethod.GRAYSCALE.
+        """
+        assert font_key(layout.font) == font_key(self.font), "layout font does not match the atlas font."
+
+        if layout.is_shadow:
+            self.text(
+                canvas,
+                text_pos + layout.get_shadow_offset(),
+                text,
+                layout.get_shadow_color(color_method),
+                layout.anchor,
+                layout.shadow_weight,
+                layout.get_shadow_color(color_method),
+            )
+
+        if layout.is_outline:
+            self.text(
+                canvas,
+                text_pos,
+                text,
+                layout.get_color(color_method),
+                layout.anchor,
+                layout.outline_weight,
+                layout.get_outline_color(color_method),
+            )
+        else:
+            self.text(
+                canvas,
+                text_pos,
+                text,
+                layout.get_color(color_method),
+                layout.anchor,
+            )
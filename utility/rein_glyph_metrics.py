@@ -0,0 +1,450 @@
+import os
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, NamedTuple, Optional, Self
+import numpy as np
+import numpy.typing as npt
+from PIL import ImageFont
+
+from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_bounding_box_array import BoundingBoxArray
+
+
+__all__ = [
+    "GlyphCacheInfo",
+    "GlyphMetricsCache",
+    "font_key",
+    "glyph_metrics_cache",
+    "glyph_metrics_cache_info",
+    "clear_glyph_metrics_cache",
+    "GlyphMetricsTable",
+]
+
+
+class GlyphCacheInfo(NamedTuple):
+    """グリフ計測キャッシュの統計
+    """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_rate(self) -> float:
+        """ヒット率を取得
+
+        Returns:
+            float: ヒット率 (0.0 ~ 1.0)、未使用の場合は 0.0
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def font_key(font:ImageFont.FreeTypeFont) -> tuple[Hashable, ...]:
+    """フォントの識別キーを取得
+
+    同じフォントファイルとサイズで読み込んだフォントは、インスタンスが異なっても同じキーになります。
+    load_default などでメモリ上から読み込んだフォントは、読込元のファイルオブジェクト単位で識別します。
+    set_variation_by_name などによる可変フォントの軸の変更は識別しません。
+
+    Args:
+        font (ImageFont.FreeTypeFont): フォント
+
+    Returns:
+        tuple[Hashable, ...]: (読込元, サイズ, フォント番号, レイアウトエンジン)
+    """
+    return (
+        getattr(font, "path", font),
+        getattr(font, "size", None),
+        getattr(font, "index", None),
+        getattr(font, "layout_engine", None),
+    )
+
+
+class GlyphMetricsCache:
+    """font.getbbox の結果の LRU キャッシュ
+
+    (フォント, 文字, 文字寄せ) 毎に font.getbbox の結果を保持します。
+    上限を超えた場合は最も長く参照されていない結果から破棄します。
+    """
+    def __init__(self, maxsize:int = 65536) -> None:
+        """コンストラクタ
+
+        Args:
+            maxsize (int, optional): 保持する結果の上限、0 の場合はキャッシュしない. Defaults to 65536.
+        """
+        assert maxsize >= 0, f"maxsize must be non-negative, {maxsize}."
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self.entries:OrderedDict[tuple[Any, ...], tuple[int, int, int, int]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def getbbox(self, font:ImageFont.FreeTypeFont, character:str, anchor:str) -> tuple[int, int, int, int]:
+        """文字領域を取得
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            character (str): 文字
+            anchor (str): 文字寄せ
+
+        Returns:
+            tuple[int, int, int, int]: font.getbbox(character, anchor=anchor) と同じ文字領域
+        """
+        return self.getbboxes(font, (character, ), anchor)[0]
+
+    def getbboxes(self, font:ImageFont.FreeTypeFont, characters:Iterable[str], anchor:str) -> list[tuple[int, int, int, int]]:
+        """文字列の文字毎の文字領域を取得
+
+        フォントの識別キーの計算とロックの取得は文字列毎に 1 回だけ行います。
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            characters (Iterable[str]): 文字列もしくは文字の列
+            anchor (str): 文字寄せ
+
+        Returns:
+            list[tuple[int, int, int, int]]: 文字毎の文字領域
+        """
+        key = font_key(font)
+        bboxes = []
+
+        with self.lock:
+            for character in characters:
+                entry_key = (key, character, anchor)
+
+                if (bbox:=self.entries.get(entry_key)) is not None:
+                    self.entries.move_to_end(entry_key)
+                    self.hits += 1
+                else:
+                    bbox = tuple(font.getbbox(character, anchor=anchor))
+                    self.misses += 1
+
+                    if self.maxsize > 0:
+                        self.entries[entry_key] = bbox
+                        if len(self.entries) > self.maxsize:
+                            self.entries.popitem(last=False)
+
+                bboxes.append(bbox)
+
+        return bboxes
+
+    def cache_info(self) -> GlyphCacheInfo:
+        """キャッシュの統計を取得
+
+        Returns:
+            GlyphCacheInfo: hits, misses, maxsize, currsize
+        """
+        return GlyphCacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+    def clear(self) -> None:
+        """キャッシュと統計を破棄
+        """
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# rein_text_draw の文字領域の計算で共有するキャッシュ
+glyph_metrics_cache = GlyphMetricsCache()
+
+
+def glyph_metrics_cache_info() -> GlyphCacheInfo:
+    """共有のグリフ計測キャッシュの統計を取得
+
+    Returns:
+        GlyphCacheInfo: hits, misses, maxsize, currsize
+    """
+    return glyph_metrics_cache.cache_info()
+
+
+def clear_glyph_metrics_cache() -> None:
+    """共有のグリフ計測キャッシュを破棄
+    """
+    glyph_metrics_cache.clear()
+
+
+# calc_character_bboxes で文字領域を出力しない文字 (全角スペース)
+_SKIP_CODEPOINT = ord("\u3000")
+
+
+def _codepoints(text:str) -> npt.NDArray[np.int64]:
+    """文字列をコードポイントの配列に変換
+
+    Args:
+        text (str): 文字列
+
+    Returns:
+        npt.NDArray[np.int64]: (len(text),) コードポイント
+    """
+    return np.frombuffer(text.encode("utf-32-le"), np.uint32).astype(np.int64)
+
+
+class GlyphMetricsTable:
+    """フォント毎の文字領域の表
+
+    文字集合の全ての文字の font.getbbox の結果を 1 つの配列に保持し、
+    文字列の文字領域を送り幅の累積和と表の参照で一括に計算します。
+    送り幅は calc_character_bboxes と同じく文字領域の横幅です。
+    """
+    def __init__(
+        self,
+        codepoints:npt.NDArray[np.int64],
+        bboxes:npt.NDArray[np.int64],
+        anchor:str,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            codepoints (npt.NDArray[np.int64]): (M,) 文字集合のコードポイント
+            bboxes (npt.NDArray[np.int64]): (M, 4) 文字毎の文字領域
+            anchor (str): 文字寄せ
+        """
+        assert len(codepoints) == len(bboxes), "codepoints and bboxes must have the same length."
+
+        self.codepoints = np.asarray(codepoints, np.int64)
+        self.bboxes = np.asarray(bboxes, np.int64).reshape(-1, 4)
+        self.anchor = anchor
+
+        # コードポイントから表の行番号への参照 (文字集合に含まれない場合は -1)
+        self.lookup = np.full(int(self.codepoints.max(initial=-1)) + 1, -1, np.int64)
+        self.lookup[self.codepoints] = np.arange(len(self.codepoints))
+
+    def __len__(self) -> int:
+        return len(self.codepoints)
+
+    def __contains__(self, character:str) -> bool:
+        codepoint = ord(character)
+        return codepoint < len(self.lookup) and self.lookup[codepoint] >= 0
+
+    @classmethod
+    def build(cls, font:ImageFont.FreeTypeFont, charset:Iterable[str], anchor:str = "ls") -> Self:
+        """文字集合から表を作成
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            charset (Iterable[str]): 文字集合
+            anchor (str, optional): 文字寄せ. Defaults to "ls".
+
+        Returns:
+            Self: GlyphMetricsTable
+        """
+        codepoints = np.unique(_codepoints("".join(charset)))
+        characters = [chr(codepoint) for codepoint in codepoints.tolist()]
+        bboxes = np.array(glyph_metrics_cache.getbboxes(font, characters, anchor), np.int64).reshape(-1, 4)
+        return cls(codepoints, bboxes, anchor)
+
+    @staticmethod
+    def table_path(font:ImageFont.FreeTypeFont, anchor:str) -> Optional[Path]:
+        """フォントの隣に保存する表のパスを取得
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            anchor (str): 文字寄せ
+
+        Returns:
+            Optional[Path]: 表のパス、メモリ上から読み込んだフォントの場合は None
+        """
+        if not isinstance(font.path, (str, Path)):
+            return None
+
+        path = Path(font.path)
+        return path.with_name(f"{path.name}.{font.size}_{font.index}_{int(font.layout_engine)}_{anchor}.metrics.npz")
+
+    @staticmethod
+    def _signature(font:ImageFont.FreeTypeFont, codepoints:npt.NDArray[np.int64]) -> str:
+        """表の作成条件を識別する文字列
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            codepoints (npt.NDArray[np.int64]): 文字集合のコードポイント
+
+        Returns:
+            str: フォントファイルの更新日時とサイズ、文字集合のハッシュ
+        """
+        stat = os.stat(font.path)
+        charset_hash = hashlib.blake2b(codepoints.tobytes(), digest_size=16).hexdigest()
+        return f"{stat.st_mtime_ns}_{stat.st_size}_{charset_hash}"
+
+    def save(self, path:str | Path, signature:str = "") -> None:
+        """表を .npz で保存
+
+        書き込みは一時ファイルからの置換で行うため、複数プロセスから同時に保存しても破損しません。
+
+        Args:
+            path (str | Path): 保存先
+            signature (str, optional): 作成条件の識別文字列. Defaults to "".
+        """
+        path = Path(path)
+
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix=".tmp", delete=False) as f:
+            np.savez(f, codepoints=self.codepoints, bboxes=self.bboxes, anchor=self.anchor, signature=signature)
+
+        try:
+            os.replace(f.name, path)
+        except PermissionError:
+            os.unlink(f.name)
+
+    @classmethod
+    def load(cls, path:str | Path) -> tuple[Self, str]:
+        """.npz から表を読込
+
+        Args:
+            path (str | Path): 保存先
+
+        Returns:
+            tuple[Self, str]: 表と作成条件の識別文字列
+        """
+        with np.load(path) as data:
+            return cls(data["codepoints"], data["bboxes"], str(data["anchor"])), str(data["signature"])
+
+    @classmethod
+    def load_or_build(cls, font:ImageFont.FreeTypeFont, charset:Iterable[str], anchor:str = "ls") -> Self:
+        """フォントの隣に保存した表を読込、存在しないか古い場合は作成して保存
+
+        フォントファイルもしくは文字集合が変わった場合は作り直します。
+        フォントのディレクトリに書き込めない場合は保存せずに返します。
+
+        Args:
+            font (ImageFont.FreeTypeFont): フォント
+            charset (Iterable[str]): 文字集合
+            anchor (str, optional): 文字寄せ. Defaults to "ls".
+
+        Returns:
+            Self: GlyphMetricsTable
+        """
+        charset = "".join(charset)
+
+        if (path:=cls.table_path(font, anchor)) is None:
+            return cls.build(font, charset, anchor)
+
+        signature = cls._signature(font, np.unique(_codepoints(charset)))
+
+        if path.exists():
+            table, saved_signature = cls.load(path)
+            if saved_signature == signature:
+                return table
+
+        table = cls.build(font, charset, anchor)
+        try:
+            table.save(path, signature)
+        except OSError:
+            pass
+        return table
+
+    def indices(self, text:str) -> npt.NDArray[np.int64]:
+        """文字列の各文字の表の行番号を取得
+
+        Args:
+            text (str): 文字列
+
+        Returns:
+            npt.NDArray[np.int64]: (len(text),) 行番号
+        """
+        return self._indices(_codepoints(text))
+
+    def _indices(self, codepoints:npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        """コードポイントの表の行番号を取得
+
+        Args:
+            codepoints (npt.NDArray[np.int64]): コードポイント
+
+        Returns:
+            npt.NDArray[np.int64]: 行番号
+        """
+        is_inside = codepoints < len(self.lookup)
+        indices = np.full(len(codepoints), -1, np.int64)
+        indices[is_inside] = self.lookup[codepoints[is_inside]]
+
+        if (indices < 0).any():
+            missing = sorted(set(chr(codepoint) for codepoint in codepoints[indices < 0].tolist()))
+            assert False, f"characters are missing from the table, {missing}."
+        return indices
+
+    def median_bbox(self, characters:str) -> BoundingBox:
+        """文字領域の中央値を取得
+
+        calc_median_bbox と同じ結果を返します。
+
+        Args:
+            characters (str): 中央値算出に使用する文字列
+
+        Returns:
+            BoundingBox: 文字領域の中央値
+        """
+        return BoundingBox(*np.median(self.bboxes[self.indices(characters)], axis=0).astype(np.int64).tolist())
+
+    def character_bboxes(self, text_pos:Int2, text:str, median_bbox:BoundingBox) -> BoundingBoxArray:
+        """文字列から文字単位の文字領域を計算
+
+        calc_character_bboxes と同じ文字領域を返します。
+
+        Args:
+            text_pos (Int2): 文字描画位置
+            text (str): 文字列
+            median_bbox (BoundingBox): 文字領域の中央値
+
+        Returns:
+            BoundingBoxArray: 文字領域 (全角スペースを除く)
+        """
+        bboxes, _ = self.character_bboxes_batch([text_pos], [text], [median_bbox])
+        return bboxes
+
+    def character_bboxes_batch(
+        self,
+        text_positions:list[Int2] | npt.NDArray[np.int64],
+        texts:list[str],
+        median_bboxes:list[BoundingBox] | npt.NDArray[np.int64],
+    ) -> tuple[BoundingBoxArray, npt.NDArray[np.int64]]:
+        """複数の文字列の文字単位の文字領域を一括で計算
+
+        全ての文字列を連結し、文字列毎に区切った送り幅の累積和から各文字の描画位置を求めます。
+
+        Args:
+            text_positions (list[Int2] | npt.NDArray[np.int64]): (B, 2) 文字列毎の文字描画位置
+            texts (list[str]): (B,) 文字列
+            median_bboxes (list[BoundingBox] | npt.NDArray[np.int64]): (B, 4) 文字列毎の文字領域の中央値
+
+        Returns:
+            tuple[BoundingBoxArray, npt.NDArray[np.int64]]: 全ての文字領域と、文字列 i の文字領域の範囲 offsets[i]:offsets[i + 1]
+        """
+        assert len(text_positions) == len(texts) == len(median_bboxes), "text_positions, texts and median_bboxes must have the same length."
+
+        text_positions = np.array([tuple(pos) for pos in text_positions], np.int64).reshape(-1, 2)
+        median_bboxes = np.array([tuple(bbox) for bbox in median_bboxes], np.int64).reshape(-1, 4)
+
+        lengths = np.array([len(text) for text in texts], np.int64)
+        segments = np.repeat(np.arange(len(texts)), lengths)
+
+        codepoints = _codepoints("".join(texts))
+        bboxes = self.bboxes[self._indices(codepoints)]
+
+        # 文字列毎に先頭から累積した送り幅 (自身を含まない)
+        advances = np.concatenate([[0], np.cumsum(bboxes[:, 2] - bboxes[:, 0])])
+        starts = np.cumsum(lengths) - lengths
+        pen_x = advances[:-1] - advances[starts][segments]
+
+        x = text_positions[segments, 0] + pen_x
+        y = text_positions[segments, 1]
+        medians = median_bboxes[segments]
+
+        result = np.stack([
+            x + bboxes[:, 0],
+            y + np.minimum(medians[:, 1], bboxes[:, 1]),
+            x + bboxes[:, 2],
+            y + np.maximum(medians[:, 3], bboxes[:, 3]),
+        ], axis=1)
+
+        keep = codepoints != _SKIP_CODEPOINT
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(segments[keep], minlength=len(texts)))])
+        return BoundingBoxArray(result[keep]), offsets
@@ -1,21 +1,49 @@
+import math
 import random
+from pathlib import Path
+from typing import Iterator, Optional, NamedTuple
+from functools import lru_cache
 import numpy as np
 import numpy.typing as npt
 from PIL import Image
 
 from reinlib.types.rein_int2 import Int2
+from reinlib.types.rein_range import Range
 from reinlib.types.rein_size2d import Size2D
 from reinlib.types.rein_alpha_blend_mode import AlphaBlendMode
-from reinlib.utility.rein_math import lerp
+from reinlib.types.rein_blend_mode import BlendMode
+from reinlib.utility.rein_blend import BLEND_KERNELS, ScratchBuffer, scratch_planes, blend_normal, _div255
+from reinlib.utility.rein_parallel import run_row_bands
 
 
 __all__ = [
     "random_pil_crop",
+    "random_pil_crop_lazy",
+    "random_crops",
     "alpha_composite",
+    "composite_stack",
     "create_gradient_alpha",
+    "gradient_alpha_cache_info",
+    "clear_gradient_alpha_cache",
 ]
 
 
+def _fit_crop_size(image_size:Size2D, crop_size:Size2D) -> Size2D:
+    """切り抜きサイズ未満の画像のリサイズ後のサイズを計算
+
+    Args:
+        image_size (Size2D): 画像サイズ
+        crop_size (Size2D): 切り抜きサイズ
+
+    Returns:
+        Size2D: リサイズ後の画像サイズ (リサイズ不要な場合は画像サイズ)
+    """
+    if image_size.width < crop_size.width or image_size.height < crop_size.height:
+        pixels = crop_size.width - image_size.width if image_size.width < crop_size.width else crop_size.height - image_size.height
+        return Size2D(image_size.width + pixels, image_size.height + pixels)
+    return image_size
+
+
 def random_pil_crop(
     image:Image.Image,
     crop_size:Size2D,
@@ -36,9 +64,8 @@ def random_pil_crop(
     image_size = Size2D(*image.size)
 
     # resize if smaller than crop size
-    if image_size.width < crop_size.width or image_size.height < crop_size.height:
-        pixels = crop_size.width - image_size.width if image_size.width < crop_size.width else crop_size.height - image_size.height
-        image = image.resize((image_size.width + pixels, image_size.height + pixels), resample=resize_resample)
+    if (resize_size:=_fit_crop_size(image_size, crop_size)) != image_size:
+        image = image.resize(resize_size.wh, resample=resize_resample)
         image_size = Size2D(*image.size)  # update image size
 
     # set crop point
@@ -48,23 +75,227 @@ def random_pil_crop(
     return image.crop((x, y, x + crop_size.width, y + crop_size.height))
 
 
+def random_pil_crop_lazy(
+    image:str | Path | Image.Image,
+    crop_size:Size2D,
+    crop_step:Int2,
+    resize_resample:Image.Resampling = Image.Resampling.BILINEAR,
+    max_reduce:int = 1,
+) -> Image.Image:
+    """未デコードの画像のランダム切り抜き
+
+    ヘッダーの画像サイズから切り抜き位置を決定した後にデコードします。
+    切り抜き位置の決定方法 (random の呼び出し順を含む) は random_pil_crop と同じです。
+
+    画像サイズが切り抜きサイズ未満の場合は、切り抜く領域のみをリサイズします。
+    PIL の box 指定のリサイズは丸めが異なるため、random_pil_crop と画素値が僅かに異なる場合があります。
+
+    max_reduce に 2 以上を指定すると、切り抜きサイズを下回らない範囲で画像を 1/n に縮小してから切り抜きます。
+    JPEG は Image.draft によりデコード時に縮小し、残りの倍率は切り抜く領域のみ Image.reduce で縮小します。
+
+    Args:
+        image (str | Path | Image.Image): 画像のパス、もしくは Image.open で開いた未ロードの画像
+        crop_size (Size2D): 切り抜きサイズ
+        crop_step (Int2): 切り抜き開始位置のランダム幅
+        resize_resample (Image.Resampling, optional): 画像サイズが切り抜きサイズ未満のリサイズ補間法. Defaults to Image.Resampling.BILINEAR.
+        max_reduce (int, optional): 縮小倍率の上限、1 の場合は縮小しない. Defaults to 1.
+
+    Returns:
+        Image.Image: 切り抜き後の画像
+    """
+    assert max_reduce >= 1, f"max_reduce must be 1 or more, {max_reduce}."
+
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as f:
+            return random_pil_crop_lazy(f, crop_size, crop_step, resize_resample, max_reduce)
+
+    image_size = Size2D(*image.size)
+    reduce = 1
+
+    # 切り抜きサイズを下回らない範囲で縮小
+    if (factor:=min(max_reduce, image_size.width // crop_size.width, image_size.height // crop_size.height)) > 1:
+        # NOTE: draft は JPEG のみ有効、かつ要求サイズ以上となる 1/2, 1/4, 1/8 のいずれかを選択します.
+        image.draft(image.mode, (math.ceil(image_size.width / factor), math.ceil(image_size.height / factor)))
+        reduce = max(1, factor // round(image_size.width / image.size[0]))
+        image_size = Size2D(math.ceil(image.size[0] / reduce), math.ceil(image.size[1] / reduce))
+
+    resize_size = _fit_crop_size(image_size, crop_size)
+
+    # set crop point
+    x_range, y_range = resize_size.width - crop_size.width, resize_size.height - crop_size.height
+    x, y = random.randrange(0, x_range + 1, crop_step.x), random.randrange(0, y_range + 1, crop_step.y)
+
+    if resize_size != image_size:
+        # 切り抜く領域のみをリサイズ
+        scale_x, scale_y = image_size.width / resize_size.width, image_size.height / resize_size.height
+        box = (x * scale_x, y * scale_y, (x + crop_size.width) * scale_x, (y + crop_size.height) * scale_y)
+        return image.resize(crop_size.wh, resample=resize_resample, box=box)
+
+    if reduce > 1:
+        # 切り抜く領域のみを縮小
+        box = (
+            x * reduce,
+            y * reduce,
+            min((x + crop_size.width) * reduce, image.size[0]),
+            min((y + crop_size.height) * reduce, image.size[1]),
+        )
+        return image.reduce(reduce, box=box)
+
+    return image.crop((x, y, x + crop_size.width, y + crop_size.height))
+
+
+def random_crops(
+    image:Image.Image | npt.NDArray[np.uint8],
+    crop_size:Size2D,
+    crop_step:Int2,
+    n:int,
+    rng:Optional[np.random.Generator] = None,
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    resize_resample:Image.Resampling = Image.Resampling.BILINEAR,
+) -> npt.NDArray[np.uint8]:
+    """1枚の画像から複数枚をランダムに一括で切り抜き
+
+    切り抜き位置の刻みとリサイズの規則は random_pil_crop と同じです。
+    各切り抜きはデコード済みの画像のビューから out に直接コピーするため、out を再利用すれば新規の確保は発生しません。
+
+    Args:
+        image (Image.Image | npt.NDArray[np.uint8]): 画像 (H, W, C) or (H, W)
+        crop_size (Size2D): 切り抜きサイズ
+        crop_step (Int2): 切り抜き開始位置のランダム幅
+        n (int): 切り抜く枚数
+        rng (Optional[np.random.Generator], optional): 乱数生成器、None の場合は新規に作成. Defaults to None.
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先 (n, h, w, C) or (n, h, w). Defaults to None.
+        resize_resample (Image.Resampling, optional): 画像サイズが切り抜きサイズ未満のリサイズ補間法. Defaults to Image.Resampling.BILINEAR.
+
+    Returns:
+        npt.NDArray[np.uint8]: (n, h, w, C) or (n, h, w) 切り抜き後の画像
+    """
+    if isinstance(image, Image.Image):
+        image_size = Size2D(*image.size)
+    else:
+        image_size = Size2D(image.shape[1], image.shape[0])
+
+    # resize if smaller than crop size
+    if (resize_size:=_fit_crop_size(image_size, crop_size)) != image_size:
+        if not isinstance(image, Image.Image):
+            image = Image.fromarray(image)
+        image = image.resize(resize_size.wh, resample=resize_resample)
+
+    image = np.asarray(image)
+
+    shape = (n, crop_size.height, crop_size.width) + image.shape[2:]
+    if out is None:
+        out = np.empty(shape, np.uint8)
+    assert out.shape == shape, f"out shape must be {shape}, {out.shape}."
+
+    # set crop points
+    rng = np.random.default_rng() if rng is None else rng
+    xs = Range(0, image.shape[1] - crop_size.width + 1, crop_step.x).sample(n, rng).tolist()
+    ys = Range(0, image.shape[0] - crop_size.height + 1, crop_step.y).sample(n, rng).tolist()
+
+    for crop, x, y in zip(out, xs, ys):
+        np.copyto(crop, image[y:y + crop_size.height, x:x + crop_size.width])
+
+    return out
+
+
+def _tiles(rows:slice, width:int, tile_height:int, tile_width:int) -> Iterator[tuple[slice, slice]]:
+    """画像の行範囲をタイルに分割
+
+    Args:
+        rows (slice): 分割する行範囲
+        width (int): 横幅
+        tile_height (int): タイルの縦幅
+        tile_width (int): タイルの横幅
+
+    Yields:
+        Iterator[tuple[slice, slice]]: タイルの y 方向と x 方向の範囲
+    """
+    for ymin in range(rows.start, rows.stop, tile_height):
+        for xmin in range(0, width, tile_width):
+            yield slice(ymin, min(ymin + tile_height, rows.stop)), slice(xmin, min(xmin + tile_width, width))
+
+
 def alpha_composite(
     src:npt.NDArray[np.uint8],
     dst:npt.NDArray[np.uint8],
-    alpha:npt.NDArray[np.float32 | np.float64],
+    alpha:npt.NDArray[np.uint8 | np.float32 | np.float64],
     mode:AlphaBlendMode=AlphaBlendMode.STRAIGHT,
+    out:Optional[npt.NDArray[np.uint8]] = None,
+    tile_size:Optional[int] = None,
+    workers:Optional[int] = None,
 ) -> npt.NDArray[np.uint8]:
     """透明度合成
 
+    alpha が uint8 (0 ~ 255) の場合は uint16 の固定小数点で計算します。
+    丸めは PIL と同じ四捨五入のため、浮動小数点数版 (切り捨て) とは最大 1 の差があります。
+
+    tile_size を指定すると tile_size 四方のタイル毎に計算し、作業領域をタイル間で使い回します。
+    追加のメモリ使用量が画像サイズではなくタイルサイズに比例し、結果はタイル分割しない場合と一致します。
+
+    workers を指定すると行の帯に分割して共有のスレッドプールで並列に計算します。結果は帯の数に依存しません。
+
     Args:
         src (npt.NDArray[np.uint8]): Base
         dst (npt.NDArray[np.uint8]): Blend
-        alpha (npt.NDArray[np.float32 | np.float64]): 透明度
+        alpha (npt.NDArray[np.uint8 | np.float32 | np.float64]): 透明度 (uint8 は 0 ~ 255, 浮動小数点数は 0.0 ~ 1.0)
         mode (AlphaBlendMode, optional): 合成方法. Defaults to AlphaBlendMode.STRAIGHT.
+        out (Optional[npt.NDArray[np.uint8]], optional): 出力先、dst と同じ配列も指定可能. Defaults to None.
+        tile_size (Optional[int], optional): タイルの一辺の長さ、None の場合は分割しない. Defaults to None.
+        workers (Optional[int], optional): 並列に計算する帯の数、None の場合は呼び出し元のスレッドで計算. Defaults to None.
 
     Returns:
         npt.NDArray[np.uint8]: 合成結果
     """
+    # (h, w) の透明度は (h, w, 1) として扱う
+    if alpha.ndim == src.ndim - 1:
+        alpha = alpha[..., np.newaxis]
+
+    shape = np.broadcast_shapes(src.shape, dst.shape, alpha.shape[:-1] + (1,))
+    if out is None:
+        out = np.empty(shape, np.uint8)
+
+    if tile_size is None and (workers is None or workers <= 1):
+        return _alpha_composite_tile(src, dst, alpha, mode, out)
+
+    assert tile_size is None or tile_size > 0, f"tile_size must be positive, {tile_size}."
+
+    src, dst = np.broadcast_to(src, shape), np.broadcast_to(dst, shape)
+    alpha = np.broadcast_to(alpha, shape[:-1] + alpha.shape[-1:])
+
+    def composite_band(rows:slice) -> None:
+        buffer = ScratchBuffer()
+        for ys, xs in _tiles(rows, shape[1], tile_size or shape[0], tile_size or shape[1]):
+            _alpha_composite_tile(src[ys, xs], dst[ys, xs], alpha[ys, xs], mode, out[ys, xs], buffer)
+
+    run_row_bands(composite_band, shape[0], workers, tile_size or 1)
+    return out
+
+
+def _alpha_composite_tile(
+    src:npt.NDArray[np.uint8],
+    dst:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8 | np.float32 | np.float64],
+    mode:AlphaBlendMode,
+    out:npt.NDArray[np.uint8],
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """透明度合成 (1タイル分)
+
+    Args:
+        src (npt.NDArray[np.uint8]): Base
+        dst (npt.NDArray[np.uint8]): Blend
+        alpha (npt.NDArray[np.uint8 | np.float32 | np.float64]): 透明度 (h, w, 1) or (h, w, c)
+        mode (AlphaBlendMode): 合成方法
+        out (npt.NDArray[np.uint8]): 出力先
+        buffer (Optional[ScratchBuffer], optional): 固定小数点の作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 出力先
+    """
+    if alpha.dtype == np.uint8:
+        return _alpha_composite_fixed(src, dst, alpha, mode, out, buffer)
+
     if mode is AlphaBlendMode.STRAIGHT:
         result = (src * alpha) + (dst * (1.0 - alpha))
     elif mode is AlphaBlendMode.PREMULTIPLIED:
@@ -72,7 +303,163 @@ def alpha_composite(
     else:
         assert False, f"not support mode, {mode}."
 
-    return np.clip(result, 0.0, 255.0).astype(np.uint8)
+    np.clip(result, 0.0, 255.0, out=result)
+    np.copyto(out, result, casting="unsafe")
+    return out
+
+
+def _alpha_composite_fixed(
+    src:npt.NDArray[np.uint8],
+    dst:npt.NDArray[np.uint8],
+    alpha:npt.NDArray[np.uint8],
+    mode:AlphaBlendMode,
+    out:npt.NDArray[np.uint8],
+    buffer:Optional[ScratchBuffer] = None,
+) -> npt.NDArray[np.uint8]:
+    """uint16 の固定小数点による透明度合成
+
+    固定小数点の演算は rein_blend と共通です。STRAIGHT は rein_blend.blend_normal で計算します。
+    (h, w, 1) の透明度をチャンネルに展開するブロードキャストは遅いため、チャンネル毎に計算します。
+
+    Args:
+        src (npt.NDArray[np.uint8]): Base (h, w, c)
+        dst (npt.NDArray[np.uint8]): Blend (h, w, c)
+        alpha (npt.NDArray[np.uint8]): 透明度 (h, w, 1) or (h, w, c)
+        mode (AlphaBlendMode): 合成方法
+        out (npt.NDArray[np.uint8]): 出力先 (h, w, c)
+        buffer (Optional[ScratchBuffer], optional): 作業領域、None の場合は新規に確保. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 出力先
+    """
+    assert mode in (AlphaBlendMode.STRAIGHT, AlphaBlendMode.PREMULTIPLIED), f"not support mode, {mode}."
+
+    src, dst = np.broadcast_to(src, out.shape), np.broadcast_to(dst, out.shape)
+    alpha = np.broadcast_to(alpha, out.shape[:-1] + alpha.shape[-1:])
+
+    if mode is AlphaBlendMode.STRAIGHT:
+        # (src * a + dst * (255 - a)) / 255
+        return blend_normal(dst, src, alpha, out, buffer)
+
+    result, scratch = scratch_planes(out.shape[:-1], buffer)
+
+    for c in range(out.shape[-1]):
+        alpha_c = alpha[..., c if alpha.shape[-1] > 1 else 0]
+
+        # src + dst * (255 - a) / 255
+        np.subtract(255, alpha_c, out=scratch)
+        np.multiply(dst[..., c], scratch, out=result)
+        _div255(result, scratch)
+        result += src[..., c]
+        np.minimum(result, 255, out=result)
+
+        np.copyto(out[..., c], result, casting="unsafe")
+
+    return out
+
+
+def composite_stack(
+    layers:list[npt.NDArray[np.uint8]],
+    blend_modes:list[BlendMode],
+    offsets:list[Int2],
+    out:npt.NDArray[np.uint8],
+    tile_size:int = 512,
+    workers:Optional[int] = None,
+) -> npt.NDArray[np.uint8]:
+    """複数レイヤーを一括で合成
+
+    出力を tile_size 四方のタイルに分割し、タイル毎に全レイヤーを順に合成します。
+    タイルがキャッシュに収まるため、メモリ転送量はレイヤー数ではなく出力サイズに比例します。
+    作業領域はタイル間で使い回すため、追加のメモリ使用量はタイルサイズに比例します。
+    workers を指定するとタイルの行単位の帯に分割して共有のスレッドプールで並列に合成します。
+    出力範囲外にはみ出したレイヤーは ImageLayerCanvas.update_scene_color と同じく切り取ります。
+
+    Args:
+        layers (list[npt.NDArray[np.uint8]]): RGBA レイヤー (h, w, 4) のリスト (奥から手前の順)
+        blend_modes (list[BlendMode]): 各レイヤーのブレンドモード
+        offsets (list[Int2]): 各レイヤーの左上の位置 (負の値も可)
+        out (npt.NDArray[np.uint8]): 合成先 (H, W, 3)、背景で初期化しておくこと
+        tile_size (int, optional): タイルの一辺の長さ. Defaults to 512.
+        workers (Optional[int], optional): 並列に合成する帯の数、None の場合は呼び出し元のスレッドで合成. Defaults to None.
+
+    Returns:
+        npt.NDArray[np.uint8]: 合成先
+    """
+    assert len(layers) == len(blend_modes) == len(offsets), "layers, blend_modes and offsets must have the same length."
+    assert tile_size > 0, f"tile_size must be positive, {tile_size}."
+
+    out_height, out_width = out.shape[:2]
+
+    # 出力範囲でレイヤーを切り取り
+    clipped:list[tuple[npt.NDArray[np.uint8], BlendMode, int, int, int, int, int, int]] = []
+
+    for layer, blend_mode, offset in zip(layers, blend_modes, offsets):
+        assert blend_mode in BLEND_KERNELS, f"{blend_mode} is an unsupported blend mode."
+
+        layer_height, layer_width = layer.shape[:2]
+
+        dst_xmin, dst_ymin = max(0, offset.x), max(0, offset.y)
+        dst_xmax, dst_ymax = min(out_width, offset.x + layer_width), min(out_height, offset.y + layer_height)
+
+        if dst_xmax <= dst_xmin or dst_ymax <= dst_ymin:
+            continue
+
+        clipped.append((layer, blend_mode, offset.x, offset.y, dst_xmin, dst_xmax, dst_ymin, dst_ymax))
+
+    def composite_band(rows:slice) -> None:
+        buffer = ScratchBuffer()
+
+        for ys, xs in _tiles(rows, out_width, tile_size, tile_size):
+            for layer, blend_mode, x, y, dst_xmin, dst_xmax, dst_ymin, dst_ymax in clipped:
+                xmin, xmax = max(xs.start, dst_xmin), min(xs.stop, dst_xmax)
+                ymin, ymax = max(ys.start, dst_ymin), min(ys.stop, dst_ymax)
+
+                if xmax <= xmin or ymax <= ymin:
+                    continue
+
+                base = out[ymin:ymax, xmin:xmax]
+                src = layer[ymin - y:ymax - y, xmin - x:xmax - x]
+
+                BLEND_KERNELS[blend_mode](base, src[..., :3], src[..., 3:], base, buffer)
+
+    run_row_bands(composite_band, out_height, workers, tile_size)
+    return out
+
+
+@lru_cache(maxsize=128)
+def _gradient_alpha_column(height:int, top_alpha:int, bottom_alpha:int, is_float64:bool) -> npt.NDArray[np.uint8 | np.float64]:
+    """上部から下部にかけて線形補間な透明度の列 (読込専用)
+
+    Args:
+        height (int): 縦幅
+        top_alpha (int): 上部の透明度 (0 ~ 255)
+        bottom_alpha (int): 下部の透明度 (0 ~ 255)
+        is_float64 (bool): [0.0 ~ 1.0] を要求する場合はTrue, [0 ~ 255] の場合はFalse
+
+    Returns:
+        npt.NDArray[np.uint8 | np.float64]: (height, ) 透明度
+    """
+    # rein_math.lerp と同じ演算順序
+    t = np.arange(height) / height
+    column = (1.0 - t) * top_alpha + t * bottom_alpha
+    column = column / 255.0 if is_float64 else column.astype(np.uint8)
+    column.flags.writeable = False
+    return column
+
+
+def gradient_alpha_cache_info() -> NamedTuple:
+    """create_gradient_alpha のキャッシュ統計を取得
+
+    Returns:
+        NamedTuple: hits, misses, maxsize, currsize
+    """
+    return _gradient_alpha_column.cache_info()
+
+
+def clear_gradient_alpha_cache() -> None:
+    """create_gradient_alpha のキャッシュを破棄
+    """
+    _gradient_alpha_column.cache_clear()
 
 
 def create_gradient_alpha(
@@ -81,27 +468,39 @@ def create_gradient_alpha(
     bottom_alpha:int,
     is_shape_newaxis:bool = True,
     is_float64:bool = True,
+    is_contiguous:bool = False,
+    out:Optional[npt.NDArray[np.uint8 | np.float64]] = None,
 ) -> npt.NDArray[np.uint8 | np.float64]:
     """上部から下部にかけて線形補間な透明度を作成
 
+    縦方向の列はキャッシュし、既定では横方向にブロードキャストした読込専用のビューを返します。
+    書き込みが必要な場合は is_contiguous もしくは out を指定してください。
+
     Args:
         size (Size2): 画像サイズ
         top_alpha (int): 上部の透明度 (0 ~ 255)
         bottom_alpha (int): 下部の透明度 (0 ~ 255)
         is_shape_newaxis (bool, optional): (h, w, 1) を要求する場合はTrue, (h, w) の場合はFalse. Defaults to True.
-        is_float64 (bool, optional): [0.0 ~ 1.0] を要求する場合はTrue, [0 ~ 255] の場合はFalse Defaults to False.
+        is_float64 (bool, optional): [0.0 ~ 1.0] を要求する場合はTrue, [0 ~ 255] の場合はFalse. Defaults to True.
+        is_contiguous (bool, optional): 書き込み可能な連続した配列を要求する場合はTrue. Defaults to False.
+        out (Optional[npt.NDArray[np.uint8 | np.float64]], optional): 出力先 (BufferArena から取得した配列など). Defaults to None.
 
     Returns:
         npt.NDArray[np.uint8 | np.float64]: 透明度
     """
-    # 上部から下部のグラデーションを作成
-    alpha = [lerp(top_alpha, bottom_alpha, y_pos / size.height) for y_pos in range(size.height)]
-    alpha = np.tile(alpha, (size.width, 1))
-    alpha = np.transpose(alpha, (1, 0))
+    column = _gradient_alpha_column(size.height, top_alpha, bottom_alpha, is_float64)
+
     if is_shape_newaxis:
-        alpha = alpha[..., np.newaxis]
-    if not is_float64:
-        alpha = alpha.astype(np.uint8)
+        alpha = np.broadcast_to(column[:, np.newaxis, np.newaxis], (size.height, size.width, 1))
     else:
-        alpha = alpha / 255.0
+        alpha = np.broadcast_to(column[:, np.newaxis], (size.height, size.width))
+
+    if out is not None:
+        assert out.shape == alpha.shape, f"out shape mismatch, {out.shape} != {alpha.shape}."
+        assert out.dtype == alpha.dtype, f"out dtype mismatch, {out.dtype} != {alpha.dtype}."
+        np.copyto(out, alpha)
+        return out
+
+    if is_contiguous:
+        alpha = alpha.copy()
     return alpha
@@ -0,0 +1,120 @@
+import os
+import threading
+from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+
+__all__ = [
+    "get_shared_executor",
+    "shutdown_shared_executor",
+    "row_bands",
+    "run_row_bands",
+]
+
+
+# 共有のスレッドプール
+_shared_executor:Optional[ThreadPoolExecutor] = None
+_shared_executor_lock = threading.Lock()
+
+# 共有のスレッドプールのワーカーで実行中かどうか
+_worker_state = threading.local()
+
+
+def get_shared_executor() -> ThreadPoolExecutor:
+    """共有のスレッドプールを取得
+
+    初回の呼び出し時に os.cpu_count() のスレッド数で作成します。
+    NumPy の ufunc は大きな配列の演算中に GIL を解放するため、行の帯毎の並列化に使用します。
+
+    Returns:
+        ThreadPoolExecutor: 共有のスレッドプール
+    """
+    global _shared_executor
+
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                os.cpu_count() or 1,
+                thread_name_prefix="reinlib",
+                initializer=_mark_worker_thread,
+            )
+        return _shared_executor
+
+
+def _mark_worker_thread() -> None:
+    """共有のスレッドプールのワーカーであることを記録
+    """
+    _worker_state.is_worker = True
+
+
+def _is_worker_thread() -> bool:
+    """共有のスレッドプールのワーカーで実行中か
+
+    Returns:
+        bool: ワーカーで実行中の場合は True
+    """
+    return getattr(_worker_state, "is_worker", False)
+
+
+def shutdown_shared_executor() -> None:
+    """共有のスレッドプールを終了
+
+    次回の get_shared_executor で再作成されます。
+    """
+    global _shared_executor
+
+    with _shared_executor_lock:
+        if _shared_executor is not None:
+            _shared_executor.shutdown()
+            _shared_executor = None
+
+
+def row_bands(height:int, count:int, align:int = 1) -> list[slice]:
+    """行を帯に分割
+
+    Args:
+        height (int): 縦幅
+        count (int): 分割数の上限
+        align (int, optional): 帯の境界を揃える行数 (タイル単位で分割する場合のタイルの縦幅). Defaults to 1.
+
+    Returns:
+        list[slice]: 帯の範囲 (空の帯は含みません)
+    """
+    assert count > 0, f"count must be positive, {count}."
+    assert align > 0, f"align must be positive, {align}."
+
+    units = -(-height // align)
+    count = min(count, units)
+
+    bounds = [min(units * i // count * align, height) for i in range(count + 1)] if count > 0 else [0]
+    return [slice(ymin, ymax) for ymin, ymax in zip(bounds[:-1], bounds[1:]) if ymin < ymax]
+
+
+def run_row_bands(
+    func:Callable[[slice], None],
+    height:int,
+    workers:Optional[int] = None,
+    align:int = 1,
+) -> None:
+    """行の帯毎に関数を実行
+
+    各帯は互いに独立した行を処理するため、結果は帯の分割数に依存しません。
+
+    共有のスレッドプールのワーカーから呼び出された場合は、入れ子の投入で全ワーカーが待機状態となる
+    デッドロックを避けるため、workers に関わらず呼び出し元のスレッドで一括実行します。
+
+    Args:
+        func (Callable[[slice], None]): 帯の範囲を受け取る関数
+        height (int): 縦幅
+        workers (Optional[int], optional): 帯の数、None もしくは 1 以下の場合は呼び出し元のスレッドで一括実行. Defaults to None.
+        align (int, optional): 帯の境界を揃える行数. Defaults to 1.
+    """
+    if workers is None or workers <= 1 or height <= align or _is_worker_thread():
+        func(slice(0, height))
+        return
+
+    bands = row_bands(height, workers, align)
+
+    # NOTE: 例外を呼び出し元に伝播させるため、全ての結果を取得します.
+    for future in [get_shared_executor().submit(func, band) for band in bands]:
+        future.result()
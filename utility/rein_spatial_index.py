@@ -0,0 +1,156 @@
+import math
+from typing import Generic, Iterator, TypeVar
+
+from reinlib.types.rein_bounding_box import BoundingBox
+from reinlib.types.rein_float_bounding_box import FloatBoundingBox
+
+
+__all__ = [
+    "BoundingBoxGrid",
+]
+
+
+BoundingBoxT = TypeVar("BoundingBoxT", BoundingBox, FloatBoundingBox)
+
+
+class BoundingBoxGrid(Generic[BoundingBoxT]):
+    """一様グリッドによるバウンディングボックスの空間インデックス
+
+    BoundingBox.collisions の線形探索の代替です。
+    登録済みのバウンディングボックスが重なるセルのみを探索するため、衝突判定の件数が配置済みの総数に依存しません。
+    衝突判定は BoundingBox.collision と同様に辺上の接触も衝突として扱います。
+    """
+    def __init__(self, cell_size:int | float = 64) -> None:
+        """コンストラクタ
+
+        Args:
+            cell_size (int | float, optional): セルの一辺の長さ、配置する領域の平均的な大きさ程度が目安. Defaults to 64.
+        """
+        assert cell_size > 0, f"'cell_size' must be greater than 0, the input value was {cell_size}."
+
+        self.cell_size = cell_size
+
+        # 登録済みのバウンディングボックス
+        self.bboxes:list[BoundingBoxT] = []
+
+        # セル座標から登録済みのインデックスへの対応
+        self.cells:dict[tuple[int, int], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.bboxes)
+
+    def __iter__(self) -> Iterator[BoundingBoxT]:
+        return iter(self.bboxes)
+
+    def cell_range(self, bbox:BoundingBoxT) -> tuple[range, range]:
+        """バウンディングボックスが重なるセルの範囲を取得
+
+        辺上の接触を検出するため、右下の座標を含むセルまでを範囲とします。
+
+        Args:
+            bbox (BoundingBoxT): バウンディングボックス
+
+        Returns:
+            tuple[range, range]: x方向とy方向のセルの範囲
+        """
+        xmin, ymin, xmax, ymax = bbox
+        return (
+            range(math.floor(xmin / self.cell_size), math.floor(xmax / self.cell_size) + 1),
+            range(math.floor(ymin / self.cell_size), math.floor(ymax / self.cell_size) + 1),
+        )
+
+    def insert(self, bbox:BoundingBoxT) -> int:
+        """バウンディングボックスを登録
+
+        Args:
+            bbox (BoundingBoxT): バウンディングボックス
+
+        Returns:
+            int: 登録順のインデックス
+        """
+        index = len(self.bboxes)
+        self.bboxes.append(bbox)
+
+        x_range, y_range = self.cell_range(bbox)
+        for cy in y_range:
+            for cx in x_range:
+                self.cells.setdefault((cx, cy), []).append(index)
+
+        return index
+
+    def extend(self, bboxes:list[BoundingBoxT]) -> None:
+        """バウンディングボックスを一括で登録
+
+        Args:
+            bboxes (list[BoundingBoxT]): バウンディングボックスのリスト
+        """
+        for bbox in bboxes:
+            self.insert(bbox)
+
+    def clear(self) -> None:
+        """登録済みのバウンディングボックスを全て削除
+        """
+        self.bboxes.clear()
+        self.cells.clear()
+
+    def query_indices(self, bbox:BoundingBoxT) -> list[int]:
+        """衝突している登録済みのインデックスを取得
+
+        Args:
+            bbox (BoundingBoxT): 判定対象
+
+        Returns:
+            list[int]: 衝突している登録済みのインデックス (登録順)
+        """
+        xmin, ymin, xmax, ymax = bbox
+        x_range, y_range = self.cell_range(bbox)
+
+        checked:set[int] = set()
+        indices:list[int] = []
+
+        for cy in y_range:
+            for cx in x_range:
+                for index in self.cells.get((cx, cy), ()):
+                    if index in checked:
+                        continue
+                    checked.add(index)
+
+                    rxmin, rymin, rxmax, rymax = self.bboxes[index]
+                    if xmin <= rxmax and rxmin <= xmax and ymin <= rymax and rymin <= ymax:
+                        indices.append(index)
+
+        return sorted(indices)
+
+    def query(self, bbox:BoundingBoxT) -> list[BoundingBoxT]:
+        """衝突している登録済みのバウンディングボックスを取得
+
+        Args:
+            bbox (BoundingBoxT): 判定対象
+
+        Returns:
+            list[BoundingBoxT]: 衝突している登録済みのバウンディングボックス (登録順)
+        """
+        return [self.bboxes[index] for index in self.query_indices(bbox)]
+
+    def any_collision(self, bbox:BoundingBoxT) -> bool:
+        """登録済みのいずれかと衝突しているか判定
+
+        BoundingBox.collisions と同じ結果を返します。
+
+        Args:
+            bbox (BoundingBoxT): 判定対象
+
+        Returns:
+            bool: 衝突している場合は True
+        """
+        xmin, ymin, xmax, ymax = bbox
+        x_range, y_range = self.cell_range(bbox)
+
+        for cy in y_range:
+            for cx in x_range:
+                for index in self.cells.get((cx, cy), ()):
+                    rxmin, rymin, rxmax, rymax = self.bboxes[index]
+                    if xmin <= rxmax and rxmin <= xmax and ymin <= rymax and rymin <= ymax:
+                        return True
+
+        return False
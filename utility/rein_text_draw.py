@@ -1,7 +1,7 @@
 import numpy as np
 import numpy.typing as npt
 from typing import Optional
-from PIL import ImageFont, ImageDraw
+from PIL import Image, ImageFont, ImageDraw
 from collections.abc import Generator
 
 from reinlib.types.rein_color_method import ColorMethod
@@ -9,6 +9,9 @@ from reinlib.types.rein_color import Color
 from reinlib.types.rein_int2 import Int2
 from reinlib.types.rein_bounding_box import BoundingBox
 from reinlib.types.rein_text_layout import TextLayout
+from reinlib.utility.rein_glyph_metrics import glyph_metrics_cache, GlyphMetricsTable
+from reinlib.utility.rein_blend import _div255
+from reinlib.utility.rein_glyph_atlas import GlyphAtlas, render_text_mask
 
 
 __all__ = [
@@ -17,8 +20,13 @@ __all__ = [
     "calc_character_bboxes",
     "draw_simple_text",
     "draw_text_layout",
+    "dilate_mask",
+    "create_decoration_masks",
+    "composite_decoration_masks",
+    "draw_text_layout_array",
     "apply_font_decoration",
     "find_smallest_bounding_rectangle",
+    "find_smallest_bounding_rectangles",
 ]
 
 
@@ -29,6 +37,8 @@ def calc_median_bbox(
 ) -> BoundingBox:
     """文字領域の中央値を取得
 
+    文字領域は共有のグリフ計測キャッシュから取得します。
+
     Args:
         characters (str | list[str] | tuple[str, ...] | Generator[str, None, None]): 中央値算出に使用する文字列
         font (ImageFont.FreeTypeFont): フォント
@@ -37,10 +47,10 @@ def calc_median_bbox(
     Returns:
         BoundingBox: 文字領域の中央値
     """
-    return BoundingBox(*np.median([
-        font.getbbox(character, anchor=anchor)
-        for character in characters
-    ], axis=0).astype(np.int64).tolist())
+    return BoundingBox(*np.median(
+        glyph_metrics_cache.getbboxes(font, characters, anchor),
+        axis=0,
+    ).astype(np.int64).tolist())
 
 
 def calc_character_bbox(
@@ -62,7 +72,7 @@ def calc_character_bbox(
     Returns:
         BoundingBox: 文字領域
     """
-    char_bbox = BoundingBox(*font.getbbox(character, anchor=anchor))
+    char_bbox = BoundingBox(*glyph_metrics_cache.getbbox(font, character, anchor))
 
     xmin = text_pos.x + char_bbox.xmin
     ymin = text_pos.y + min(median_bbox.ymin, char_bbox.ymin)
@@ -79,6 +89,7 @@ def calc_character_bboxes(
     anchor:str,
     median_bbox:BoundingBox,
     out_bboxes:list[BoundingBox],
+    table:Optional[GlyphMetricsTable] = None,
 ) -> None:
     """文字列から文字単位の文字領域を計算
 
@@ -89,11 +100,17 @@ def calc_character_bboxes(
         anchor (str): 文字寄せ
         median_bbox (BoundingBox): 文字領域の中央値
         out_bboxes (list[BoundingBox]): 文字領域の格納先
+        table (Optional[GlyphMetricsTable], optional): フォントの文字領域の表、指定した場合は一括で計算. Defaults to None.
     """
+    if table is not None:
+        assert table.anchor == anchor, f"table anchor mismatch, {table.anchor} != {anchor}."
+        out_bboxes.extend(table.character_bboxes(text_pos, text, median_bbox).to_bboxes())
+        return
+
     char_pos = Int2(*text_pos)
 
-    for char in text:
-        char_bbox = BoundingBox(*font.getbbox(char, anchor=anchor))
+    for char, bbox in zip(text, glyph_metrics_cache.getbboxes(font, text, anchor)):
+        char_bbox = BoundingBox(*bbox)
 
         if char != "　":
             xmin = char_pos.x + char_bbox.xmin
@@ -135,6 +152,7 @@ def draw_text_layout(
     text:str,
     layout:TextLayout,
     color_method:ColorMethod = ColorMethod.GRAYSCALE,
+    is_single_rasterization:bool = False,
 ) -> None:
     """テキスト描画
 
@@ -144,7 +162,16 @@ def draw_text_layout(
         text (str): テキスト
         layout (TextLayout): レイアウト
         color_method (ColorMethod, optional): _description_. Defaults to ColorMethod.GRAYSCALE.
+        is_single_rasterization (bool, optional): 縁取りと影を文字のマスクの膨張から作成する場合はTrue (create_decoration_masks を参照、複数行のテキストは対象外). Defaults to False.
     """
+    # NOTE: create_decoration_masks は 1 行のみ対応のため、複数行のテキストは個別にラスタライズします.
+    if is_single_rasterization and (layout.is_shadow or layout.is_outline) and "\n" not in text:
+        bbox, masks = create_decoration_masks(text_pos, text, layout)
+        for mask, ink in zip(masks, _decoration_inks(layout, color_method)):
+            if mask is not None:
+                drawer.bitmap((bbox.xmin, bbox.ymin), Image.fromarray(mask), ink)
+        return
+
     if layout.is_shadow:
         drawer.text(
             (text_pos + layout.get_shadow_offset()).xy,
@@ -179,6 +206,212 @@ def draw_text_layout(
         )
 
 
+def dilate_mask(mask:npt.NDArray[np.uint8], radius:int) -> npt.NDArray[np.uint8]:
+    """半径 radius + 0.5 の円によるマスクの膨張 (グレースケールの最大値フィルタ)
+
+    FreeType の縁取り (ImageDraw.text の stroke_width) の近似です。
+    横方向の最大値を幅毎に累積してから、行毎の幅で縦方向に最大値を取ります。
+
+    Args:
+        mask (npt.NDArray[np.uint8]): マスク (h, w)
+        radius (int): 半径
+
+    Returns:
+        npt.NDArray[np.uint8]: 上下左右に radius ずつ拡張したマスク (h + 2 * radius, w + 2 * radius)
+    """
+    height, width = mask.shape
+
+    padded = np.zeros((height + 2 * radius, width + 2 * radius), np.uint8)
+    padded[radius:radius + height, radius:radius + width] = mask
+
+    if radius <= 0:
+        return padded
+
+    # 横方向に半幅 k で膨張したマスク
+    rows = [padded]
+    for k in range(1, radius + 1):
+        row = rows[-1].copy()
+        np.maximum(row[:, k:], padded[:, :-k], out=row[:, k:])
+        np.maximum(row[:, :-k], padded[:, k:], out=row[:, :-k])
+        rows.append(row)
+
+    dilated = np.zeros_like(padded)
+    for dy in range(-radius, radius + 1):
+        half = min(radius, int(np.sqrt((radius + 0.5) ** 2 - dy * dy)))
+        row = rows[half]
+        if dy >= 0:
+            np.maximum(dilated[dy:], row[:row.shape[0] - dy], out=dilated[dy:])
+        else:
+            np.maximum(dilated[:dy], row[-dy:], out=dilated[:dy])
+
+    return dilated
+
+
+def create_decoration_masks(
+    text_pos:Int2,
+    text:str,
+    layout:TextLayout,
+    atlas:Optional[GlyphAtlas] = None,
+) -> tuple[BoundingBox, tuple[Optional[npt.NDArray[np.uint8]], Optional[npt.NDArray[np.uint8]], npt.NDArray[np.uint8]]]:
+    """文字のマスクを 1 回だけラスタライズし、縁取りと影のマスクを膨張と平行移動で作成
+
+    マスクの範囲は文字のマスクの範囲に apply_font_decoration を適用した範囲と一致します。
+
+    Args:
+        text_pos (Int2): 描画位置
+        text (str): テキスト (1 行)
+        layout (TextLayout): レイアウト
+        atlas (Optional[GlyphAtlas], optional): 文字のマスクの作成に使用するグリフアトラス、None の場合は render_text_mask. Defaults to None.
+
+    Returns:
+        tuple[BoundingBox, tuple[Optional[npt.NDArray[np.uint8]], Optional[npt.NDArray[np.uint8]], npt.NDArray[np.uint8]]]:
+            マスクの範囲と、同じ範囲の (影, 縁取り, 文字) のマスク (無効な修飾は None)
+    """
+    assert "\n" not in text, "multiline text is not supported."
+
+    if atlas is not None:
+        coverage, offset = atlas.render_mask(text, 0, layout.anchor)
+    else:
+        coverage, offset = render_text_mask(layout.font, text, layout.anchor)
+
+    height, width = coverage.shape
+    coverage_pos = text_pos + offset
+
+    bbox = BoundingBox(coverage_pos.x, coverage_pos.y, coverage_pos.x + width, coverage_pos.y + height)
+    apply_font_decoration(bbox, layout.get_outline_weight(), layout.get_shadow_weight(), layout.get_shadow_offset())
+
+    def place(mask:npt.NDArray[np.uint8], pos:Int2) -> npt.NDArray[np.uint8]:
+        frame = np.zeros((bbox.height, bbox.width), np.uint8)
+        x, y = pos.x - bbox.xmin, pos.y - bbox.ymin
+        frame[y:y + mask.shape[0], x:x + mask.shape[1]] = mask
+        return frame
+
+    shadow = outline = None
+
+    if layout.is_shadow:
+        weight = layout.shadow_weight
+        shadow = place(dilate_mask(coverage, weight), coverage_pos + layout.get_shadow_offset() - weight)
+
+    if layout.is_outline:
+        weight = layout.outline_weight
+        outline = place(dilate_mask(coverage, weight), coverage_pos - weight)
+
+    return bbox, (shadow, outline, place(coverage, coverage_pos))
+
+
+def _decoration_inks(layout:TextLayout, color_method:ColorMethod) -> tuple[int | tuple[int, ...], ...]:
+    """(影, 縁取り, 文字) の色を取得
+
+    Args:
+        layout (TextLayout): レイアウト
+        color_method (ColorMethod): 色空間
+
+    Returns:
+        tuple[int | tuple[int, ...], ...]: (影, 縁取り, 文字) の色
+    """
+    return (
+        layout.get_shadow_color(color_method),
+        layout.get_outline_color(color_method),
+        layout.get_color(color_method),
+    )
+
+
+def composite_decoration_masks(
+    canvas:npt.NDArray[np.uint8],
+    bbox:BoundingBox,
+    masks:tuple[Optional[npt.NDArray[np.uint8]], ...],
+    inks:tuple[int | tuple[int, ...], ...],
+) -> None:
+    """複数のマスクの色を奥から順に 1 回の走査で合成
+
+    各マスクの合成は ImageDraw の draw_bitmap と同じ固定小数点の演算です。
+    描画先の範囲をチャンネル毎に一度だけ読み書きし、全てのマスクを作業領域上で重ねます。
+
+    Args:
+        canvas (npt.NDArray[np.uint8]): 描画先 (H, W) or (H, W, 3) or (H, W, 4)
+        bbox (BoundingBox): マスクの範囲
+        masks (tuple[Optional[npt.NDArray[np.uint8]], ...]): 奥から順のマスク (None は合成しない)
+        inks (tuple[int | tuple[int, ...], ...]): 各マスクの色 (描画先のチャンネル数と一致)
+    """
+    canvas_height, canvas_width = canvas.shape[:2]
+
+    xmin, ymin = max(0, bbox.xmin), max(0, bbox.ymin)
+    xmax, ymax = min(canvas_width, bbox.xmax), min(canvas_height, bbox.ymax)
+
+    if xmax <= xmin or ymax <= ymin:
+        return
+
+    region = canvas[ymin:ymax, xmin:xmax]
+    if region.ndim == 2:
+        region = region[..., np.newaxis]
+
+    layers = [
+        (mask[ymin - bbox.ymin:ymax - bbox.ymin, xmin - bbox.xmin:xmax - bbox.xmin], (ink, ) if isinstance(ink, int) else tuple(ink))
+        for mask, ink in zip(masks, inks)
+        if mask is not None
+    ]
+
+    for _, ink in layers:
+        assert len(ink) == region.shape[-1], f"ink channels mismatch, {len(ink)} != {region.shape[-1]}."
+
+    value = np.empty(region.shape[:2], np.uint16)
+    blend = np.empty(region.shape[:2], np.uint16)
+
+    def blend_layer(channel_mask:npt.NDArray[np.uint8], ink_value:int) -> None:
+        # BLEND(mask, out, ink) = (out * (255 - mask) + ink * mask) / 255
+        np.subtract(255, channel_mask, out=blend, dtype=np.uint16)
+        value[...] *= blend
+        np.multiply(channel_mask, ink_value, out=blend, dtype=np.uint16)
+        value[...] += blend
+        _div255(value, blend)
+
+    # NOTE: 透明度付きの場合、完全に透明な画素の色は文字色で置き換えるため (PIL の fill_mask_L と同じ)、
+    #       先に透明度を合成して各マスクの合成前の透明度から色用のマスクを作成します.
+    color_masks = [mask for mask, _ in layers]
+
+    if region.shape[-1] == 4:
+        value[...] = region[..., 3]
+        for i, (mask, ink) in enumerate(layers):
+            color_masks[i] = np.where((mask != 0) & (value == 0), 255, mask).astype(np.uint8)
+            blend_layer(mask, ink[3])
+        np.copyto(region[..., 3], value, casting="unsafe")
+
+    for c in range(min(region.shape[-1], 3)):
+        value[...] = region[..., c]
+        for color_mask, (_, ink) in zip(color_masks, layers):
+            blend_layer(color_mask, ink[c])
+        np.copyto(region[..., c], value, casting="unsafe")
+
+
+def draw_text_layout_array(
+    canvas:npt.NDArray[np.uint8],
+    text_pos:Int2,
+    text:str,
+    layout:TextLayout,
+    color_method:ColorMethod = ColorMethod.GRAYSCALE,
+    atlas:Optional[GlyphAtlas] = None,
+) -> BoundingBox:
+    """文字のマスクを 1 回だけラスタライズするテキスト描画
+
+    縁取りと影は文字のマスクの膨張と平行移動で作成し (create_decoration_masks)、
+    影, 縁取り, 文字の色を 1 回の走査で合成します (composite_decoration_masks)。
+
+    Args:
+        canvas (npt.NDArray[np.uint8]): 描画先 (GRAYSCALE は (H, W), COLOR は (H, W, 3), ALPHA は (H, W, 4))
+        text_pos (Int2): 描画位置
+        text (str): テキスト (1 行)
+        layout (TextLayout): レイアウト
+        color_method (ColorMethod, optional): 色空間. Defaults to ColorMethod.GRAYSCALE.
+        atlas (Optional[GlyphAtlas], optional): 文字のマスクの作成に使用するグリフアトラス. Defaults to None.
+
+    Returns:
+        BoundingBox: 描画した範囲 (文字のマスクの範囲に apply_font_decoration を適用した範囲)
+    """
+    bbox, masks = create_decoration_masks(text_pos, text, layout, atlas)
+    composite_decoration_masks(canvas, bbox, masks, _decoration_inks(layout, color_method))
+    return bbox
+
+
 def apply_font_decoration(
     bbox:BoundingBox,
     outline_weight:int,
@@ -206,19 +439,46 @@ def find_smallest_bounding_rectangle(
     image:npt.NDArray[np.uint8],
     threshold:int,
 ) -> BoundingBox:
-    """_summary_
+    """閾値を超える画素を囲む最小の矩形を取得
+
+    行毎と列毎の最大値の縮約から求めるため、追加のメモリは O(H + W) です。
 
     Args:
-        image (npt.NDArray[np.uint8]): _description_
-        threshold (int): _description_
+        image (npt.NDArray[np.uint8]): 画像 (H, W) or (H, W, C)、C は全チャンネルの最大値で判定
+        threshold (int): 閾値
 
     Returns:
-        BoundingBox: _description_
+        BoundingBox: 最小の矩形 (xmax, ymax は該当する最後の画素の位置)、該当する画素がない場合は (0, 0, W, H)
     """
-    mask = np.where(image > threshold)
-    if len(mask[0]) == 0 and len(mask[1]) == 0:
-        return BoundingBox(0, 0, *image.shape[::-1])
+    return BoundingBox(*find_smallest_bounding_rectangles(image[np.newaxis], threshold)[0].tolist())
 
-    ymin, xmin = np.min(mask, axis=1).tolist()
-    ymax, xmax = np.max(mask, axis=1).tolist()
-    return BoundingBox(xmin, ymin, xmax, ymax)
+
+def find_smallest_bounding_rectangles(
+    images:npt.NDArray[np.uint8],
+    threshold:int,
+) -> npt.NDArray[np.int64]:
+    """複数の画像の閾値を超える画素を囲む最小の矩形を一括で取得
+
+    Args:
+        images (npt.NDArray[np.uint8]): 画像 (N, H, W) or (N, H, W, C)
+        threshold (int): 閾値
+
+    Returns:
+        npt.NDArray[np.int64]: (N, 4) 最小の矩形 [xmin, ymin, xmax, ymax]、該当する画素がない画像は [0, 0, W, H]
+    """
+    assert images.ndim in (3, 4), f"images must be (N, H, W) or (N, H, W, C), {images.shape}."
+
+    height, width = images.shape[1:3]
+    channel_axes = tuple(range(3, images.ndim))
+
+    rows = images.max(axis=(2, ) + channel_axes) > threshold
+    cols = images.max(axis=(1, ) + channel_axes) > threshold
+
+    bboxes = np.empty((len(images), 4), np.int64)
+    bboxes[:, 0] = np.argmax(cols, axis=1)
+    bboxes[:, 1] = np.argmax(rows, axis=1)
+    bboxes[:, 2] = width - 1 - np.argmax(cols[:, ::-1], axis=1)
+    bboxes[:, 3] = height - 1 - np.argmax(rows[:, ::-1], axis=1)
+
+    bboxes[~rows.any(axis=1)] = (0, 0, width, height)
+    return bboxes